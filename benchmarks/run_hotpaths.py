@@ -0,0 +1,244 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import sys
+import json
+import time
+import copy
+import random
+import platform
+import argparse
+import logging
+
+sys.path.append("./")
+
+from generate_data import split
+
+# the service components log every app they process, benchmark results are logged with their own logger
+logger = logging.getLogger("benchmarks")
+
+
+def parser():
+    parser = argparse.ArgumentParser(description="Time the TCA service hot paths on synthetic portfolios and compare them with a baseline")
+    parser.add_argument("-sizes", type=str, default="10,1000,10000", help="comma separated portfolio sizes (number of apps). Default is 10,1000,10000")
+    parser.add_argument("-repeat", type=int, default=3, help="number of runs of each benchmark, the fastest one is kept. Default is 3")
+    parser.add_argument("-benchmarks", type=str, default="all", help="comma separated benchmark names. Default is all")
+    parser.add_argument("-output", type=str, default=os.path.join("benchmarks", "hotpaths.json"), help="json file the results are written to")
+    parser.add_argument("-baseline", type=str, default=os.path.join("benchmarks", "hotpaths_baseline.json"), help="json file of the baseline results")
+    parser.add_argument("-save_baseline", action="store_true", help="save the results as the new baseline instead of comparing with it")
+    parser.add_argument("-tolerance", type=float, default=0.25, help="allowed slowdown over the baseline, as a fraction. Default is 0.25")
+    parser.add_argument("-min_delta", type=float, default=0.005, help="slowdowns of less than min_delta seconds are ignored. Default is 0.005")
+    parser.add_argument("-seed", type=int, default=0, help="seed of the synthetic portfolios. Default is 0")
+
+    return parser.parse_args()
+
+
+versions   = ['', '', '', ' 7', ' 8.5', ' 10.0', ' 2016', ' 11g', ' v3']
+noise      = ['', '', '', '', ' server', ' enterprise edition', ' on premise', ' (custom)']
+ui_columns = {'OS': 'OS', 'Lang': 'Lang', 'App Server': 'App Server', 'App': 'Dependent Apps', 'Runtime': 'Runtime', 'Lib': 'Libs'}
+
+
+class Portfolio():
+    """
+    Synthetic portfolio of apps built from the entities of the KG, in the formats expected by each stage of TCA
+    """
+
+    def __init__(self, num_apps, seed=0):
+        from service.kg_context import get_kg_context
+
+        kg_context = get_kg_context()
+        mappings   = kg_context.class_type_mapper.get('mappings', {})
+        rng        = random.Random(seed)
+
+        entities = {}
+        for entity, entity_type in sorted(mappings.items()):
+            mention = split(entity)
+            if entity_type in ui_columns and mention:
+                entities.setdefault(entity_type, []).append((entity, mention))
+
+        self.apps        = []  # standardize input
+        self.assessments = []  # containerize and clustering input
+        self.mentions    = []  # entity_standardizer input
+        self.std_mentions= []  # select_mentions input
+        self.versions    = []  # version_standardizer input
+        combo_id = 0
+        for app_id in range(num_apps):
+            summary    = []
+            assessment = {"Name": f"App {app_id}", "Desc": "", "Cmpt": "", "Reason": "", "KG Version": kg_context.class_type_mapper.get('kg_version', '')}
+            for entity_type, column in ui_columns.items():
+                assessment[column] = {}
+                count = 1 if entity_type == 'OS' else rng.randint(0, 2)
+                for entity, mention in rng.sample(entities.get(entity_type, []), min(count, len(entities.get(entity_type, [])))):
+                    version = rng.choice(versions)
+                    text    = mention + version + rng.choice(noise)
+                    summary.append(text)
+                    assessment[column][text] = {"standard_name": entity, "detected_version": version.strip() or "NA_VERSION", "latest_known_version": "NA_VERSION"}
+                    self.versions.append((text, [entity, 0.9]))
+
+            self.apps.append({"application_name": f"App {app_id}", "application_description": "", "technology_summary": ", ".join(summary)})
+            self.assessments.append(assessment)
+
+            for text in summary:
+                words = text.split(' ')
+                for i in range(len(words)):
+                    for j in range(i + 1, min(i + 4, len(words) + 1)):
+                        mention_id = len(self.mentions)
+                        self.mentions.append({"app_id": app_id, "mention_id": mention_id, "mention": ' '.join(words[i:j])})
+                        score = round(rng.random(), 2)
+                        self.std_mentions.append({"app_id": app_id, "mention_id": mention_id, "combo_id": combo_id, "mention": ' '.join(words[i:j]),
+                                                  "entity_names": ['E'] if score > 0.2 else [], "confidence": [score] if score > 0.2 else []})
+                combo_id += 1
+
+
+def clear_caches():
+    """
+    Clears the memoized results of earlier runs so that each run is timed cold
+    """
+    from service.mention_cache import mention_cache
+    from service.standardization import combinations, is_version
+    from entity_standardizer.tfidf.utils_nlp import _normalize_tech_stack
+
+    mention_cache.clear()
+    for cached in [combinations, is_version, _normalize_tech_stack]:
+        cached.cache_clear()
+
+
+def get_benchmarks():
+    """
+    Returns the benchmarks as name -> (setup, run). setup builds the arguments of a run from the portfolio and is not timed.
+    """
+    from service.standardization import Standardization
+    from service.infer_tech import InferTech
+    from service.planning import Plan
+    from service.clustering import Clustering
+    from entity_standardizer.tfidf import utils
+
+    standardizer = Standardization()
+    infer_tech   = InferTech()
+    plan         = Plan()
+    clustering   = Clustering()
+
+    def compute_combinations(apps):
+        for app in apps:
+            for mention in utils.preprocess(app["technology_summary"]):
+                standardizer.compute_combinations(mention)
+
+    def version_standardizer(pairs):
+        for mention, entity in pairs:
+            standardizer.version_standardizer(mention, entity)
+
+    def planning_input(portfolio):
+        return [plan.validate_app(infer_tech.infer_missing_tech(plan.ui_to_input_assessment(copy.deepcopy(portfolio.assessments))))]
+
+    return {
+        'compute_combinations':     (lambda p: [p.apps], compute_combinations),
+        'entity_standardizer':      (lambda p: [copy.deepcopy(p.mentions)], standardizer.entity_standardizer),
+        'select_mentions':          (lambda p: [copy.deepcopy(p.std_mentions)], standardizer.select_mentions),
+        'version_standardizer':     (lambda p: [p.versions], version_standardizer),
+        'infer_missing_tech':       (lambda p: [plan.ui_to_input_assessment(copy.deepcopy(p.assessments))], infer_tech.infer_missing_tech),
+        'map_to_docker':            (planning_input, plan.map_to_docker),
+        'output_to_ui_clustering':  (lambda p: [copy.deepcopy(p.assessments)], clustering.output_to_ui_clustering),
+    }
+
+
+def run(benchmarks, sizes, repeat, seed):
+    """
+    Times each benchmark on a portfolio of each size, keeping the fastest of repeat runs
+    """
+    results = {}
+    for size in sizes:
+        portfolio = Portfolio(size, seed)
+        logger.info(f"Portfolio of {size} apps: {len(portfolio.mentions)} mentions")
+        for name, (setup, func) in benchmarks.items():
+            times = []
+            for _ in range(repeat):
+                args = setup(portfolio)
+                clear_caches()
+                start = time.perf_counter()
+                func(*args)
+                times.append(time.perf_counter() - start)
+            results.setdefault(name, {})[str(size)] = min(times)
+            logger.info(f"{name:<26} {size:>6} apps: {min(times):.4f}s")
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Returns the benchmarks slower than the baseline by more than tolerance and min_delta
+    """
+    regressions = []
+    for name, timings in results.items():
+        for size, seconds in timings.items():
+            base = baseline.get(name, {}).get(size, None)
+            if base is None:
+                continue
+            status = "ok"
+            if seconds > base * (1 + tolerance) and seconds - base > min_delta:
+                status = "REGRESSION"
+                regressions.append((name, size, base, seconds))
+            logger.info(f"{name:<26} {size:>6} apps: {base:.4f}s -> {seconds:.4f}s ({seconds/max(base, 1e-9):.2f}x) {status}")
+    return regressions
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(name)s:%(levelname)s in %(filename)s:%(lineno)s - %(message)s", filemode='w')
+
+    args = parser()
+
+    from service.model_registry import model_registry
+    model_registry.warm()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    logger.setLevel(logging.INFO)
+
+    benchmarks = get_benchmarks()
+    if args.benchmarks != "all":
+        names = args.benchmarks.split(",")
+        unknown = [name for name in names if name not in benchmarks]
+        if unknown:
+            logger.error(f"Unknown benchmarks {unknown}, valid names are {list(benchmarks.keys())}")
+            sys.exit(2)
+        benchmarks = {name: benchmarks[name] for name in names}
+
+    sizes   = [int(size) for size in args.sizes.split(",")]
+    results = run(benchmarks, sizes, max(1, args.repeat), args.seed)
+
+    output = {"python": platform.python_version(), "machine": platform.machine(), "seed": args.seed, "results": results}
+    with open(args.output, 'w') as output_file:
+        json.dump(output, output_file, indent=4)
+    logger.info(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(output, baseline_file, indent=4)
+        logger.info(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        logger.warning(f"No baseline {args.baseline}, run with -save_baseline to create one")
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("seed", None) != args.seed:
+        logger.warning(f"Baseline was created with seed {baseline.get('seed', None)}, timings are not comparable")
+
+    regressions = compare(results, baseline.get("results", {}), args.tolerance, args.min_delta)
+    if regressions:
+        for name, size, base, seconds in regressions:
+            logger.error(f"{name} on {size} apps regressed from {base:.4f}s to {seconds:.4f}s")
+        sys.exit(1)
+    logger.info("No regression over the baseline")
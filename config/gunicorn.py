@@ -4,3 +4,27 @@ timeout   = 300
 accesslog = 'gunicorn.access.log'
 errorlog  = 'gunicorn.debug.log'
 capture_output = True
+
+def on_starting(server):
+    """
+    Load the knowledge graph in the master process so that forked workers share it copy-on-write.
+    The SQLite KG backend is opened by each worker instead, as SQLite connections can't be shared across fork.
+    """
+    import gc
+    from service.kg_context import get_kg_context, config
+    if config['general'].get('kg_format', 'json').lower() == 'sqlite':
+        return
+    get_kg_context().load_all_catalogs()
+    gc.freeze()
+
+def post_worker_init(worker):
+    """
+    Load the knowledge graph, when it was not loaded by the master, and the entity standardization model once per
+    worker before it accepts requests, and start its multiprocessing pool before request threads run
+    """
+    from service.kg_context import get_kg_context
+    from service.model_registry import model_registry
+    from service.worker_pool import worker_pool
+    get_kg_context().load_all_catalogs()
+    model_registry.warm()
+    worker_pool.start()
@@ -0,0 +1,86 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import logging
+import numpy as np
+from sklearn.preprocessing import normalize
+
+
+class EntityIndex():
+    """
+    Cosine nearest neighbour index over entity embeddings. Entity vectors are L2 normalized once into a
+    contiguous float32 matrix, optionally memory-mapped from disk, and a batch of mentions is matched with
+    a single matrix multiply.
+    """
+
+    def __init__(self, embeddings, labels, mmap_path=None, source_path=None):
+        """
+        Init method for EntityIndex Class
+
+        :param embeddings: entity embeddings, one row per entity
+        :param labels: entity label of each row
+        :param mmap_path: optional .npy file caching the normalized matrix, loaded memory-mapped
+        :param source_path: file the embeddings were read from, the .npy file is rewritten when it is older
+        """
+        self.labels = list(labels)
+        if mmap_path:
+            self.matrix = self.__load_mmap(embeddings, mmap_path, source_path)
+        else:
+            self.matrix = np.ascontiguousarray(normalize(np.asarray(embeddings, dtype=np.float32)))
+
+    @staticmethod
+    def __load_mmap(embeddings, mmap_path, source_path=None):
+        """
+        Writes the normalized matrix to mmap_path unless it is already up to date, and maps it read-only
+        """
+        stale = not os.path.exists(mmap_path) or np.load(mmap_path, mmap_mode='r').shape != np.shape(embeddings)
+        if not stale and source_path and os.path.exists(source_path):
+            stale = os.path.getmtime(mmap_path) < os.path.getmtime(source_path)
+        if stale:
+            logging.info(f"Writing normalized entity matrix to {mmap_path}.")
+            tmp_path = f"{mmap_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(normalize(np.asarray(embeddings, dtype=np.float32))))
+            os.replace(tmp_path, mmap_path)
+        return np.load(mmap_path, mmap_mode='r')
+
+    def kneighbors(self, queries, n_neighbors=10):
+        """
+        Returns the cosine distances and row indices of the n_neighbors nearest entities of each query,
+        nearest first, as computed by a brute force cosine KNeighborsClassifier
+        """
+        n_neighbors = min(n_neighbors, len(self.labels))
+        queries     = normalize(np.asarray(queries, dtype=np.float32))
+        distances   = queries @ self.matrix.T
+        distances  *= -1
+        distances  += 1
+        np.clip(distances, 0, 2, out=distances)
+
+        rows    = np.arange(len(queries))[:, None]
+        indices = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        indices = indices[rows, np.argsort(distances[rows, indices], axis=1)]
+        return distances[rows, indices], indices
+
+    def predict(self, queries, n_neighbors=10):
+        """
+        Returns for each query the list of (label, 1 - cosine distance) of its n_neighbors nearest entities
+        """
+        distances, indices = self.kneighbors(queries, n_neighbors)
+        predictions = []
+        for dists, idxs in zip(distances.tolist(), indices.tolist()):
+            predictions.append([(self.labels[i], 1-d) for i, d in zip(idxs, dists)])
+        return predictions
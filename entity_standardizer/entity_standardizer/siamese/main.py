@@ -16,13 +16,13 @@
 
 import os, logging, random, time
 import numpy as np
-from sklearn.neighbors import KNeighborsClassifier
 import torch
 from tqdm import tqdm
 import pickle
 
 from .loss import batch_all_triplet_loss, batch_hard_triplet_loss
 from .model import Model
+from .index import EntityIndex
 from .data import generate_train_entity_sets, batchGenerator, loader
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -38,10 +38,38 @@ class SIAMESE():
         self.config.read([common, siamese])
         self.config["task"] = {}
         self.config["task"]["name"] = self.task_name
-                   
-    def infer(self, infer_data, batch_size=0):
 
-        logging.info(f"batch_size {batch_size}.")
+        # memory limit in GB for the activations of one inference batch, 0 for no limit
+        self.mem_gb_lim = float(self.config['infer'].get('mem_gb_lim', 0)) if 'infer' in self.config else 0
+        # memory-map the normalized entity matrix from disk so that processes share one copy
+        self.mmap_index = self.config['infer'].get('mmap_index', 'False') == 'True' if 'infer' in self.config else False
+
+        self.device     = None
+        self.model      = None
+        self.index      = None
+        self.embeddings = None
+        self.labels     = None
+
+    def model_files(self):
+        """
+        Returns the paths of the files the loaded model depends on
+        """
+        model_dir = os.path.join(self.config['general']['model_dir'], self.config['task']['name'],'siamese_model')
+        return [os.path.join(model_dir, 'pytorch_model.bin'), os.path.join(model_dir, 'entity_vector.pickle')]
+
+    def is_loaded(self):
+        """
+        Returns True once the encoder, entity embeddings and neighbour index are in memory
+        """
+        return self.model is not None and self.index is not None
+
+    def load(self, batch_size=0):
+        """
+        Loads the encoder in eval mode, the entity embeddings and fits the neighbour index once.
+        Subsequent calls are no-ops so that a loaded instance can be reused across inferences.
+        """
+        if self.is_loaded():
+            return self
 
         if self.config['train']['disable_cuda'] == 'False' and torch.cuda.is_available():
             device    = torch.device('cuda')    
@@ -72,18 +100,7 @@ class SIAMESE():
             _, train_entity_id_to_name = loader(self.config)
             train_entities, labels = list(train_entity_id_to_name.values()), list(train_entity_id_to_name.keys())
 
-            if batch_size > 0:
-                for i in tqdm(range(0, int(len(train_entities)/batch_size)+1)):
-                    if i * batch_size < len(train_entities) - 1:
-                        # logging.info(f'{i}/{int(len(train_entities)/batch_size)}')
-                        cls = model(train_entities[i*batch_size:min(len(train_entities),(i+1)*batch_size)], device)
-                        if i == 0:
-                            embeddings = cls.detach().cpu().numpy()
-                        else:
-                            embeddings = np.concatenate((embeddings, cls.detach().cpu().numpy()), axis=0)
-            else:
-                cls = model(train_entities, device)
-                embeddings = cls.detach().cpu().numpy()
+            embeddings = model.embed(train_entities, device, self.mem_gb_lim, batch_size)
 
             logging.info(f'writing to {entity_vector_path}')
             with open(entity_vector_path, 'wb') as f:
@@ -96,6 +113,23 @@ class SIAMESE():
                 num_entities = len(embeddings)
             logging.info(f"Loading embeddings of {num_entities} entities from {entity_vector_path}.")
 
+        self.device     = device
+        self.embeddings = embeddings
+        self.labels     = labels
+        mmap_path       = os.path.join(model_dir, 'entity_matrix.npy') if self.mmap_index else None
+        self.index      = EntityIndex(embeddings, labels, mmap_path, entity_vector_path)
+        self.model      = model
+
+        return self
+
+    def infer(self, infer_data, batch_size=0):
+
+        logging.info(f"batch_size {batch_size}.")
+
+        self.load(batch_size)
+        device = self.device
+        model  = self.model
+        index  = self.index
 
         inf_start     = time.time()
         label         = infer_data.get("label", None)
@@ -105,20 +139,7 @@ class SIAMESE():
             x_test = [d['mention(s)'] for _, d in infer_data['data'].items()]
             # y_test = [d['entity_id'] for _, d in infer_data['data'].items()]
 
-            knn = KNeighborsClassifier(n_neighbors=1, metric='cosine').fit(embeddings, labels)
-
-            if batch_size > 0:
-                for i in tqdm(range(0, int(len(x_test)/batch_size)+1)):
-                    if i*batch_size < len(x_test)-1:
-                        # logging.info(f'{i}/{int(len(train_entities)/batch_size)}')
-                        cls_test = model(x_test[i*batch_size:min(len(x_test),(i+1)*batch_size)], device)
-                        if i == 0:
-                            test_embeddings = cls_test.detach().cpu().numpy()
-                        else:
-                            test_embeddings = np.concatenate((test_embeddings, cls_test.detach().cpu().numpy()), axis=0)
-            else:
-                cls_test = model(x_test, device)
-                test_embeddings = cls_test.detach().cpu().numpy()
+            test_embeddings = model.embed(x_test, device, self.mem_gb_lim, batch_size)
 
 
 
@@ -126,16 +147,9 @@ class SIAMESE():
 
             logging.info('doing knn matching')
 
-            distances, indices = knn.kneighbors(test_embeddings,  n_neighbors=n_neighbors)
-            distances, indices = distances.tolist(), indices.tolist()
-
-            pred_label_ids = []
-            for pred in indices: 
-                label = [labels[i] for i in pred]
-                pred_label_ids.append(label)
+            predictions = index.predict(test_embeddings, n_neighbors)
             for idx, inf_id in enumerate(infer_data['data']):
-                predictions = list(zip(pred_label_ids[idx], [1-d for d in distances[idx]]))
-                infer_data['data'][inf_id]['predictions'] = predictions
+                infer_data['data'][inf_id]['predictions'] = predictions[idx]
         else:
             logging.info('get infer data')
             data = infer_data["data"]
@@ -149,15 +163,13 @@ class SIAMESE():
                         mention_1s.append(data[str(idx)]["mention_1"])
 
                     m0_set = list(set(mention_0s))
-                    cls_test    = model(m0_set, device)
-                    m0_vecs_slc = cls_test.detach().cpu().numpy()
+                    m0_vecs_slc = model.embed(m0_set, device, self.mem_gb_lim)
                     m0_vecs_dct = {}
                     for idx, mention in enumerate(m0_set):
                         m0_vecs_dct[mention] = m0_vecs_slc[idx]
 
                     m1_set = list(set(mention_1s))
-                    cls_test    = model(m1_set, device)
-                    m1_vecs_slc = cls_test.detach().cpu().numpy()
+                    m1_vecs_slc = model.embed(m1_set, device, self.mem_gb_lim)
                     m1_vecs_dct = {}
                     for idx, mention in enumerate(m1_set):
                         m1_vecs_dct[mention] = m1_vecs_slc[idx]
@@ -238,8 +250,7 @@ class SIAMESE():
         entity_vector_path = os.path.join(model_dir, entity_vector_name)
         train_entities, labels = list(train_entity_id_to_name.values()), list(train_entity_id_to_name.keys())
         model.eval()
-        cls = model(train_entities, device)
-        embeddings = cls.detach().cpu().numpy()
+        embeddings = model.embed(train_entities, device, self.mem_gb_lim)
         with open(entity_vector_path, 'wb') as f:
             pickle.dump((embeddings, labels), f)
 
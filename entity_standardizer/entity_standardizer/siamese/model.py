@@ -14,6 +14,9 @@
 # limitations under the License.
 ################################################################################
 
+import math
+import numpy as np
+import torch
 import torch.nn as nn
 from transformers import AutoModel, BertTokenizer# AutoTokenizer
 import transformers
@@ -32,4 +35,49 @@ class Model(nn.Module):
         outputs = self.encoder(**inputs)
         cls = outputs.last_hidden_state[:,0,:]
         del inputs
-        return cls
\ No newline at end of file
+        return cls
+
+    def __batch_size(self, seq_len, mem_gb_lim=0, batch_size=0):
+        """
+        Returns the number of sequences of length seq_len that fit in mem_gb_lim GB of activations
+        """
+        if mem_gb_lim <= 0:
+            return batch_size if batch_size > 0 else None
+        config = self.encoder.config
+        # peak activations of one encoder layer: query/key/value, intermediate and attention scores
+        seq_bytes = 2 * 4 * seq_len * (3*config.hidden_size + config.intermediate_size + config.num_attention_heads*seq_len)
+        limit = max(1, int(mem_gb_lim * 1024**3 / seq_bytes))
+        return min(batch_size, limit) if batch_size > 0 else limit
+
+    def embed(self, inputs, device, mem_gb_lim=0, batch_size=0, bucket_size=8):
+        """
+        Returns the cls embeddings of the inputs as a numpy array in input order. Inputs are sorted by
+        token length and padded to a multiple of bucket_size, so that each batch holds inputs of one length.
+        Batches are sized to keep activations under mem_gb_lim GB and to at most batch_size inputs.
+        """
+        embeddings = np.empty((len(inputs), self.encoder.config.hidden_size), dtype=np.float32)
+        if len(inputs) == 0:
+            return embeddings
+
+        encoded  = self.tokenizer(list(inputs))
+        features = [{key: encoded[key][i] for key in encoded.keys()} for i in range(len(inputs))]
+
+        buckets = {}
+        for i, feature in enumerate(features):
+            seq_len = bucket_size * math.ceil(len(feature["input_ids"]) / bucket_size)
+            buckets.setdefault(seq_len, []).append(i)
+
+        with torch.inference_mode():
+            for seq_len in sorted(buckets):
+                ids  = buckets[seq_len]
+                size = self.__batch_size(seq_len, mem_gb_lim, batch_size) or len(ids)
+                for start in range(0, len(ids), size):
+                    batch_ids = ids[start:start+size]
+                    batch = self.tokenizer.pad([features[i] for i in batch_ids], padding='max_length',
+                                               max_length=seq_len, return_tensors='pt')
+                    batch = batch.to(device)
+                    outputs = self.encoder(**batch)
+                    embeddings[batch_ids] = outputs.last_hidden_state[:,0,:].cpu().numpy()
+                    del batch, outputs
+
+        return embeddings
@@ -2,23 +2,101 @@ import os
 import json
 import logging
 import pickle
+import threading
 from time import time
 
-def predict(config, json_data):
+class Predictor():
+    """
+    TF-IDF predictor holding the entity ids and the unpickled model in memory across calls
+    """
+
+    def __init__(self, config):
+        """
+        Loads the entities json file and the model pickles
+
+        :param config: TF-IDF config
+        :type config: <class 'configparser.ConfigParser'>
+        """
+        from .sim_applier import sim_applier
+
+        entity_file_name = os.path.join(config["general"]["kg_dir"], config["tca"]["entities"])
+        with open(entity_file_name, 'r', encoding='utf-8') as entity_file:
+            entities = json.load(entity_file)
+
+        self.entity_to_eid = {}
+        for idx, entity_data in entities["data"].items():
+            self.entity_to_eid[entity_data["entity_name"]] = entity_data["entity_id"]
+
+        self.sim_app = sim_applier(config)
+
+    def predict_batch(self, mentions):
+        """
+        Predicts the entities of a list of mentions
+
+        :param mentions: List of mention strings
+        :type mentions: list
+
+        :returns: Returns a list of (entity id, score) predictions for each mention
+        """
+        all_predictions = []
+        for tech_sim_scores in self.sim_app.tech_stack_standardization_batch([mention.lower() for mention in mentions]):
+            predictions = []
+            for entity, score in (tech_sim_scores or []):
+                if entity == 'NA_CATEGORY':
+                    predicted_eid = 0
+                else:
+                    predicted_eid = self.entity_to_eid.get(entity, None)
+                predictions.append((predicted_eid, score))
+            all_predictions.append(predictions)
+        return all_predictions
+
+
+_predictors      = {}   # Maps model directory to (file mtimes, predictor)
+_predictors_lock = threading.Lock()
+
+def predictor_files(config):
+    """
+    Returns the paths of the entities json file and the model pickles a predictor depends on
+    """
+    model_path = os.path.join(config["general"]["model_dir"], config["task"]["name"])
+    files      = [os.path.join(config["general"]["kg_dir"], config["tca"]["entities"])]
+    return files + [os.path.join(model_path, config["train"][name]) for name in ["model_name", "tfidf_name", "instances_name"]]
+
+def get_predictor(config):
+    """
+    Returns the predictor of the model directory, creating it again if any of its files changed
+
+    :param config: TF-IDF config
+    :type config: <class 'configparser.ConfigParser'>
+    """
+    model_path = os.path.join(config["general"]["model_dir"], config["task"]["name"])
+    files      = predictor_files(config)
+    with _predictors_lock:
+        if not all(os.path.isfile(f) for f in files[1:]):
+            logging.info("TFIDF model does not exist - will re-run training")
+            os.makedirs(model_path, exist_ok=True)
+            train(config)
+
+        mtimes = [os.path.getmtime(f) for f in files]
+        cached = _predictors.get(model_path, None)
+        if cached is None or cached[0] != mtimes:
+            cached = (mtimes, Predictor(config))
+            _predictors[model_path] = cached
+        return cached[1]
+
+def predict(config, json_data, predictor=None):
     """
     Runs tfidf model on test set
 
     :param data_to_ids: Dictionary containing mapping of test mention to tuple of (entity id, Wikidata qid)
     :type data_to_qid: <class 'dict'> 
+    :param predictor: Predictor to use, by default the cached predictor of the configured model directory
 
     :returns: Returns a dictionary of test mention to list of predicted entity ids
     """ 
-    from .sim_applier import sim_applier
-    
     try:
         kg_dir        = config["general"]["kg_dir"]
         entities_json = config["tca"]["entities"]
-        mentions_json = config["tca"]["mentions"]
         model_dir     = config["general"]["model_dir"]
         name          = config["task"]["name"]
     except KeyError as k:
@@ -30,45 +108,14 @@ def predict(config, json_data):
         logging.error(f"Entities json file {entity_file_name} does not exist. Run kg generator to create this file.")
         exit()
 
-    with open(entity_file_name, 'r', encoding='utf-8') as entity_file:
-        entities = json.load(entity_file)
-
-    entity_to_eid   = {}
-    for idx, entity_data in entities["data"].items():
-        entity_name = entity_data["entity_name"] 
-        tca_id      = entity_data["entity_id"]
-        entity_to_eid[entity_name] = tca_id
+    if predictor is None:
+        predictor = get_predictor(config)
 
-    mentions   = {}
-    for idx in json_data["data"]:
-        mention = json_data["data"][idx]["mention(s)"]        
-        mentions[idx] = mention
-        
-    model_path = os.path.join(model_dir, name)
-    os.makedirs(model_path, exist_ok=True)
-    run_train  = True
-    for fname in os.listdir(model_path):
-        if fname.endswith('.pickle'):
-            run_train = False
-            break            
-    if run_train:
-        logging.info("TFIDF model does not exist - will re-run training")
-        train(config)
-    
-    sim_app    = sim_applier(config)
-    tf_eids    = {}
-    for idx, mention in mentions.items():
-        tech_sim_scores=sim_app.tech_stack_standardization(mention.lower())
-        json_data["data"][idx]["predictions"] = json_data["data"][idx].get("predictions", [])
-        if tech_sim_scores:
-            for item in tech_sim_scores:
-                entity  = item[0]
-                score   = item[1]
-                if entity == 'NA_CATEGORY':
-                    predicted_eid = 0
-                else:
-                    predicted_eid    = entity_to_eid.get(entity, None)
-                json_data["data"][idx]["predictions"].append((predicted_eid, score))
+    tf_eids     = {}
+    mention_ids = list(json_data["data"].keys())
+    mentions    = [json_data["data"][idx]["mention(s)"] for idx in mention_ids]
+    for idx, predictions in zip(mention_ids, predictor.predict_batch(mentions)):
+        json_data["data"][idx]["predictions"] = json_data["data"][idx].get("predictions", []) + predictions
     
     return tf_eids
 
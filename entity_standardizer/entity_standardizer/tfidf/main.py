@@ -16,9 +16,34 @@ class TFIDF():
         self.config["task"] = {}
         self.config["task"]["name"] = self.task_name        
 
+        self.predictor = None
+
+    def model_files(self):
+        """
+        Returns the paths of the entities json file and the pickle files the model depends on
+        """
+        from .infer import predictor_files
+        return predictor_files(self.config)
+
+    def is_loaded(self):
+        """
+        Returns True once the predictor holds the model in memory
+        """
+        return self.predictor is not None
+
+    def load(self):
+        """
+        Loads the predictor of the model, training the model if its pickle files are missing
+        """
+        if not self.is_loaded():
+            from .infer import get_predictor
+            self.predictor = get_predictor(self.config)
+        return self
+
     def infer(self, infer_data):
         from .infer import predict
-        predict(self.config, infer_data)        
+        self.load()
+        predict(self.config, infer_data, self.predictor)        
         return infer_data
 
 
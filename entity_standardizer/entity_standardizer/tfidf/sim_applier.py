@@ -16,10 +16,13 @@
  
 import os
 import string
+import logging
 import configparser
 import pickle
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 
 from .utils_nlp import  utils
 from .sim_utils import sim_utils
@@ -57,7 +60,16 @@ class sim_applier:
             self.tfidf=pickle.load(tfidf_file, encoding="utf8")
         with open(os.path.join(model_dir, task_name, instances_name), "rb") as instances_file:
             self.all_instances=pickle.load(instances_file, encoding="utf8")
-            
+
+        # normalized instance vectors, transposed once for sparse matrix products with batches of mentions
+        self.tfs_T = normalize(self.tfs).T.tocsr()
+
+        # category index of each training instance
+        category_index = {}
+        self.instance_categories = np.array([category_index.setdefault(category.strip(), len(category_index))
+                                             for category, variant, keywords in self.all_instances], dtype=np.int64)
+        self.num_categories = len(category_index)
+
     def calc_CosineSimilarity(self,tfs_text):
 
         """
@@ -78,6 +90,58 @@ class sim_applier:
     
         sims_sorted = sorted(enumerate(sims), key = lambda item:-item[1])
         return sims_sorted
+
+    def __top_categories(self, ids, sims):
+        """
+        Returns the best instance of each of the topk most similar categories
+
+        :param ids: instance ids with a similarity
+        :param sims: similarity of each instance id
+
+        :returns: List of (instance id, similarity) sorted by descending similarity and ascending instance id,
+                  followed by an entry of similarity 0 when fewer than topk categories have a similarity
+        :rtype: list
+        """
+        topk  = int(self.topk)
+        order = np.lexsort((ids, -sims))
+        # position of the best instance of each category in the sorted order, the topk smallest are the topk categories
+        _, first = np.unique(self.instance_categories[ids[order]], return_index=True)
+        if len(first) > topk:
+            first = first[np.argpartition(first, topk - 1)[:topk]]
+        top = order[np.sort(first)]
+
+        ranked = [(int(ids[i]), sims[i]) for i in top]
+        if len(ranked) < topk and len(ranked) < self.num_categories:
+            ranked.append((-1, 0.0))
+        return ranked
+
+    def rank_categories(self, texts, chunk_size=1024):
+        """
+        Ranks the categories most similar to each text with sparse matrix products over batches of texts
+
+        :param texts: List of preprocessed texts
+
+        :returns: List of (instance id, similarity) rankings, one per text, in the order of remove_duplicate_category
+                  applied to calc_CosineSimilarity
+        :rtype: list
+        """
+        rankings = []
+        if len(texts) == 0:
+            return rankings
+
+        tfs_texts = normalize(self.tfidf.transform(texts))
+        for start in range(0, tfs_texts.shape[0], chunk_size):
+            sims = (tfs_texts[start:start+chunk_size] @ self.tfs_T).tocsr()
+            for row in range(sims.shape[0]):
+                if self.sim_threshold < 0:
+                    # instances without any common term pass the threshold as well
+                    row_sims = sims[row].toarray()[0]
+                    row_ids  = np.arange(len(row_sims))
+                else:
+                    row_ids  = sims.indices[sims.indptr[row]:sims.indptr[row+1]]
+                    row_sims = sims.data[sims.indptr[row]:sims.indptr[row+1]]
+                rankings.append(self.__top_categories(row_ids, row_sims))
+        return rankings
     
 
     def get_entity_standardization(self):
@@ -114,12 +178,14 @@ class sim_applier:
         return list1
     
     
-    def entity_standardization(self,id_, text): 
+    def entity_standardization(self,id_, text, rankings=None): 
         """
         Standardize entities. An entity represent a technology( OS ,APPS , APP SERVERS ,LIBS , LANG or RUNTIMES)
 
         :param text: Entity to standardize
         :type text: string
+        :param rankings: Optional mapping of preprocessed text to its category ranking computed by rank_categories
+        :type rankings: dict
 
         
         :returns: List of Similarities with the associated similarity score values
@@ -135,30 +201,35 @@ class sim_applier:
         if query==" " or query=="":
             return score
         
-        sims=[]
         if len(query)>0:
-            tfs_text=self.tfidf.transform([text1])
-            sims=self.calc_CosineSimilarity(tfs_text)
-            if len(sims)>0:
-                i=0
-                
-                sims1=self.remove_duplicate_category(sims)
-                
-                while i <self.topk:
-                    sim_id_,similarity=sims1[i]
-                
-                    if similarity<=self.sim_threshold:
-                        score.append([id_, text,self.NA_CATEGORY, self.NA_VARIANT,0])
-                        break
-                    
-                    category,variant,keywords=self.all_instances[sim_id_]
-                    score.append([id_, text,category, keywords,similarity])
- 
-                    i+=1
+            sims1 = rankings.get(text1, None) if rankings else None
+            if sims1 is None:
+                sims1 = self.rank_categories([text1])[0]
+
+            for sim_id_,similarity in sims1[:int(self.topk)]:
+                if similarity<=self.sim_threshold:
+                    score.append([id_, text,self.NA_CATEGORY, self.NA_VARIANT,0])
+                    break
+
+                category,variant,keywords=self.all_instances[sim_id_]
+                score.append([id_, text,category, keywords,similarity])
         return score
     
     
-    def tech_stack_standardization(self,tech_stack):
+    def split_tech_stack(self,tech_stack):
+        """
+        Split Tech Stack into the texts to standardize
+
+        :param tech_stack: A String input text made of all Techs.Example input: "Windows, WebSphere App Server"
+        :type tech_stack: string
+
+        :returns: list of texts
+        :rtype: list
+        """
+        tech_list=utils.normalize_tech_stack(tech_stack, dedupe_snippets=True)
+        return [each for each in tech_list if not (each=="" or each==" " or each=="  " or each.isdigit() or utils.remove_noise_snippet(each))]
+
+    def tech_stack_standardization(self,tech_stack,rankings=None):
 
         """
         Standardize Tech Stack.Tech_stack may include OS ,APPS , APP SERVERS ,LIBS , LANG or RUNTIMES
@@ -166,6 +237,8 @@ class sim_applier:
         
         :param tech_stack: A String input text made of all Techs.Example input: "Windows, WebSphere App Server"
         :type tech_stack: string
+        :param rankings: Optional mapping of preprocessed text to its category ranking computed by rank_categories
+        :type rankings: dict
 
         :returns: list of Entities with the highest similarity score for each entity
         :rtype: list
@@ -173,32 +246,11 @@ class sim_applier:
 
       
         id_=0
-        text0 = tech_stack
-        tech_list0=text0.split(",")
-        tech_list0=utils.remove_duplicate(tech_list0)
-        tech_list=[]
-        
-        for each in tech_list0:
-            if utils.remove_noise_snippet(each):
-                continue
-            sublist=utils.split_subtext(each)
-            for sub_each in sublist:
-                tech_list.append(sub_each)
-
         tech_scores_sim=[]        
-        tech_list0=tech_list
-        tech_list=utils.remove_duplicate(tech_list)
         
-        
-        for each in tech_list:            
-            if each=="" or each==" " or each=="  " or each.isdigit():
-                continue
-            
-            if utils.remove_noise_snippet(each):
-                continue
-            
+        for each in self.split_tech_stack(tech_stack):            
             if each!="":
-                scores=self.entity_standardization(id_,each) 
+                scores=self.entity_standardization(id_,each,rankings) 
                 
                 for each in scores:
                     id_,query_text,category,keywords,max_sim=each
@@ -212,6 +264,27 @@ class sim_applier:
         tech_scores_sim_final=utils.remove_duplicate_tuple(tech_scores_sim)    
         self.ent_scores_sim=tech_scores_sim_final     
         return  self.ent_scores_sim
+
+    def tech_stack_standardization_batch(self,tech_stacks):
+        """
+        Standardize a list of Tech Stacks, ranking the categories of all their texts in one batch
+
+        :param tech_stacks: List of tech stack strings
+        :type tech_stacks: list
+
+        :returns: list of the tech_stack_standardization result of each tech stack
+        :rtype: list
+        """
+        texts = {}
+        for tech_stack in tech_stacks:
+            for each in self.split_tech_stack(tech_stack):
+                text1 = utils.input_preprocess(each)
+                if len(utils.my_tokenization0(text1.strip().lower()))>0:
+                    texts[text1] = None
+
+        texts    = list(texts.keys())
+        rankings = dict(zip(texts, self.rank_categories(texts)))
+        return [self.tech_stack_standardization(tech_stack, rankings) for tech_stack in tech_stacks]
     
  
     def detect_entity_snippet(self,text):
@@ -17,6 +17,21 @@
 from collections import defaultdict
 import re
 import logging
+import functools
+
+# Separators replaced by commas in order by split_subtext, "/" is kept in texts matching keep_list or version_list_pattern
+split_list = ("other -  ", ":", "        ", "~", "ibm - ibm", ";", "....", "    ", " and ", "\t", "\n", "\r", " / ",
+              "   ", "  ", "/", "&")  # ,#," - ", ) tomcat 3/4/5/6/7,cobol/c/c++/vb/java/c#
+keep_list = ("/os", "os/", "pl/", "i/o", "n/a", "pi/po", "amd/emt")
+version_list_pattern = re.compile(r'(/[0-9])+')
+
+# Snippets containing any of remove_list, or equal to any of exact_remove_list once spaces are removed, are noise
+remove_list = (":no", "unknown", "none", "value updated as per rule id", "string")
+exact_remove_list = frozenset(("n/a", "yes", "tbd", "etc", "custom", "none"))  # ,"other-"),"n",
+empty_snippets = frozenset(("", " ", "  ", "(", ")", "\""))
+
+stop_list = frozenset(("on", "of", "for", "version", "edition"))
+digits_pattern = re.compile(r"\d+")
 
 class utils:
 
@@ -24,11 +39,14 @@ class utils:
     def remove_duplicate(old_list):
         """Removes the duplicate elements present in the input list"""
         list1 = []
+        seen  = set()
 
         try:
             for element in old_list:
-                if element.strip() and (element.strip() not in list1):
-                    list1.append(element.strip())
+                element = element.strip()
+                if element and element not in seen:
+                    seen.add(element)
+                    list1.append(element)
             return list1
         except Exception as e:
             logging.error(str(e))
@@ -37,14 +55,14 @@ class utils:
     def remove_duplicate_tuple(old_list):
         """ Removes the duplicate elements which belongs to same category in the input list"""
         list1 = []
-        category_list=[]
+        category_list=set()
          
         try:
             for element in old_list:
                 category, sim = element
                 if (category not in category_list):
                     list1.append(element)
-                    category_list.append(category)
+                    category_list.add(category)
 
             return list1
         except Exception as e:
@@ -57,43 +75,20 @@ class utils:
         Formats the input text based on predefined split_list, keep_list values
         """
         try:
-            split_list = (
-            "other -  ", ":", "        ", "~", "ibm - ibm", ";", "....", "    ", " and ", "\t", "\n", "\r", " / ",
-            "   ", "  ", "/", "&")  # ,#," - ", ) tomcat 3/4/5/6/7,cobol/c/c++/vb/java/c#
-            keep_list = ("/os", "os/", "PL/", "I/O", "n/a", "pi/po", "amd/emt")
-            pattern = (r'(/[0-9])+')
-            stop_word_list = ("of", "for", "on", "in")
-
-            text = text.replace("_", " ")
-
-            text = text.replace("c#", "  c#  ")
-
-            text = text.replace("jquery", "  jquery")
+            text = text.replace("_", " ").replace("c#", "  c#  ").replace("jquery", "  jquery")
 
-            # print("subtext input:",text)
-            text = text.strip()
-            text = text.strip("\(")
-            text = text.strip("\)")
-            text = text.strip("\"")
+            text = text.strip().strip("\\(").strip("\\)").strip("\"")
 
             for r in split_list:
-                replaced = True
+                if r == "/" and r in text:
+                    # 3/4/5/6/7 and texts such as os/2 or i/o are not split
+                    if version_list_pattern.search(text) is not None:
+                        continue
+                    lower_text = text.lower()
+                    if any(each in lower_text for each in keep_list):
+                        continue
 
-                if r == "/" and text.strip().lower().find(r) >= 0:
-                    if re.search(pattern, text) != None:  # 3/4/5/6/7  not replace
-                        # print("not split subtext:",text)
-                        replaced = False
-
-                    for each in keep_list:
-
-                        if text.strip().lower().find(each.strip().lower()) >= 0:
-                            # print("not split subtext:",text, each)
-                            replaced = False
-                            break
-
-                if replaced:
-                    text = text.replace(r, ",")
-                # print("split subtext /:",text)
+                text = text.replace(r, ",")
 
             tech_list = text.split(",")
             return tech_list
@@ -105,21 +100,13 @@ class utils:
     def remove_noise_snippet(text):
         """ Check if any of the values in remove_list or exact_remove_list are present in the input text"""
         try:
-            remove_list = (":no", "unknown", "none", "value updated as per rule id", "string")  #
-
-            exact_remove_list = ("n/a", "yes", "tbd", "etc", "custom", "none")  # ,"other-"),"n",
-            temp = text
-            if text == "" or text == " " or text == "  " or text == "(" or text == ")" or text == "\"":
+            if text in empty_snippets:
                 return True
+            lower_text = text.lower()
             for each in remove_list:
-                if text.lower().find(each.lower()) > -1:
+                if each in lower_text:
                     return True
-            text0 = text.replace(" ", "")
-            for each in exact_remove_list:
-                if text0.lower() == each.lower():
-                    # print("remove:",text)
-                    return True
-            return False
+            return text.replace(" ", "").lower() in exact_remove_list
         except Exception as e:
             logging.error(str(e))
         
@@ -129,29 +116,7 @@ class utils:
 
         try:
             # stop_flag = ['x', 'c', 'u','d', 'p', 't', 'uj', 'm', 'f', 'r']
-
-            stop_list = ("on", "of", "for", "version", "edition")
-
-            result = []
-
-            words = text.split()
-
-            for word in words:
-                is_stop_word = False
-                word.replace(" ", "")
-                if len(word) == 0:
-                    continue;
-
-                for each in stop_list:
-                    if word.strip().lower() == each:
-                        is_stop_word = True
-                        break
-                if is_stop_word:
-                    continue
-
-                result.append(word)
-            # print("words:", result)
-            return result
+            return [word for word in text.split() if word.lower() not in stop_list]
 
         except Exception as e:
             logging.error(str(e))
@@ -176,44 +141,51 @@ class utils:
         try:
             text = utils.replace_special_character(text)
 
-            words = text.split(" ")
-            text0 = ""
-
-            for each in words:
+            words = []
+            for each in text.split(" "):
 
                 if not (each.isalpha() or each.isdigit()):
                     if "." in each:  # remove version
-                        each = re.sub("\d+", "", each, count=0)
-                        each.replace(".", "")
-                text0 = text0 + " " + each
+                        each = digits_pattern.sub("", each)
+                words.append(each)
 
-            return text0
+            return " " + " ".join(words)
 
         except Exception as e:
             logging.error(str(e))
 
+    @staticmethod
+    def normalize_tech_stack(tech_stack, dedupe_snippets=False):
+        """Split the text with comma delimiter, drop noise snippets, split the remaining ones into subtexts and remove
+        duplicates. Snippets are stripped and deduplicated before being split if dedupe_snippets is set"""
+        return list(_normalize_tech_stack(tech_stack, dedupe_snippets))
+
     @staticmethod
     def preprocess(tech_stack):
         """Split the text with comma delimiter and remove if any stop words to be removed in the subtext and remove
         duplicates"""
         try:
-            text0 = tech_stack
+            return utils.normalize_tech_stack(tech_stack)
 
-            tech_list0 = text0.split(",")
-
-            tech_list = []
-            for each in tech_list0:
-                if utils.remove_noise_snippet(each):
-                    continue
+        except Exception as e:
+            logging.error(str(e))
 
-                sublist = utils.split_subtext(each)
 
-                for sub_each in sublist:
-                    tech_list.append(sub_each)
+@functools.lru_cache(maxsize=4096)
+def _normalize_tech_stack(tech_stack, dedupe_snippets):
+    """
+    Normalizes a tech stack once per distinct string, see utils.normalize_tech_stack
+    """
+    snippets = tech_stack.split(",")
+    if dedupe_snippets:
+        snippets = utils.remove_duplicate(snippets)
 
-            tech_list = utils.remove_duplicate(tech_list)
+    tech_list = []
+    for each in snippets:
+        if utils.remove_noise_snippet(each):
+            continue
 
-            return tech_list
+        for sub_each in utils.split_subtext(each):
+            tech_list.append(sub_each)
 
-        except Exception as e:
-            logging.error(str(e))
+    return tuple(utils.remove_duplicate(tech_list))
@@ -17,6 +17,11 @@
 import os
 import json
 import re
+import struct
+import hashlib
+import argparse
+import array
+import sys
 import configparser
 import logging
 import sqlite3
@@ -150,8 +155,32 @@ def save_json(json_file:str, file_name:str)->None:
     if not os.path.isdir(dst_pth):
         os.mkdir(dst_pth)
 
-    with open(os.path.join(dst_pth, config["filenames"][file_name]), encoding="utf-8", mode="w") as comp_file:
+    # written to a temporary file first so that readers never see a partial knowledge graph
+    file_path = os.path.join(dst_pth, config["filenames"][file_name])
+    with open(file_path + ".tmp", encoding="utf-8", mode="w") as comp_file:
         comp_file.write(json.dumps(json_file, indent=2))
+    os.replace(file_path + ".tmp", file_path)
+
+
+def create_db_indexes(db_connection):
+    """
+    Creates the indexes used by the SQLite KG backend of the service to look up entities, versions and images.
+
+    :param db_connection:  A connection to mysql
+    :type db_connection:  <class 'sqlite3.Connection'>
+    """
+
+    statements = ["CREATE INDEX IF NOT EXISTS entities_name ON entities (entity_name)",
+                  "CREATE INDEX IF NOT EXISTS entity_versions_entity ON entity_versions (entity_id)"]
+    for catalog in catalogs(db_connection):
+        table_name = catalog + "_images"
+        statements.append("CREATE INDEX IF NOT EXISTS {0}_container_name ON {0} (container_name)".format(table_name))
+        for column in ["OS", "lang", "lib", "app", "app_server", "plugin", "runlib", "runtime"]:
+            statements.append("CREATE INDEX IF NOT EXISTS {0}_{1} ON {0} ({1})".format(table_name, column))
+
+    with db_connection:
+        for statement in statements:
+            db_connection.execute(statement)
 
 
 def create_class_type_mapper(db_connection):
@@ -587,17 +616,19 @@ def catalogs(connect)->str:
     return catalog_names
 
 
-def create_catalog_image_kg(connect):
+def create_catalog_image_kg(connect, cat_names=None):
     """
     Create a knowledge graph for each catalog.
 
     "catalog_name" + "_images"
     Args:
         connect (_type_):Connection to the database.
+        cat_names (list): catalogs to create the knowledge graph of. Default is all catalogs.
 
     """
 
-    cat_names = catalogs(connect)
+    if cat_names is None:
+        cat_names = catalogs(connect)
     entities = entity_mapper(connect)
     image_kg = {}
 
@@ -643,54 +674,265 @@ def create_catalog_image_kg(connect):
         save_json(image_kg, kg_name)
 
 
-def create_inverted_catalog_kg(connect) -> None:
+def create_inverted_catalog_kg(connect, tables=None) -> None:
     """" 
     Create inverted knowledge graph for each catalog.  
     Keyword arguments:
     connect -- Connection to the database.
+    tables -- catalogs to create the inverted knowledge graph of. Default is all catalogs.
     Return: None
     """
 
-    tables = catalogs(connect)
+    if tables is None:
+        tables = catalogs(connect)
+    entities = entity_mapper(connect)
 
     for table in tables:
         table_name = table + "_images"
         kg_name = "inverted_"+table + "_imageKG"
-        inverted_cur = connect.cursor()
-        inverted_cur.execute("SELECT * FROM {}".format(table_name))
-        entities = entity_mapper(connect)
         inverted_images_kg = {}
         inverted_images_kg['Version'] = config["general"]["version"]
         cur = connect.cursor()
         cur.execute("SELECT * FROM {}".format(table_name))
 
-        # init inverted_image_kg
         for img in cur.fetchall():
-            type_ids_init = img[2:10]
-            for type_id in type_ids_init:
-                if type_id == None:
-                    pass
-                else:
-                    inverted_images_kg[entities[str(type_id)]] = []
-
-        # fill inverted_image_kg
-        for img in inverted_cur.fetchall():
             container_name, type_ids = img[1], img[2:10]
             for type_id in type_ids:
                 if type_id == None:
                     pass
                 else:
-                    inverted_images_kg[entities[str(type_id)]].append(
+                    inverted_images_kg.setdefault(entities[str(type_id)], []).append(
                         container_name)
 
         save_json(inverted_images_kg, kg_name)
 
 
+def write_kg_artifact(kgs:dict, path:str)->None:
+    """
+    Writes knowledge graphs to a compiled KG artifact, memory-mapped by the service when kg_format is binary.
+    The layout is described in service/kg_artifact.py.
+    Args:
+        kgs (dict): maps the json file name of each knowledge graph to the knowledge graph
+        path (str): artifact file
+    """
+
+    strings = {}
+    def intern(s):
+        if s not in strings:
+            strings[s] = len(strings)
+        return strings[s]
+
+    def to_bytes(*arrays):
+        if sys.byteorder != 'little':
+            for values in arrays:
+                values.byteswap()
+        return b''.join(values.tobytes() for values in arrays)
+
+    def index(table, width=0):
+        # CSR arrays of string ids, the values of each key are flattened rows of width strings when width is set
+        keys    = sorted(table)
+        key_ids = array.array('I', [intern(key) for key in keys])
+        indptr  = array.array('I', [0])
+        indices = array.array('I')
+        for key in keys:
+            for value in table[key]:
+                if width:
+                    indices.extend(intern(v) for v in value)
+                else:
+                    indices.append(intern(value))
+            indptr.append(len(indices))
+        section = {"type": "index", "count": len(keys), "nnz": len(indices)}
+        if width:
+            section["width"] = width
+        return section, to_bytes(key_ids, indptr, indices)
+
+    def records(table):
+        # string ids of the keys in table order, their positions sorted by key, offsets of the records and compact
+        # json of each record
+        keys    = list(table)
+        key_ids = array.array('I', [intern(key) for key in keys])
+        order   = array.array('I', sorted(range(len(keys)), key=keys.__getitem__))
+        data    = [json.dumps(table[key], separators=(',', ':')).encode('utf-8') for key in keys]
+        offsets = array.array('I', [0])
+        for record in data:
+            offsets.append(offsets[-1] + len(record))
+        return {"type": "records", "count": len(keys)}, to_bytes(key_ids, order, offsets) + b''.join(data)
+
+    def rows_width(table):
+        # width of the rows of strings making up every value of table, 0 if the values are not such rows
+        if not all(isinstance(value, list) for value in table.values()):
+            return 0
+        widths = {len(row) if isinstance(row, list) and all(isinstance(v, str) for v in row) else 0
+                  for value in table.values() for row in value}
+        return widths.pop() if len(widths) == 1 else 0
+
+    index_names = {config["filenames"].get("compatibilityOSKG", "compatibilityOSKG.json")}
+    sections = {}
+    blobs    = []
+    offset   = 0
+    for name, kg in sorted(kgs.items()):
+        lists  = {key: value for key, value in kg.items() if isinstance(value, list)}
+        fields = [key for key, value in kg.items() if isinstance(value, dict)]
+        field  = fields[0] if len(fields) == 1 else None
+        if (name.startswith("inverted_") or name in index_names) and not fields and \
+                all(isinstance(v, str) for value in lists.values() for v in value):
+            # inverted index, e.g. entity -> container images
+            section, blob = index(lists)
+            section["scalars"] = {key: value for key, value in kg.items() if key not in lists}
+            sections[name] = dict(section, offset=offset)
+        elif field == "Container Images" and all(isinstance(image, dict) for image in kg[field].values()):
+            # container images of an image KG
+            section, blob = records(kg[field])
+            section["scalars"] = {key: value for key, value in kg.items() if key != field}
+            sections[name] = dict(section, offset=offset, field=field)
+        elif field is not None and rows_width(kg[field]):
+            # table of rows of strings, e.g. entity -> [version, release date, end date, latest version]
+            section, blob = index(kg[field], rows_width(kg[field]))
+            section["scalars"] = {key: value for key, value in kg.items() if key != field}
+            sections[name] = dict(section, offset=offset, field=field)
+        else:
+            blob = json.dumps(kg, separators=(',', ':')).encode('utf-8')
+            sections[name] = {"type": "json", "offset": offset, "length": len(blob)}
+        blob += b'\0' * (-len(blob) % 4)
+        blobs.append(blob)
+        offset += len(blob)
+
+    encoded = [s.encode('utf-8') for s in strings]
+    string_offsets = array.array('I', [0])
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+    if sys.byteorder != 'little':
+        string_offsets.byteswap()
+    blobs.append(string_offsets.tobytes() + b''.join(encoded))
+
+    header = json.dumps({"format_version": 2, "kg_version": config["general"]["version"], "sections": sections,
+                         "strings": {"offset": offset, "count": len(encoded)}}).encode('utf-8')
+    header_end = 8 + 4 + len(header)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode="wb") as artifact_file:
+        artifact_file.write(b'TCAKG\x00\x00\x01')
+        artifact_file.write(struct.pack('<I', len(header)))
+        artifact_file.write(header)
+        artifact_file.write(b'\0' * (-header_end % 4))
+        for blob in blobs:
+            artifact_file.write(blob)
+    os.replace(tmp_path, path)
+
+
+def create_kg_artifact()->None:
+    """
+    Compiles the json knowledge graphs of the kg directory into the KG artifact
+    """
+
+    dst_pth = config["general"]["kg_dir"]
+    kgs = {}
+    for file_name in sorted(set(list(config["filenames"].values()) + [config["tca"]["entities"]])):
+        file_path = os.path.join(dst_pth, file_name)
+        if file_name.endswith(".json") and file_name != config["filenames"]["kg_build_state"] and os.path.isfile(file_path):
+            with open(file_path, encoding="utf-8") as kg_file:
+                kgs[file_name] = json.load(kg_file)
+
+    write_kg_artifact(kgs, os.path.join(dst_pth, config["filenames"]["kg_artifact"]))
+    logging.info(f'Compiled {len(kgs)} knowledge graphs into {config["filenames"]["kg_artifact"]}')
+
+
+def table_signatures(connect)->dict:
+    """
+    Returns the row count and a hash of the content of each table of the database.
+    Args:
+        connect (_type_): Connection to the database.
+    """
+
+    signatures = {}
+    for table in table_names(connect):
+        if table == "sqlite_sequence":
+            continue
+        digest = hashlib.sha256()
+        rows = 0
+        for row in connect.execute("SELECT * FROM {} ORDER BY rowid".format(table)):
+            digest.update(repr(row).encode("utf-8"))
+            rows += 1
+        signatures[table] = {"rows": rows, "sha256": digest.hexdigest()}
+    return signatures
+
+
+def kg_builders(connect)->dict:
+    """
+    Returns the knowledge graph builders as name -> (tables read, builder, knowledge graphs saved)
+    Args:
+        connect (_type_): Connection to the database.
+    """
+
+    builders = {
+        "class_type_mapper":        ({"entity_types", "entities", "entity_mentions"}, create_class_type_mapper, ["class_type_mapper"]),
+        "COTSKG":                   ({"entities"}, create_cot_kg, ["COTSKG"]),
+        "entity_versionsKG":        ({"entities", "entity_versions"}, create_version, ["entity_versionsKG"]),
+        "baseOSKG":                 ({"catalogs", "entities", "dockerhub_baseos_images", "openshift_baseos_images"}, create_base_os_kg, ["baseOSKG", "openshift_baseOSKG"]),
+        "compatibilityOSKG":        ({"entity_types", "entities", "entity_relations"}, create_compatibility_os_kg, ["compatibilityOSKG"]),
+        "compatibilityKG":          ({"entity_types", "entities", "entity_relations"}, create_compatibilty_kg, ["compatibilityKG"]),
+        "catalogKG":                ({"catalogs"}, create_catalog_kg, ["catalogKG"]),
+    }
+    for catalog in catalogs(connect):
+        builders[catalog + "_imageKG"] = ({"catalogs", "entities", catalog + "_images"},
+                                          lambda connect, catalog=catalog: (create_catalog_image_kg(connect, [catalog]), create_inverted_catalog_kg(connect, [catalog])),
+                                          [catalog + "_imageKG", "inverted_" + catalog + "_imageKG"])
+    builders["inverted_compatibilityKG"] = ({"entity_types", "entities", "entity_relations"}, create_inverted_compatibility_kg, ["inverted_compatibilityKG"])
+    builders["inverted_baseOSKG"] = ({"catalogs", "entities", "dockerhub_baseos_images", "openshift_baseos_images"}, create_inverted_base_os_kg, ["inverted_baseOSKG", "inverted_openshift_baseOSKG"])
+    return builders
+
+
+def build_kg(connect, incremental=False)->list:
+    """
+    Generates the knowledge graphs and the KG artifact. In incremental mode only the knowledge graphs read from tables
+    changed since the last build, or missing from the kg directory, are generated.
+    Args:
+        connect (_type_): Connection to the database.
+        incremental (bool): generate only the knowledge graphs of changed tables.
+    Return: names of the generated knowledge graphs
+    """
+
+    dst_pth = config["general"]["kg_dir"]
+    state_path = os.path.join(dst_pth, config["filenames"]["kg_build_state"])
+    signatures = table_signatures(connect)
+
+    changed = None
+    if incremental and os.path.isfile(state_path):
+        with open(state_path, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        if state.get("version", None) == config["general"]["version"]:
+            previous = state.get("tables", {})
+            changed = {table for table in set(signatures) | set(previous) if signatures.get(table, None) != previous.get(table, None)}
+            logging.info(f'Tables changed since the last build: {sorted(changed)}')
+
+    built = []
+    for name, (tables, builder, kg_names) in kg_builders(connect).items():
+        missing = [kg_name for kg_name in kg_names if not os.path.isfile(os.path.join(dst_pth, config["filenames"][kg_name]))]
+        if changed is None or missing or tables & changed:
+            builder(connect)
+            built.append(name)
+
+    if built or not os.path.isfile(os.path.join(dst_pth, config["filenames"]["kg_artifact"])):
+        create_kg_artifact()
+
+    with open(state_path + ".tmp", encoding="utf-8", mode="w") as state_file:
+        json.dump({"version": config["general"]["version"], "tables": signatures}, state_file, indent=2)
+    os.replace(state_path + ".tmp", state_path)
+
+    logging.info(f'Generated knowledge graphs: {built}')
+    return built
+
+
 if __name__ == '__main__':
 
     logging.basicConfig(
         level=logging.INFO, format="[%(asctime)s] %(name)s:%(levelname)s in %(filename)s:%(lineno)s - %(message)s", filemode='w')
 
+    parser = argparse.ArgumentParser(description="Generate the knowledge graph json files from the TCA db")
+    parser.add_argument("-i", dest="incremental", action="store_true",
+                        help="only generate the knowledge graphs whose db tables changed since the last run")
+    args = parser.parse_args()
+
     try:
         version = config["general"]["version"]
         db_dir = config["general"]["db_dir"]
@@ -706,15 +948,7 @@ if __name__ == '__main__':
 
     else:
         connection = create_db_connection(db_path)
-        explore_db(connection)
-        create_class_type_mapper(connection)
-        create_cot_kg(connection)
-        create_version(connection)
-        create_base_os_kg(connection)
-        create_compatibility_os_kg(connection)
-        create_compatibilty_kg(connection)
-        create_catalog_kg(connection)
-        create_catalog_image_kg(connection)
-        create_inverted_catalog_kg(connection)
-        create_inverted_compatibility_kg(connection)
-        create_inverted_base_os_kg(connection)
+        if not args.incremental:
+            explore_db(connection)
+        create_db_indexes(connection)
+        build_kg(connection, args.incremental)
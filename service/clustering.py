@@ -19,6 +19,7 @@ import json
 from collections import OrderedDict
 import logging
 from service.utils import Utils
+from service.kg_context import get_kg_context
 import ast
 import numpy as np
 
@@ -43,33 +44,20 @@ class Clustering():
 
         logging.basicConfig(level=logging.INFO)
 
-        # read entities
-        entities_filepath = os.path.join(config['general']['kg_dir'], config['tca']['entities'])
-        if os.path.exists(entities_filepath):
-            with open(entities_filepath, 'r') as f:
-                entities_json = json.load(f)
-                self.entity_names = np.empty(len(entities_json['data']), dtype='object')
-                for i, en in enumerate(entities_json['data']):
-                    self.entity_names[i] = entities_json['data'][en]['entity_name']
-        else:
-            self.entities = {}
-            logging.error(f'entities[{entities_filepath}] is empty or not exists')
+        # entity names in the order of the entities KG
+        kg_context = get_kg_context()
+        self.entity_names   = kg_context.entity_names
+        self.entity_columns = kg_context.entity_columns
 
-
-    def output_to_ui_clustering(self, appL):
+    def __tech_stack_signatures(self, appL):
         """
-        output_to_ui clustering methods takes the final assessed data as input and formats it & keeps
-         only required fields and returns it as output assessment response
-
+        Returns a dict mapping each tech stack, as the sorted entity columns it uses, to the indexes of
+        the apps using it
         """
-
-        # initialize tech stack
-        tech_stack = np.zeros((len(appL), self.entity_names.shape[0]), dtype='bool')
-        appL_array = np.array(appL)
-
-        # find unique clusters
         fields = ['OS', 'Lang', 'App Server', 'Dependent Apps', 'Runtime', 'Libs']
+        signatures = {}
         for i, app in enumerate(appL):
+            columns = set()
             for k in fields:
 
                 if k in app.keys():
@@ -85,23 +73,137 @@ class Clustering():
                         if entity.find('|') > 0:
                             entity = f"{entity.split('|')[0]}|*"
 
-                        tech_stack[i][self.entity_names == entity] = 1
+                        columns.update(self.entity_columns.get(entity, ()))
+
+            signatures.setdefault(tuple(sorted(columns)), []).append(i)
+        return signatures
+
+    def output_to_ui_clustering(self, appL):
+        """
+        output_to_ui clustering methods takes the final assessed data as input and formats it & keeps
+         only required fields and returns it as output assessment response
+
+        """
+
+        # tech stack of each app as the sorted entity columns it uses
+        signatures = self.__tech_stack_signatures(appL)
 
-        # find unique clusters
-        clusters, index, counts = np.unique(tech_stack, return_inverse=True, return_counts=True, axis=0)
+        # order unique clusters as rows of the tech stack matrix sorted lexicographically
+        clusters = sorted(signatures.keys(), key=lambda columns: tuple(-c for c in columns))
+        counts = np.array([len(signatures[cluster]) for cluster in clusters], dtype=np.int64)
 
         # sort clusters by number of apps
         order = np.argsort(counts)[::-1]
 
-        clusters = clusters[order]
-        counts = counts[order]
-
         unique_clusters = []
-        for i in range(clusters.shape[0]):
-            cl = { "id": i, "name": f'unique_tech_stack_{i}',  "type": 'unique', "tech_stack": list(self.entity_names[clusters[i] == 1]),\
-                   "num_elements": int(counts[i]), "apps": list(appL_array[index == order[i]]) }
+        for i, cluster_id in enumerate(order):
+            cluster = clusters[cluster_id]
+            cl = { "id": i, "name": f'unique_tech_stack_{i}',  "type": 'unique', "tech_stack": [self.entity_names[c] for c in cluster],\
+                   "num_elements": int(counts[cluster_id]), "apps": [appL[j] for j in signatures[cluster]] }
 
             unique_clusters.append(cl)
 
 
         return unique_clusters
+
+    @staticmethod
+    def __lsh_bands(num_perm, threshold):
+        """
+        Returns the number of bands and rows per band of the LSH index with the most rows per band whose
+        collision curve rises before the jaccard threshold. Candidate pairs are verified exactly, so false
+        positives only cost time while false negatives split clusters.
+        """
+        best = (num_perm, 1)
+        for rows in range(1, num_perm + 1):
+            if num_perm % rows == 0:
+                bands = num_perm // rows
+                if (1.0 / bands) ** (1.0 / rows) <= threshold:
+                    best = (bands, rows)
+        return best
+
+    def __minhash(self, signatures, num_perm, seed):
+        """
+        Returns the MinHash of each signature, one row of num_perm values per signature
+        """
+        # universal hash functions (a*x + b) mod prime, products of values below 2**31 fit in 64 bits
+        prime = np.uint64((1 << 31) - 1)
+        rng = np.random.RandomState(seed)
+        a = rng.randint(1, prime, size=(num_perm, 1)).astype(np.uint64)
+        b = rng.randint(0, prime, size=(num_perm, 1)).astype(np.uint64)
+
+        minhashes = np.empty((len(signatures), num_perm), dtype=np.uint64)
+        for i, columns in enumerate(signatures):
+            x = np.asarray(columns, dtype=np.uint64)[None, :]
+            minhashes[i] = ((a * x + b) % prime).min(axis=1)
+        return minhashes
+
+    def output_to_ui_similarity_clustering(self, appL, threshold=None):
+        """
+        Groups apps whose tech stacks have a jaccard similarity of at least threshold. Candidate pairs of
+        tech stacks are found with MinHash and LSH. The clusters of a candidate pair are merged only if every
+        tech stack of one cluster passes the threshold with every tech stack of the other, so that dissimilar
+        tech stacks are not chained into one cluster.
+
+        :param appL: list of assessed applications
+        :param threshold: jaccard similarity threshold, by default the configured similarity_threshold
+
+        :returns: clusters in the format of output_to_ui_clustering, with type 'similar'
+        """
+        try:
+            if threshold is None:
+                threshold = float(config['clustering']['similarity_threshold'])
+            num_perm = int(config['clustering']['num_perm'])
+            seed     = int(config['clustering']['seed'])
+        except KeyError as k:
+            logging.error(f'{k} is not a key in your common.ini file.')
+            return []
+
+        signatures = self.__tech_stack_signatures(appL)
+        stacks = [stack for stack in signatures if stack]
+
+        # union find over the non empty tech stacks, with the tech stacks of each cluster at its root
+        parent  = list(range(len(stacks)))
+        members = [[i] for i in range(len(stacks))]
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        if stacks:
+            stack_sets = [frozenset(stack) for stack in stacks]
+            def is_similar(i, j):
+                return len(stack_sets[i] & stack_sets[j]) >= threshold * len(stack_sets[i] | stack_sets[j])
+
+            minhashes  = self.__minhash(stacks, num_perm, seed)
+            bands, rows = self.__lsh_bands(num_perm, threshold)
+            for band in range(bands):
+                buckets = {}
+                for i, key in enumerate(map(bytes, minhashes[:, band*rows:(band+1)*rows])):
+                    leader = buckets.setdefault(key, i)
+                    if leader != i:
+                        root_i, root_leader = find(i), find(leader)
+                        if root_i != root_leader:
+                            small, large = sorted([root_i, root_leader], key=lambda root: (len(members[root]), -root))
+                            if all(is_similar(m, n) for m in members[small] for n in members[large]):
+                                parent[small] = large
+                                members[large].extend(members[small])
+                                members[small] = []
+
+        # gather apps and tech stack of each cluster, apps without any known tech form their own cluster
+        groups = {}
+        for i, stack in enumerate(stacks):
+            group = groups.setdefault(find(i), [set(), []])
+            group[0].update(stack)
+            group[1].extend(signatures[stack])
+        if () in signatures:
+            groups[-1] = [set(), list(signatures[()])]
+
+        clusters = sorted(groups.values(), key=lambda group: (-len(group[1]), min(group[1])))
+        similar_clusters = []
+        for i, (columns, apps) in enumerate(clusters):
+            cl = { "id": i, "name": f'similar_tech_stack_{i}', "type": 'similar', "tech_stack": [self.entity_names[c] for c in sorted(columns)],
+                   "num_elements": len(apps), "apps": [appL[j] for j in sorted(apps)] }
+            similar_clusters.append(cl)
+
+        return similar_clusters
@@ -19,7 +19,6 @@ import json
 import sys
 import shutil
 import logging
-import requests
 import flask
 import time
 from datetime import datetime
@@ -31,6 +30,9 @@ from service.assessment import Assessment
 from service.planning import Plan
 from service.infer_tech import InferTech
 from service.clustering import Clustering
+from service.jobs import job_runner, FAILED
+from service.metrics import metrics
+from service.token_cache import token_cache
 
 class Functions:
     def __init__(self, catalog = "dockerhub"):
@@ -67,6 +69,10 @@ class Functions:
         detect_access_token checks if the access_token is enabled or disabled. If it's enabled, it will validate
         the accesstoken in auth_headers in RBAC
         """
+        with metrics.timer('access_token'):
+            return self.__validate_access_token(auth_url, headers, auth_headers)
+
+    def __validate_access_token(self, auth_url, headers, auth_headers):
         is_valid = False
         if self.is_disable_access_token and (self.is_disable_access_token.lower() == 'yes' or self.is_disable_access_token.lower() == 'true'):
             is_valid = True
@@ -85,25 +91,37 @@ class Functions:
             if self.is_enable_default_token and (self.is_enable_default_token.lower() == 'yes' or self.is_enable_default_token.lower() == 'true') and self.tca_default_token and accesstoken.lower() == self.tca_default_token.lower():
                 is_valid = True
         if not is_valid:
-            try:
-                auth_response = requests.get(auth_url, headers = req_headers, verify=False)
-                if auth_response.status_code == requests.codes.ok: #pylint: disable=no-member
-                    try:
-                        auth_response_json = auth_response.json()
-                        if auth_response_json and auth_response_json['isAuthorized'] == 'Y':
-                            is_valid = True
-                        else:
-                            logging.warn(f'access token response json: {json.dumps(auth_response_json)}')
-                    except ValueError:
-                        logging.error(f'access token response error: {auth_response}')
-            except Exception as e:
-                print(e)
+            # validations are cached per worker, see token_cache
+            is_valid = token_cache.is_valid(auth_url, req_headers, accesstoken)
 
         if not is_valid:
             return dict(status = 401, message = 'Unauthorized, missing or invalid access token'), 401, is_valid
         
         return dict(), 201, is_valid
 
+    def assess_apps(self, app_data):
+        """
+        Standardizes and validates the apps, returns the formatted assessment data
+        """
+        appL = self.standardize.app_standardizer(app_data)
+
+        appL = self.assess.app_validation(appL)
+
+        # Generate output for UI
+        return self.assess.output_to_ui_assessment(appL)
+
+    def plan_apps(self, assessment_data, catalog):
+        """
+        Infers missing technologies of the assessed apps and maps them to container images of the catalog,
+        returns the formatted planning data
+        """
+        with metrics.timer('planning'):
+            appL = self.plan.ui_to_input_assessment(assessment_data)
+            appL = self.inferTech.infer_missing_tech(appL)
+            appL = self.plan.validate_app(appL)
+            containerL = self.plan.map_to_docker(appL, catalog)
+            return self.plan.output_to_ui_planning(containerL)
+
     def standardization(self,auth_url,headers,auth_headers,app_data):
         """
         Invokes detect_access_token for accesstoken validation and if it's valid, it will call
@@ -131,12 +149,7 @@ class Functions:
             if not is_valid:
                 return resp, code
 
-            appL = self.standardize.app_standardizer(app_data)
-
-            appL = self.assess.app_validation(appL)
-
-            # Generate output for UI
-            output = self.assess.output_to_ui_assessment(appL)
+            output = self.assess_apps(app_data)
             logging.info(f'{str(datetime.now())} output assessment num: {str(len(output))} ')
             return dict(status=201, message="Standardization completed successfully!", standardized_apps=output), 201
         except Exception as e:
@@ -155,11 +168,7 @@ class Functions:
             if not is_valid:
                 return resp, code
 
-            appL = self.plan.ui_to_input_assessment(assessment_data)
-            appL = self.inferTech.infer_missing_tech(appL)
-            appL = self.plan.validate_app(appL)
-            containerL = self.plan.map_to_docker(appL, catalog)
-            output = self.plan.output_to_ui_planning(containerL)
+            output = self.plan_apps(assessment_data, catalog)
 
             logging.info(f"output planning num: {str(len(output))}")
             return dict(status=201, message="Container recommendation generated!", containerization=output), 201
@@ -169,7 +178,7 @@ class Functions:
             track = traceback.format_exc()
             return dict(status=400, message='Input data format doesn\'t match the format expected by TCA'), 400
 
-    def clustering(self, auth_url, headers, auth_headers, app_data):
+    def clustering(self, auth_url, headers, auth_headers, app_data, mode='unique', threshold=None):
         """
         Invokes detect_access_token for accesstoken validation and if it's valid, it will call
         output_to_ui_clustering to return the formatted assessment data
@@ -180,7 +189,10 @@ class Functions:
                 return resp, code
 
             # Generate output for UI
-            clusters = self.cluster.output_to_ui_clustering(app_data)
+            if mode == 'similar':
+                clusters = self.cluster.output_to_ui_similarity_clustering(app_data, threshold)
+            else:
+                clusters = self.cluster.output_to_ui_clustering(app_data)
             logging.info(f'{str(datetime.now())} output clustering num: {str(len(clusters))} ')
             return dict(status=201, message="Clustering completed successfully!", clusters=clusters), 201
         except Exception as e:
@@ -188,6 +200,123 @@ class Functions:
             track = traceback.format_exc()
             return dict(status=400, message='Input data format doesn\'t match the format expected by TCA'), 400
 
+    def assessment_stream(self, auth_url, headers, auth_headers, lines, chunk_size):
+        """
+        Invokes detect_access_token for accesstoken validation and if it's valid, returns a generator of the
+        assessment output of newline delimited app records, standardized in chunks of chunk_size apps
+        """
+        resp, code, is_valid = self.detect_access_token(auth_url, headers, auth_headers)
+        if not is_valid:
+            return resp, code
+
+        def generate():
+            for app_data, errors in read_ndjson_chunks(lines, chunk_size):
+                for error in errors:
+                    yield error
+                if not app_data:
+                    continue
+                try:
+                    for output in self.assess_apps(app_data):
+                        yield output
+                except Exception as e:
+                    logging.error(str(e))
+                    yield dict(status=400, message='Input data format doesn\'t match the format expected by TCA')
+
+        return generate(), 200
+
+    def planning_stream(self, auth_url, headers, auth_headers, lines, chunk_size, catalog):
+        """
+        Invokes detect_access_token for accesstoken validation and if it's valid, returns a generator of the
+        planning output of newline delimited assessment records, planned in chunks of chunk_size apps
+        """
+        resp, code, is_valid = self.detect_access_token(auth_url, headers, auth_headers)
+        if not is_valid:
+            return resp, code
+
+        def generate():
+            for assessment_data, errors in read_ndjson_chunks(lines, chunk_size):
+                for error in errors:
+                    yield error
+                if not assessment_data:
+                    continue
+                try:
+                    for output in self.plan_apps(assessment_data, catalog):
+                        yield output
+                except Exception as e:
+                    logging.error(str(e))
+                    yield dict(status=400, message='Input data format doesn\'t match the format expected by TCA')
+
+        return generate(), 200
+
+    def submit_job(self, auth_url, headers, auth_headers, operation, data, catalog=None):
+        """
+        Invokes detect_access_token for accesstoken validation and if it's valid, queues an asynchronous
+        standardize or containerize job for the apps and returns its id
+        """
+        try:
+            resp, code, is_valid = self.detect_access_token(auth_url, headers, auth_headers)
+            if not is_valid:
+                return resp, code
+            if not isinstance(data, list):
+                raise ValueError('payload is not a list of apps')
+
+            if operation == 'containerize':
+                job_id = job_runner.submit(operation, data, lambda chunk: self.plan_apps(chunk, catalog))
+            else:
+                job_id = job_runner.submit(operation, data, self.assess_apps)
+            logging.info(f'{str(datetime.now())} queued {operation} job {job_id} of {str(len(data))} apps')
+            return dict(status=202, message="Job submitted successfully!", job_id=job_id), 202
+        except Exception as e:
+            logging.error(str(e))
+            return dict(status=400, message='Input data format doesn\'t match the format expected by TCA'), 400
+
+    def job_status(self, auth_url, headers, auth_headers, job_id, with_results=False):
+        """
+        Invokes detect_access_token for accesstoken validation and if it's valid, returns the state and
+        progress of a job, along with the results of its completed chunks if with_results is set
+        """
+        resp, code, is_valid = self.detect_access_token(auth_url, headers, auth_headers)
+        if not is_valid:
+            return resp, code
+
+        job = job_runner.store.get(job_id)
+        if job is None:
+            return dict(status=404, message=f'Job {job_id} not found'), 404
+        if job['state'] == FAILED:
+            job['message'] = job['message'] or 'Job failed'
+        else:
+            job['message'] = f"Job {job['state']}, {job['completed']} of {job['total']} apps processed"
+        if with_results:
+            job['results'] = job_runner.store.results(job_id)
+        return dict(status=200, **job), 200
+
+def read_ndjson_chunks(lines, chunk_size):
+    """
+    Reads newline delimited json records and yields them in chunks of at most chunk_size records,
+    along with an error record for each line that is not a json object
+    """
+    chunk  = []
+    errors = []
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            chunk.append(record)
+        else:
+            errors.append(dict(status=400, message=f'Line {line_number} is not a json object'))
+        if len(chunk) >= chunk_size:
+            yield chunk, errors
+            chunk, errors = [], []
+    if chunk or errors:
+        yield chunk, errors
+
 def do_standardization(auth_url,headers,auth_headers,app_data):
     """
     Creates the instance for Planner Class and invoke containerization_plan method
@@ -222,13 +351,41 @@ def do_planning(auth_url, headers, auth_headers, assessment_data, catalog):
 
     return resp, code
 
-def do_clustering(auth_url, headers, auth_headers, assessment_data):
+def do_clustering(auth_url, headers, auth_headers, assessment_data, mode='unique', threshold=None):
     """
     Creates the instance for Clustering Class and invoke clustering method
     """
     controller = None
     if not controller:
         controller = Functions()
-    resp, code = controller.clustering(auth_url, headers, auth_headers, assessment_data)
+    resp, code = controller.clustering(auth_url, headers, auth_headers, assessment_data, mode, threshold)
+
+    return resp, code
+
+def do_assessment_stream(auth_url, headers, auth_headers, lines, chunk_size):
+    """
+    Creates the instance for Functions Class and invoke assessment_stream method
+    """
+    controller = Functions()
+    return controller.assessment_stream(auth_url, headers, auth_headers, lines, chunk_size)
 
-    return resp, code
\ No newline at end of file
+def do_planning_stream(auth_url, headers, auth_headers, lines, chunk_size, catalog):
+    """
+    Creates the instance for Functions Class and invoke planning_stream method
+    """
+    controller = Functions(catalog=catalog)
+    return controller.planning_stream(auth_url, headers, auth_headers, lines, chunk_size, catalog)
+
+def do_submit_job(auth_url, headers, auth_headers, operation, data, catalog=None):
+    """
+    Creates the instance for Functions Class and invoke submit_job method
+    """
+    controller = Functions(catalog=catalog) if catalog else Functions()
+    return controller.submit_job(auth_url, headers, auth_headers, operation, data, catalog)
+
+def do_job_status(auth_url, headers, auth_headers, job_id, with_results=False):
+    """
+    Creates the instance for Functions Class and invoke job_status method
+    """
+    controller = Functions()
+    return controller.job_status(auth_url, headers, auth_headers, job_id, with_results)
@@ -15,9 +15,9 @@
 ################################################################################
 
 import os
-import json
 import logging
 from service.utils import Utils
+from service.kg_context import get_kg_context, base_OS
 
 import configparser
 
@@ -30,100 +30,41 @@ config.read([common, kg])
 class InferTech:
     def __init__(self):
         """
-        Initialize and loads the class mapper and OS compatability KG json files
-        """        
-        class_type_mapper_filepath = os.path.join(config['general']['kg_dir'], config['filenames']['class_type_mapper'])
-
-        if os.path.exists(class_type_mapper_filepath):
-            with open(class_type_mapper_filepath, 'r') as f:
-                self.__class_type_mapper = json.load(f)
-        else:
-            self.__class_type_mapper = {}
-            logging.error(f'class_type_mapper[{class_type_mapper_filepath}] is empty or not exists')
-        
-        compatibilityOSKG_filepath = os.path.join(config['general']['kg_dir'], config['filenames']['compatibilityOSKG'])
-
-        if os.path.exists(compatibilityOSKG_filepath):
-            with open(compatibilityOSKG_filepath, 'r') as f:
-                self.__compatibilityOSKG = json.load(f)
-        else:
-            self.__compatibilityOSKG = {}
-            logging.error(f'compatibilityOSKG[{compatibilityOSKG_filepath}] is empty or not exists')    
-
-    def __identify_parent_OS(self, child):
+        Initialize with the class mapper and OS compatability KGs of the shared KG context
         """
-        Identify the appropriate  parent operating System
-        """
-        child_class_variants = [child, child+'|*']
-        candidate_OS = []
-        for child_class in child_class_variants:
-            if child_class in self.__compatibilityOSKG:
-                candidate_OS.extend(self.__compatibilityOSKG[child_class])
-        return candidate_OS
-
+        kg_context = get_kg_context()
+        self.__class_type_mapper = kg_context.class_type_mapper
+        self.__compatibilityOSKG = kg_context.compatibilityOSKG
+        self.__os_compatibility  = kg_context.os_compatibility
+        self.__class_types       = set(self.__class_type_mapper.get('mappings', {}).values())
 
     def __reduce_to_base_OS(self, os_list):
         """
         Reduce the OS to base forms
         """
-        final_os = []
-        if os_list:
-            for os in os_list:
-                if '|' in os:
-                    final_os.append(os.split('|')[0])
-                else:
-                    final_os.append(os)
-        return list(set(final_os))
+        return frozenset(base_OS(os) for os in os_list)
 
-    ## Update the list of recommended OS
-    def __update_recommended_OS(self, candidate_OS, recommended_OS):
+    ## Update the set of recommended OS
+    def __update_recommended_OS(self, os_compatibility, recommended_OS):
         """
-        Updates the list of recommended OS
+        Updates the set of recommended OS
         """
-        if not recommended_OS or len(recommended_OS) == 0:
+        if not recommended_OS:
             return recommended_OS
-        if not candidate_OS or len(candidate_OS) == 0:
-            return []
-        if not set(recommended_OS).intersection(set(candidate_OS)):
-            reduced_candidate_OS = self.__reduce_to_base_OS(list(candidate_OS))
-            if not set(recommended_OS).intersection(set(reduced_candidate_OS)):
-                # recommended_OS = recommended_OS.union(set(candidate_OS))
-                reduced_recommended_OS = self.__reduce_to_base_OS(list(recommended_OS))
-                if not set(reduced_recommended_OS).intersection(set(reduced_candidate_OS)):
-                    return []
-                else:
-                    return list(set(reduced_recommended_OS).intersection(set(reduced_candidate_OS)))
-            else:
-                recommended_OS = list(set(recommended_OS).intersection(set(reduced_candidate_OS)))
-        else:
-            recommended_OS = list(set(recommended_OS).intersection(set(candidate_OS)))
-        return recommended_OS
-
-    def __get_candidate_OS(self, app_tech):
-        '''
-        Calls identify_parent_os method to figure out the parent operating system for the given technology
-        '''
-        tech_list = app_tech.split(', ')
-        candidate_OS = []
-        for tech in tech_list:
-            candidate_OS.extend(self.__identify_parent_OS(tech))
-        return candidate_OS
-    
-    def __check_OS_compatible(self, candidate_OS, input_OS):
+        common_OS = recommended_OS & os_compatibility.candidate_OS
+        if not common_OS:
+            common_OS = recommended_OS & os_compatibility.reduced_OS
+            if not common_OS:
+                common_OS = self.__reduce_to_base_OS(recommended_OS) & os_compatibility.reduced_OS
+        return common_OS
+
+    def __check_OS_compatible(self, os_compatibility, input_OS, reduced_input_OS):
         """
         Checks the OS compatibility between input operating system and identified operating system for given tech.
         """
-        if not candidate_OS or len(candidate_OS) == 0 or not input_OS or len(input_OS) == 0:
+        if not input_OS:
             return False
-        if not set(candidate_OS).intersection(set(input_OS)):
-            reduced_candidate_OS = self.__reduce_to_base_OS(list(candidate_OS))
-            reduced_input_OS = self.__reduce_to_base_OS(input_OS)
-            if set(reduced_candidate_OS).intersection(set(reduced_input_OS)):
-                return True
-            else:
-                return False
-        else:
-            return True
+        return bool(os_compatibility.candidate_OS & input_OS) or bool(os_compatibility.reduced_OS & reduced_input_OS)
 
 
     def infer_missing_tech(self, appL):
@@ -137,7 +78,7 @@ class InferTech:
             return appL
         for app in appL:
 
-            for x in set(self.__class_type_mapper['mappings'].values()):
+            for x in self.__class_types:
                 if x not in app:
                     app[x] = {}
             ## Missing technology inference
@@ -216,7 +157,7 @@ class InferTech:
             app['RepackageOS'] = []
 
             #### Infer OS
-            recommended_OS = []
+            recommended_OS = frozenset()
             incompatible_tech = []
             containerize_not_supported = []
             if (app['Lang'] or app['App'] or app['App Server'] or app['Runtime']):
@@ -227,6 +168,8 @@ class InferTech:
 
                 if len(app_OS) == 0:
                     is_need_check_compatible = False
+                app_OS = frozenset(app_OS)
+                reduced_app_OS = self.__reduce_to_base_OS(app_OS)
 
                 child_types = ["App Server", "App", "Runtime","Lang"]
                 is_init_recommended_OS = False
@@ -235,26 +178,25 @@ class InferTech:
                         for child in Utils.getStandardEntityString(app[child_type]).split(', '):
 
                             if child != 'score':
-                                candidate_OS = self.__get_candidate_OS(child)
-                                if not candidate_OS or len(candidate_OS) == 0:
+                                os_compatibility = self.__os_compatibility.get(child, None)
+                                if os_compatibility is None:
                                     logging.error(f'[{child}] can not find any OS in the knowledge graph')
                                 else:
-                                    reduced_candidate_OS = self.__reduce_to_base_OS(candidate_OS)
-                                    if 'Linux' in reduced_candidate_OS:
+                                    if os_compatibility.is_linux:
                                         app['Linux'][child_type].append(child)
                                         linux_compatability = True
-                                    elif 'Windows' in reduced_candidate_OS:
+                                    elif os_compatibility.is_windows:
                                         app['Windows'][child_type].append(child)
                                         windows_compatability = True
                                     else:
                                         containerize_not_supported.append(child)
                                     if not is_init_recommended_OS:
-                                        recommended_OS = list(set(candidate_OS))
+                                        recommended_OS = os_compatibility.candidate_OS
                                         is_init_recommended_OS = True
                                     else:
-                                        recommended_OS = self.__update_recommended_OS(candidate_OS, recommended_OS)
+                                        recommended_OS = self.__update_recommended_OS(os_compatibility, recommended_OS)
                                     if is_need_check_compatible:
-                                        if not self.__check_OS_compatible(candidate_OS, app_OS):
+                                        if not self.__check_OS_compatible(os_compatibility, app_OS, reduced_app_OS):
                                             incompatible_tech.append(child)
 
                 if len(incompatible_tech) > 0:
@@ -269,15 +211,14 @@ class InferTech:
                     app['RepackageOS'].append('Windows')
 
                 reduced_recommended_OS = self.__reduce_to_base_OS(recommended_OS)
-                reduced_recommended_OS = list(set(reduced_recommended_OS))
                 
                 ## No Input OS 
                 if not is_need_check_compatible:
                     if len(recommended_OS) == 1:
-                        app['Inferred']['OS'].append(recommended_OS[0])
+                        app['Inferred']['OS'].append(next(iter(recommended_OS)))
                     else:
                         if reduced_recommended_OS:
                             if len(reduced_recommended_OS) == 1:
-                                app['Inferred']['OS'].append(reduced_recommended_OS[0])
+                                app['Inferred']['OS'].append(next(iter(reduced_recommended_OS)))
                 app['Recommended OS'] = ', '.join(filter(None, sorted(reduced_recommended_OS)))
         return appL
@@ -0,0 +1,285 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import sqlite3
+import threading
+import configparser
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+QUEUED    = 'queued'
+RUNNING   = 'running'
+COMPLETED = 'completed'
+FAILED    = 'failed'
+
+# Message of the jobs failed because the worker running them stopped
+WORKER_STOPPED = 'worker stopped'
+
+
+def _is_alive(pid):
+    """
+    Returns whether a process of this host is running
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore():
+    """
+    SQLite store of asynchronous jobs and of the results of their chunks. The store is a file on disk so that
+    every worker process can report the status and results of a job, whichever worker runs it.
+    Each job records the pid and host of the worker owning it, and its updated time is the heartbeat of that worker:
+    queued or running jobs whose worker is gone, or whose heartbeat is older than stale_timeout seconds, are failed.
+    """
+
+    def __init__(self, db_path, ttl=86400, stale_timeout=300):
+        """
+        Init method for JobStore Class
+        """
+        self.db_path       = db_path
+        self.ttl           = ttl
+        self.stale_timeout = stale_timeout
+        with self.__connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, operation TEXT, state TEXT, '
+                         'total INTEGER, completed INTEGER, created REAL, updated REAL, message TEXT, '
+                         'pid INTEGER, host TEXT)')
+            conn.execute('CREATE TABLE IF NOT EXISTS chunks (job_id TEXT, chunk INTEGER, results TEXT, '
+                         'PRIMARY KEY (job_id, chunk))')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+            # Stores created before jobs had an owner
+            if 'pid' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN pid INTEGER')
+            if 'host' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN host TEXT')
+
+    def __connect(self):
+        return closing(sqlite3.connect(self.db_path, timeout=30))
+
+    def __execute(self, *statements):
+        """
+        Runs the statements in a single transaction
+        """
+        with self.__connect() as conn, conn:
+            for statement, params in statements:
+                conn.execute(statement, params)
+
+    def create(self, operation, total):
+        """
+        Registers a new queued job of total apps owned by the calling process, returns its id.
+        Jobs not updated for ttl seconds are purged.
+        """
+        job_id = uuid.uuid4().hex
+        now    = time.time()
+        self.__execute(('DELETE FROM chunks WHERE job_id IN (SELECT job_id FROM jobs WHERE updated < ?)', (now - self.ttl,)),
+                       ('DELETE FROM jobs WHERE updated < ?', (now - self.ttl,)),
+                       ('INSERT INTO jobs (job_id, operation, state, total, completed, created, updated, message, pid, host) '
+                        'VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?, ?)',
+                        (job_id, operation, QUEUED, total, now, now, '', os.getpid(), socket.gethostname())))
+        return job_id
+
+    def set_state(self, job_id, state, message=''):
+        """
+        Updates the state of a job, unless it is already completed or failed
+        """
+        self.__execute(('UPDATE jobs SET state = ?, message = ?, updated = ? WHERE job_id = ? AND state IN (?, ?)',
+                        (state, message, time.time(), job_id, QUEUED, RUNNING)))
+
+    def heartbeat(self, job_ids):
+        """
+        Refreshes the updated time of the queued and running jobs among job_ids
+        """
+        job_ids = list(job_ids)
+        if job_ids:
+            self.__execute((f'UPDATE jobs SET updated = ? WHERE state IN (?, ?) AND job_id IN ({", ".join("?" * len(job_ids))})',
+                            (time.time(), QUEUED, RUNNING, *job_ids)))
+
+    def __is_stopped(self, pid, host, updated):
+        """
+        Returns whether the worker owning a queued or running job stopped
+        """
+        if updated < time.time() - self.stale_timeout:
+            return True
+        return pid is not None and host == socket.gethostname() and not _is_alive(pid)
+
+    def fail_stopped(self):
+        """
+        Fails the queued and running jobs whose worker stopped, returns their ids
+        """
+        with self.__connect() as conn:
+            rows = conn.execute('SELECT job_id, pid, host, updated FROM jobs WHERE state IN (?, ?)', (QUEUED, RUNNING)).fetchall()
+        job_ids = [job_id for job_id, pid, host, updated in rows if self.__is_stopped(pid, host, updated)]
+        for job_id in job_ids:
+            self.set_state(job_id, FAILED, WORKER_STOPPED)
+        return job_ids
+
+    def add_chunk(self, job_id, chunk, num_apps, results):
+        """
+        Stores the results of a chunk of num_apps apps and adds them to the progress of the job
+        """
+        self.__execute(('INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)', (job_id, chunk, json.dumps(results))),
+                       ('UPDATE jobs SET completed = completed + ?, updated = ? WHERE job_id = ?',
+                        (num_apps, time.time(), job_id)))
+
+    def get(self, job_id):
+        """
+        Returns the status of a job, None if it does not exist. A queued or running job whose worker stopped is failed.
+        """
+        with self.__connect() as conn:
+            row = conn.execute('SELECT job_id, operation, state, total, completed, created, updated, message, pid, host '
+                               'FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(['job_id', 'operation', 'state', 'total', 'completed', 'created', 'updated', 'message'], row))
+        if job['state'] in [QUEUED, RUNNING] and self.__is_stopped(row[8], row[9], job['updated']):
+            self.set_state(job_id, FAILED, WORKER_STOPPED)
+            return self.get(job_id)
+        return job
+
+    def results(self, job_id):
+        """
+        Returns the results of the completed chunks of a job in input order
+        """
+        results = []
+        with self.__connect() as conn:
+            for (chunk_results,) in conn.execute('SELECT results FROM chunks WHERE job_id = ? ORDER BY chunk', (job_id,)):
+                results.extend(json.loads(chunk_results))
+        return results
+
+
+class JobRunner():
+    """
+    Background thread pool configured by the [jobs] section of common.ini. Runs the payload of a job in chunks
+    of apps and stores the results of every chunk in the JobStore as soon as it is done. While it has jobs, a
+    heartbeat thread refreshes them every third of stale_timeout so that other workers do not fail them.
+    """
+
+    def __init__(self):
+        """
+        Init method for JobRunner Class
+        """
+        self.db_file   = os.path.join('db', 'jobs.db')
+        self.ttl       = 86400
+        self.workers   = 1
+        self.chunksize = 100
+        self.stale_timeout = 300
+        try:
+            self.db_file   = os.path.join(config['general']['db_dir'], config['jobs'].get('db_file', 'jobs.db'))
+            self.ttl       = int(config['jobs'].get('ttl', 86400))
+            self.workers   = max(1, int(config['jobs'].get('workers', 1)))
+            self.chunksize = max(1, int(config['jobs'].get('chunksize', 100)))
+            self.stale_timeout = float(config['jobs'].get('stale_timeout', 300))
+        except KeyError as k:
+            logging.error(f'{k} is not a key in your common.ini file.')
+
+        self.__store     = None
+        self.__executor  = None
+        self.__heartbeat = None
+        self.__stop      = threading.Event()
+        self.__jobs      = set()  # Ids of the queued and running jobs of this runner
+        self.__lock      = threading.Lock()
+
+    @property
+    def store(self):
+        """
+        Returns the job store, creating its database and failing the jobs of stopped workers on first use
+        """
+        with self.__lock:
+            if self.__store is None:
+                self.__store = JobStore(self.db_file, self.ttl, self.stale_timeout)
+                for job_id in self.__store.fail_stopped():
+                    logging.warning(f'Job {job_id} failed: {WORKER_STOPPED}')
+            return self.__store
+
+    def __get_executor(self):
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor  = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tca-job')
+                self.__stop.clear()
+                self.__heartbeat = threading.Thread(target=self.__beat, name='tca-job-heartbeat', daemon=True)
+                self.__heartbeat.start()
+            return self.__executor
+
+    def __beat(self):
+        """
+        Refreshes the heartbeat of the jobs of this runner until it is closed
+        """
+        while not self.__stop.wait(self.stale_timeout / 3):
+            with self.__lock:
+                job_ids = list(self.__jobs)
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception as e:
+                logging.error(f'Job heartbeat failed: {str(e)}')
+
+    def submit(self, operation, apps, process_chunk):
+        """
+        Queues a job running process_chunk on the apps in chunks, returns its id
+        """
+        job_id = self.store.create(operation, len(apps))
+        with self.__lock:
+            self.__jobs.add(job_id)
+        self.__get_executor().submit(self.__run, job_id, apps, process_chunk)
+        return job_id
+
+    def __run(self, job_id, apps, process_chunk):
+        """
+        Runs a job, storing the results of each chunk
+        """
+        store = self.store
+        try:
+            store.set_state(job_id, RUNNING)
+            for chunk, i in enumerate(range(0, len(apps), self.chunksize)):
+                chunk_apps = apps[i:i+self.chunksize]
+                store.add_chunk(job_id, chunk, len(chunk_apps), process_chunk(chunk_apps))
+            store.set_state(job_id, COMPLETED)
+        except Exception as e:
+            logging.error(f'Job {job_id} failed: {str(e)}')
+            store.set_state(job_id, FAILED, 'Input data format doesn\'t match the format expected by TCA')
+        finally:
+            with self.__lock:
+                self.__jobs.discard(job_id)
+
+    def close(self):
+        """
+        Waits for the running jobs and stops the threads
+        """
+        with self.__lock:
+            executor, heartbeat = self.__executor, self.__heartbeat
+            self.__executor  = None
+            self.__heartbeat = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            self.__stop.set()
+            heartbeat.join()
+
+
+job_runner = JobRunner()
@@ -0,0 +1,228 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import sys
+import json
+import mmap
+import array
+import struct
+from collections.abc import Mapping, MutableMapping
+
+# Compiled KG artifact written by create_kg_artifact in kg_utils/kg_utils.py:
+#   magic (8 bytes) | header length (uint32) | json header | body aligned to 4 bytes
+# The header maps each KG json file name to its section in the body. Strings of the indexes are interned in a
+# string table of uint32 offsets followed by the utf-8 bytes of the strings. An index, e.g. an inverted image KG or
+# the entity versions KG, is stored as CSR arrays of uint32: the string ids of its keys sorted by key, the row pointers
+# and the string ids of the values, which are rows of width strings when width is set. The container images of an
+# image KG are stored as records in KG order: the string ids of the image names, their positions sorted by name, the
+# uint32 offsets of the records and the compact json of each image. When a section has a field, the index or records are the value of that field of
+# the KG, next to the scalars of the KG. Other KGs are stored as compact json. All integers are little endian.
+MAGIC   = b'TCAKG\x00\x00\x01'
+VERSION = 2
+
+
+def _find(artifact, keys, key, order=None):
+    """
+    Returns the position of key in the string ids keys by binary search, -1 if it is not in keys.
+    keys are sorted by key, or in the order of the positions order when it is set.
+    """
+    string = artifact.string
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if string(keys[mid if order is None else order[mid]]) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < len(keys):
+        row = lo if order is None else order[lo]
+        if string(keys[row]) == key:
+            return row
+    return -1
+
+
+class InvertedIndex(Mapping):
+    """
+    Read-only mapping of an index section of a KG artifact, e.g. entity -> tuple of container images, or
+    entity -> list of [version, release date, end date, latest version] rows. Keys are found by binary search and
+    values are decoded on access.
+    """
+
+    def __init__(self, artifact, section):
+        self.__artifact = artifact
+        self.__scalars  = {} if 'field' in section else section.get('scalars', {})
+        self.__width    = section.get('width', 0)
+        count = section['count']
+        nnz   = section['nnz']
+        offset = section['offset']
+        self.__keys    = artifact.uint32_array(offset, count)
+        self.__indptr  = artifact.uint32_array(offset + 4 * count, count + 1)
+        self.__indices = artifact.uint32_array(offset + 4 * (2 * count + 1), nnz)
+
+    def __getitem__(self, key):
+        if key in self.__scalars:
+            return self.__scalars[key]
+        row = _find(self.__artifact, self.__keys, key) if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        string = self.__artifact.string
+        values = self.__indices[self.__indptr[row]:self.__indptr[row+1]]
+        if not self.__width:
+            return tuple(string(i) for i in values)
+        return [[string(i) for i in values[j:j+self.__width]] for j in range(0, len(values), self.__width)]
+
+    def __contains__(self, key):
+        return key in self.__scalars or (isinstance(key, str) and _find(self.__artifact, self.__keys, key) >= 0)
+
+    def __iter__(self):
+        yield from self.__scalars
+        for i in self.__keys:
+            yield self.__artifact.string(i)
+
+    def __len__(self):
+        return len(self.__scalars) + len(self.__keys)
+
+
+class Records(MutableMapping):
+    """
+    Container images of an image KG section of a KG artifact, mapping the container name to the image.
+    Images are decoded on first access. Images added to the mapping, e.g. base OS images, are kept in memory.
+    """
+
+    def __init__(self, artifact, section):
+        self.__artifact = artifact
+        count  = section['count']
+        offset = section['offset']
+        self.__keys    = artifact.uint32_array(offset, count)
+        self.__order   = artifact.uint32_array(offset + 4 * count, count)
+        self.__offsets = artifact.uint32_array(offset + 8 * count, count + 1)
+        self.__data    = offset + 4 * (3 * count + 1)
+        self.__records = {}  # Decoded images by row
+        self.__added   = {}
+
+    def __getitem__(self, key):
+        if key in self.__added:
+            return self.__added[key]
+        row = _find(self.__artifact, self.__keys, key, self.__order) if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        record = self.__records.get(row, None)
+        if record is None:
+            start  = self.__data + self.__offsets[row]
+            record = json.loads(self.__artifact.read(start, self.__offsets[row+1] - self.__offsets[row]).decode('utf-8'))
+            self.__records[row] = record
+        return record
+
+    def __contains__(self, key):
+        return key in self.__added or (isinstance(key, str) and _find(self.__artifact, self.__keys, key, self.__order) >= 0)
+
+    def __setitem__(self, key, image):
+        self.__added[key] = image
+
+    def __delitem__(self, key):
+        raise TypeError('Images of the KG artifact are read-only')
+
+    def __iter__(self):
+        for i in self.__keys:
+            key = self.__artifact.string(i)
+            if key not in self.__added:
+                yield key
+        yield from self.__added
+
+    def __len__(self):
+        return len(self.__keys) + sum(1 for key in self.__added if _find(self.__artifact, self.__keys, key, self.__order) < 0)
+
+
+class KGArtifact():
+    """
+    Memory-mapped compiled KG artifact. Worker processes mapping the same file share one copy of it in the page cache.
+    """
+
+    def __init__(self, path):
+        """
+        Init method for KGArtifact Class
+        Maps the artifact and reads its header, raises ValueError if the file is not a KG artifact.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.__mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a KG artifact')
+        header_len, = struct.unpack_from('<I', self.__mm, len(MAGIC))
+        header_end  = len(MAGIC) + 4 + header_len
+        self.header = json.loads(self.__mm[len(MAGIC)+4:header_end].decode('utf-8'))
+        if self.header.get('format_version', None) != VERSION:
+            raise ValueError(f'{path} has unsupported format version {self.header.get("format_version", None)}')
+        self.__body = header_end + (-header_end % 4)
+
+        strings = self.header['strings']
+        self.__string_offsets = self.uint32_array(strings['offset'], strings['count'] + 1)
+        self.__string_data    = self.__body + strings['offset'] + 4 * (strings['count'] + 1)
+        self.__strings        = [None] * strings['count']  # Decoded strings, filled on first access
+
+    @property
+    def kg_version(self):
+        return self.header.get('kg_version', None)
+
+    def uint32_array(self, offset, count):
+        """
+        Returns the count uint32 at offset in the body, without a copy on little endian platforms
+        """
+        start = self.__body + offset
+        view  = memoryview(self.__mm)[start:start + 4 * count]
+        if sys.byteorder == 'little':
+            return view.cast('I')
+        values = array.array('I', view.tobytes())
+        values.byteswap()
+        return values
+
+    def read(self, offset, length):
+        """
+        Returns length bytes at offset in the body
+        """
+        start = self.__body + offset
+        return self.__mm[start:start + length]
+
+    def string(self, i):
+        """
+        Returns the interned string of id i
+        """
+        s = self.__strings[i]
+        if s is None:
+            start = self.__string_data + self.__string_offsets[i]
+            end   = self.__string_data + self.__string_offsets[i+1]
+            s = self.__mm[start:end].decode('utf-8')
+            self.__strings[i] = s
+        return s
+
+    def __contains__(self, name):
+        return name in self.header['sections']
+
+    def load(self, name):
+        """
+        Returns the KG of a json file name, as an InvertedIndex for indexes, as a dict of its scalars and of the
+        InvertedIndex or Records of its field when the section has a field, and as a dict otherwise
+        """
+        section = self.header['sections'][name]
+        if section['type'] == 'index':
+            kg = InvertedIndex(self, section)
+        elif section['type'] == 'records':
+            kg = Records(self, section)
+        else:
+            return json.loads(self.read(section['offset'], section['length']).decode('utf-8'))
+        if 'field' in section:
+            return dict(section.get('scalars', {}), **{section['field']: kg})
+        return kg
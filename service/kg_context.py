@@ -0,0 +1,275 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import json
+import logging
+import threading
+import configparser
+import numpy as np
+from collections.abc import Mapping
+
+from service.kg_artifact import KGArtifact
+from service.kg_sqlite import SQLiteKG
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+kg     = os.path.join("config", "kg.ini")
+config.read([common, kg])
+
+
+class CatalogKG():
+    """
+    Image knowledge graph of one container catalog, with the base OS images of the catalog merged in
+    """
+
+    def __init__(self, catalog, imageKG, inverted_imageKG, osBaseImages):
+        self.catalog          = catalog
+        self.imageKG          = imageKG
+        self.inverted_imageKG = inverted_imageKG
+        self.osBaseImages     = osBaseImages
+
+        # Maps entity (including OS and parent OS) to the set of images containing it
+        if isinstance(inverted_imageKG, dict):
+            self.inverted_image_sets = {entity: frozenset(images) for entity, images in inverted_imageKG.items()}
+        else:
+            self.inverted_image_sets = ImageSets(inverted_imageKG)
+        self.__pure_lang_images = None
+
+    @property
+    def pure_lang_images(self):
+        """
+        Images without any App, App Server or Runtime, i.e. pure language images, found on first use so that
+        images of the KG artifact or the SQLite db are not all decoded when the catalog is loaded
+        """
+        if self.__pure_lang_images is None:
+            self.__pure_lang_images = frozenset(image_name for image_name, image in self.imageKG.get('Container Images', {}).items()
+                                                if all(len(image.get(child_type) or []) == 0 for child_type in ['App', 'App Server', 'Runtime']))
+        return self.__pure_lang_images
+
+
+class ImageSets(Mapping):
+    """
+    Sets of images of an inverted image KG read from the KG artifact or the SQLite db, built on first lookup
+    """
+
+    def __init__(self, inverted_imageKG):
+        self.__inverted_imageKG = inverted_imageKG
+        self.__sets = {}
+
+    def __getitem__(self, entity):
+        images = self.__sets.get(entity, None)
+        if images is None:
+            images = frozenset(self.__inverted_imageKG[entity])
+            self.__sets[entity] = images
+        return images
+
+    def __contains__(self, entity):
+        return entity in self.__sets or entity in self.__inverted_imageKG
+
+    def __iter__(self):
+        return iter(self.__inverted_imageKG)
+
+    def __len__(self):
+        return len(self.__inverted_imageKG)
+
+    def __bool__(self):
+        return bool(self.__inverted_imageKG)
+
+
+class OSCompatibility():
+    """
+    Operating systems compatible with an entity, as used to infer the OS of an app
+    """
+    __slots__ = ['candidate_OS', 'reduced_OS', 'is_linux', 'is_windows']
+
+    def __init__(self, candidate_OS):
+        self.candidate_OS = frozenset(candidate_OS)
+        self.reduced_OS   = frozenset(base_OS(os) for os in self.candidate_OS)
+        self.is_linux     = 'Linux' in self.reduced_OS
+        self.is_windows   = 'Windows' in self.reduced_OS
+
+
+def base_OS(os):
+    """
+    Returns the base form of an OS, i.e. the OS family before the first '|'
+    """
+    return os.split('|')[0]
+
+
+class KGContext():
+    """
+    Knowledge graph json files loaded once per process and shared by every service component.
+    The loaded data is read-only: components must not modify it.
+    """
+
+    def __init__(self):
+        """
+        Init method for KGContext Class
+        Loads the knowledge graph files used by all catalogs. Catalog image KGs are loaded on first use.
+        """
+        self.__kg_dir   = config['general']['kg_dir']
+        self.__catalogs = {}
+        self.__lock     = threading.Lock()
+        self.__artifact = None
+        self.__sqlite   = None
+        kg_format = config['general'].get('kg_format', 'json').lower()
+        if kg_format == 'binary':
+            self.__artifact = self.__load_artifact(config['filenames'].get('kg_artifact', 'kg.bin'))
+        elif kg_format == 'sqlite':
+            self.__sqlite = self.__load_sqlite(config['database'].get('database_path', os.path.join('db', config['general']['version'] + '.db')))
+
+        self.class_type_mapper = self.__load_json('class_type_mapper', config['filenames']['class_type_mapper'])
+        self.compatibilityOSKG = self.__load_json('compatibilityOSKG', config['filenames']['compatibilityOSKG'])
+        self.COTSKG            = self.__load_json('COTSKG', config['filenames']['COTSKG'])
+        self.entities          = self.__load_json('entities', config['tca']['entities'])
+        if self.__sqlite is not None:
+            self.entity_versions = self.__sqlite.entity_versions()
+        else:
+            self.entity_versions = self.__load_json('entity_versionsKG', config['filenames']['entity_versionsKG'])
+
+        # Maps entity id to (entity name, entity type name)
+        self.entity_data = {}
+        # Entity names in the order of the entities KG
+        self.entity_names = np.empty(len(self.entities.get("data", {})), dtype='object')
+        for i, entity in enumerate(self.entities.get("data", {}).values()):
+            self.entity_data[entity["entity_id"]] = (entity["entity_name"], entity["entity_type_name"])
+            self.entity_names[i] = entity["entity_name"]
+        self.entity_names.flags.writeable = False
+        # Maps entity name to its positions in entity_names
+        self.entity_columns = {}
+        for i, entity_name in enumerate(self.entity_names):
+            self.entity_columns[entity_name] = self.entity_columns.get(entity_name, ()) + (i,)
+
+        # Maps entity and its parent form to the operating systems it is compatible with
+        self.os_compatibility = {}
+        for entity in self.compatibilityOSKG:
+            for child in [entity, entity[:-2] if entity.endswith('|*') else entity]:
+                if child not in self.os_compatibility:
+                    candidate_OS = set()
+                    for child_class in [child, child+'|*']:
+                        candidate_OS.update(self.compatibilityOSKG.get(child_class, []))
+                    if candidate_OS:
+                        self.os_compatibility[child] = OSCompatibility(candidate_OS)
+
+    def __load_artifact(self, file_name):
+        """
+        Memory-maps the compiled KG artifact, returns None if it is missing or was compiled from another KG version
+        """
+        filepath = os.path.join(self.__kg_dir, file_name)
+        if not os.path.exists(filepath):
+            logging.error(f'KG artifact[{filepath}] not exists, loading the json knowledge graphs')
+            return None
+        try:
+            artifact = KGArtifact(filepath)
+        except (OSError, ValueError) as e:
+            logging.error(f'{str(e)}, loading the json knowledge graphs')
+            return None
+        if artifact.kg_version != config['general']['version']:
+            logging.error(f'KG artifact[{filepath}] is for KG version {artifact.kg_version}, loading the json knowledge graphs')
+            return None
+        return artifact
+
+    def __load_sqlite(self, db_path):
+        """
+        Opens the SQLite KG backend, returns None if the db does not exist
+        """
+        if not os.path.exists(db_path):
+            logging.error(f'KG db[{db_path}] not exists, loading the json knowledge graphs')
+            return None
+        return SQLiteKG(db_path, config['general']['version'], config.getint('kg_sqlite', 'row_cache_size', fallback=10000))
+
+    @property
+    def sqlite(self):
+        """
+        Returns the SQLite KG backend, None when the KG is loaded from files
+        """
+        return self.__sqlite
+
+    def __load_json(self, name, file_name):
+        """
+        Loads a json file from the KG artifact or the kg directory, returns an empty dict if it does not exist
+        """
+        if self.__artifact is not None and file_name in self.__artifact:
+            return self.__artifact.load(file_name)
+        filepath = os.path.join(self.__kg_dir, file_name)
+        if os.path.exists(filepath):
+            with open(filepath, 'r') as f:
+                return json.load(f)
+        logging.error(f'{name}[{filepath}] is empty or not exists')
+        return {}
+
+    def __load_catalog(self, catalog):
+        """
+        Loads the image, inverted image and base OS KGs of a catalog
+        """
+        if "openshift" in [catalog]:
+            baseOS = catalog + "_baseOSKG"
+        else:
+            baseOS = "baseOSKG"
+
+        if self.__sqlite is not None and catalog in self.__sqlite.catalogs:
+            imageKG          = self.__sqlite.image_kg(catalog)
+            inverted_imageKG = self.__sqlite.inverted_image_kg(catalog)
+        else:
+            imageKG          = self.__load_json('imageKG', config['filenames'][catalog + "_imageKG"])
+            inverted_imageKG = self.__load_json('inverted_imageKG', config['filenames']["inverted_" + catalog + "_imageKG"])
+        baseOSKG         = self.__load_json('baseOSKG', config['filenames'][baseOS])
+
+        osBaseImages = {}
+        for image_name in baseOSKG.get('Container Images', {}):
+            osBaseImages[baseOSKG['Container Images'][image_name]['OS'][0]['Class']] = image_name
+            if imageKG:
+                imageKG['Container Images'][image_name] = baseOSKG['Container Images'][image_name]
+
+        return CatalogKG(catalog, imageKG, inverted_imageKG, osBaseImages)
+
+    def catalog(self, catalog="dockerhub"):
+        """
+        Returns the CatalogKG of a catalog, loading it on first use
+        """
+        catalog_kg = self.__catalogs.get(catalog, None)
+        if catalog_kg is None:
+            with self.__lock:
+                catalog_kg = self.__catalogs.get(catalog, None)
+                if catalog_kg is None:
+                    catalog_kg = self.__load_catalog(catalog)
+                    self.__catalogs[catalog] = catalog_kg
+        return catalog_kg
+
+    def load_all_catalogs(self):
+        """
+        Loads the image KGs of every catalog listed in the catalog names KG
+        """
+        catalog_names = self.__load_json('catalogKG', config['filenames']['catalogKG'])
+        for catalog in catalog_names.get('names', []):
+            self.catalog(catalog)
+        return self
+
+
+_kg_context = None
+_kg_context_lock = threading.Lock()
+
+def get_kg_context():
+    """
+    Returns the process wide KGContext, loading it on first use
+    """
+    global _kg_context
+    if _kg_context is None:
+        with _kg_context_lock:
+            if _kg_context is None:
+                _kg_context = KGContext()
+    return _kg_context
@@ -0,0 +1,284 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from urllib.request import pathname2url
+from packaging import version as pv
+
+# Class types of the entity columns of the <catalog>_images tables, in column order
+class_types   = ["OS", "Lang", "Lib", "App", "App Server", "Plugin", "Runlib", "Runtime"]
+class_columns = "OS, lang, lib, app, app_server, plugin, runlib, runtime"
+# Matches the images containing entity ?1, each column has an index created by kg_utils.py
+class_match   = " OR ".join(f"{column} = ?1" for column in class_columns.split(", "))
+
+
+class SQLiteKG():
+    """
+    Knowledge graph read from the TCA SQLite db, as an alternative to the json files generated by kg_utils.py.
+    Image, inverted image and entity versions KGs are read-only mappings with the same content as the json files,
+    whose rows are looked up on access through a read-only connection per thread and kept in an LRU row cache.
+    """
+
+    def __init__(self, db_path, kg_version, cache_size=10000):
+        """
+        Init method for SQLiteKG Class
+        """
+        self.db_path    = db_path
+        self.kg_version = kg_version
+        self.cache_size = cache_size
+        self.hits       = 0
+        self.misses     = 0
+        self.__uri   = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(db_path)))
+        self.__local = threading.local()
+        self.__rows  = OrderedDict()  # Maps (statement, parameters) to the rows of the query
+        self.__lock  = threading.Lock()
+        self.catalogs = [row[0] for row in self.query('SELECT names FROM catalogs ORDER BY id')]
+
+    def __connection(self):
+        """
+        Returns the read-only connection of the calling thread, statements are prepared once per connection
+        """
+        conn = getattr(self.__local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.__uri, uri=True, cached_statements=256)
+            self.__local.conn = conn
+        return conn
+
+    def query(self, statement, params=()):
+        """
+        Returns the rows of a query, from the row cache if it was run before
+        """
+        key = (statement, params)
+        with self.__lock:
+            rows = self.__rows.get(key, None)
+            if rows is not None:
+                self.__rows.move_to_end(key)
+                self.hits += 1
+                return rows
+            self.misses += 1
+        rows = tuple(self.__connection().execute(statement, params).fetchall())
+        if self.cache_size > 0:
+            with self.__lock:
+                self.__rows[key] = rows
+                while len(self.__rows) > self.cache_size:
+                    self.__rows.popitem(last=False)
+        return rows
+
+    def scan(self, statement, params=()):
+        """
+        Iterates over the rows of a query without caching them
+        """
+        return self.__connection().execute(statement, params)
+
+    def columns(self, table):
+        """
+        Returns the column names of a table
+        """
+        return [row[1] for row in self.query(f'PRAGMA table_info({table})')]
+
+    def entity_name(self, entity_id):
+        """
+        Returns the KG name of an entity id, with the Windows and Linux parents named as in the json KGs
+        """
+        rows = self.query('SELECT entity_name FROM entities WHERE id = ?', (entity_id,))
+        if not rows:
+            raise KeyError(entity_id)
+        name = rows[0][0]
+        return name[:-2] if name in ['Windows|*', 'Linux|*'] else name
+
+    def entity_id(self, name):
+        """
+        Returns the id of the entity of a KG name, None if it does not exist
+        """
+        if name in ['Windows|*', 'Linux|*']:
+            return None
+        if name in ['Windows', 'Linux']:
+            name = name + '|*'
+        rows = self.query('SELECT id FROM entities WHERE entity_name = ?', (name,))
+        return rows[0][0] if rows else None
+
+    def __table(self, catalog):
+        if catalog not in self.catalogs:
+            raise KeyError(f'{catalog} is not a catalog of {self.db_path}')
+        return catalog + '_images'
+
+    def image_kg(self, catalog):
+        """
+        Returns the image KG of a catalog
+        """
+        return {"KG Version": self.kg_version, "Container Images": CatalogImages(self, self.__table(catalog))}
+
+    def inverted_image_kg(self, catalog):
+        """
+        Returns the inverted image KG of a catalog
+        """
+        return InvertedImages(self, self.__table(catalog))
+
+    def entity_versions(self):
+        """
+        Returns the entity versions KG
+        """
+        return {"Version": self.kg_version, "Entity": EntityVersions(self)}
+
+    def clear(self):
+        """
+        Removes all cached rows and resets the hit and miss counters
+        """
+        with self.__lock:
+            self.__rows.clear()
+            self.hits   = 0
+            self.misses = 0
+
+
+class CatalogImages(MutableMapping):
+    """
+    Container images of a catalog, mapping the container name to the image as in the json image KG.
+    Images added to the mapping, e.g. base OS images, are kept in memory.
+    """
+
+    def __init__(self, kg, table):
+        self.__kg      = kg
+        self.__table   = table
+        self.__columns = kg.columns(table)
+        self.__added   = {}
+
+    def __image(self, row):
+        image = {}
+        for class_id, type_name in zip(row[2:10], class_types):
+            if class_id is None and type_name != "OS":
+                image[type_name] = []
+            else:
+                image[type_name] = [{"Class": self.__kg.entity_name(class_id), "Variants": "", "Versions": "", "Type": type_name, "Subtype": ""}]
+        image["image_url"] = row[10]
+        for col_name, col_data in zip(self.__columns[11:], row[11:]):
+            image[col_name] = col_data
+        return image
+
+    def __getitem__(self, container_name):
+        if container_name in self.__added:
+            return self.__added[container_name]
+        rows = self.__kg.query(f'SELECT * FROM {self.__table} WHERE container_name = ? ORDER BY id DESC LIMIT 1', (container_name,))
+        if not rows:
+            raise KeyError(container_name)
+        return self.__image(rows[0])
+
+    def __setitem__(self, container_name, image):
+        self.__added[container_name] = image
+
+    def __delitem__(self, container_name):
+        raise TypeError('Images of the SQLite KG are read-only')
+
+    def __iter__(self):
+        for (container_name,) in self.__kg.scan(f'SELECT container_name FROM {self.__table} GROUP BY container_name ORDER BY MIN(id)'):
+            if container_name not in self.__added:
+                yield container_name
+        yield from self.__added
+
+    def __len__(self):
+        count = self.__kg.query(f'SELECT COUNT(DISTINCT container_name) FROM {self.__table}')[0][0]
+        return count + sum(1 for container_name in self.__added if not self.__in_table(container_name))
+
+    def __bool__(self):
+        return bool(self.__added) or bool(self.__kg.query(f'SELECT 1 FROM {self.__table} LIMIT 1'))
+
+    def __in_table(self, container_name):
+        return bool(self.__kg.query(f'SELECT 1 FROM {self.__table} WHERE container_name = ? LIMIT 1', (container_name,)))
+
+    def items(self):
+        """
+        Iterates over all images in a single scan of the table, without caching their rows
+        """
+        images = {}
+        for row in self.__kg.scan(f'SELECT * FROM {self.__table} ORDER BY id'):
+            images[row[1]] = row
+        for container_name, row in images.items():
+            if container_name not in self.__added:
+                yield container_name, self.__image(row)
+        yield from self.__added.items()
+
+
+class InvertedImages(Mapping):
+    """
+    Inverted image KG of a catalog, mapping an entity to the container images containing it
+    """
+
+    def __init__(self, kg, table):
+        self.__kg    = kg
+        self.__table = table
+
+    def __getitem__(self, entity):
+        if entity == 'Version':
+            return self.__kg.kg_version
+        entity_id = self.__kg.entity_id(entity) if isinstance(entity, str) else None
+        if entity_id is None:
+            raise KeyError(entity)
+        rows = self.__kg.query(f'SELECT container_name, {class_columns} FROM {self.__table} '
+                               f'WHERE {class_match} ORDER BY id', (entity_id,))
+        if not rows:
+            raise KeyError(entity)
+        return [row[0] for row in rows for class_id in row[1:] if class_id == entity_id]
+
+    def __iter__(self):
+        yield 'Version'
+        seen = set()
+        for row in self.__kg.scan(f'SELECT {class_columns} FROM {self.__table} ORDER BY id'):
+            for class_id in row:
+                if class_id is not None and class_id not in seen:
+                    seen.add(class_id)
+                    yield self.__kg.entity_name(class_id)
+
+    def __len__(self):
+        entities = " UNION ".join(f"SELECT {column} FROM {self.__table} WHERE {column} IS NOT NULL" for column in class_columns.split(", "))
+        return 1 + self.__kg.query(f'SELECT COUNT(*) FROM ({entities})')[0][0]
+
+    def __bool__(self):
+        return bool(self.__kg.query(f'SELECT 1 FROM {self.__table} LIMIT 1'))
+
+
+class EntityVersions(Mapping):
+    """
+    Entity versions KG, mapping an entity to its [version, release date, end date, latest version] entries
+    """
+
+    def __init__(self, kg):
+        self.__kg = kg
+
+    def __getitem__(self, entity):
+        entity_id = self.__kg.entity_id(entity) if isinstance(entity, str) else None
+        if entity_id is None:
+            raise KeyError(entity)
+        rows = self.__kg.query('SELECT version, release_date, end_date FROM entity_versions WHERE entity_id = ? ORDER BY id', (entity_id,))
+        if not rows:
+            raise KeyError(entity)
+        latest_version = ""
+        for row in rows:
+            if latest_version == "" or pv.parse(latest_version) < pv.parse(row[0]):
+                latest_version = row[0]
+        return [[version, release_date, end_date, latest_version] for version, release_date, end_date in rows]
+
+    def __iter__(self):
+        for (entity_id,) in self.__kg.scan('SELECT entity_id FROM entity_versions GROUP BY entity_id ORDER BY MIN(id)'):
+            yield self.__kg.entity_name(entity_id)
+
+    def __len__(self):
+        return self.__kg.query('SELECT COUNT(DISTINCT entity_id) FROM entity_versions')[0][0]
+
+    def __bool__(self):
+        return bool(self.__kg.query('SELECT 1 FROM entity_versions LIMIT 1'))
@@ -0,0 +1,118 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import time
+import threading
+import configparser
+from types import MappingProxyType
+from collections import OrderedDict
+from collections.abc import Mapping
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+
+def _freeze(value):
+    """
+    Returns a read-only copy of a standardized mention, with dicts as mapping proxies and lists as tuples
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(v) for key, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class MentionCache():
+    """
+    Bounded LRU cache of standardized mentions shared by every request of a worker process.
+    Entries are keyed on the mention string and the KG and model versions, and expire after a time to live.
+    Standardized mentions are stored read-only, so that hits are returned without a copy.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        """
+        Init method for MentionCache Class
+        """
+        if max_size is None:
+            max_size = config.getint('mention_cache', 'max_size', fallback=100000)
+        if ttl is None:
+            ttl = config.getfloat('mention_cache', 'ttl', fallback=3600)
+
+        self.max_size = max_size
+        self.ttl      = ttl
+        self.hits     = 0
+        self.misses   = 0
+        self.__entries = OrderedDict()  # Maps key to (expiry time, standardized mention)
+        self.__lock    = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the read-only cached standardized mention for the key, or None on a miss
+        """
+        with self.__lock:
+            entry = self.__entries.get(key, None)
+            if entry is not None and entry[0] < time.time():
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        """
+        Caches a read-only copy of the standardized mention for the key, evicting the least recently used entries
+        """
+        if self.max_size <= 0:
+            return
+        value = _freeze(value)
+        with self.__lock:
+            self.__entries[key] = (time.time() + self.ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit and miss counters
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns the size and hit/miss counters of the cache
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.__entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+mention_cache = MentionCache()
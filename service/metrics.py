@@ -0,0 +1,207 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import time
+import bisect
+import logging
+import threading
+import contextlib
+import configparser
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+# Type and description of every metric, in the order they are exposed
+METRICS = {
+    'tca_stage_seconds':      ('histogram', 'Time spent in each stage of request processing'),
+    'tca_request_seconds':    ('histogram', 'Time spent processing requests, by endpoint'),
+    'tca_requests_total':     ('counter',   'Requests processed, by endpoint and status code'),
+    'tca_request_mentions':   ('histogram', 'Mentions standardized per call of the entity standardizer'),
+    'tca_model_load_seconds': ('gauge',     'Time taken by the last load of each entity standardization model'),
+    'tca_model_loads_total':  ('counter',   'Loads of each entity standardization model'),
+}
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+COUNT_BUCKETS   = (1, 10, 100, 1000, 10000, 100000)
+
+_null_timer = contextlib.nullcontext()
+
+
+class Histogram():
+    """
+    Cumulative histogram of observed values
+    """
+    __slots__ = ['buckets', 'counts', 'sum', 'count']
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts  = [0] * len(buckets)
+        self.sum     = 0.0
+        self.count   = 0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum   += value
+        self.count += 1
+
+
+class StageTimer():
+    """
+    Context manager recording the time spent in a stage
+    """
+    __slots__ = ['metrics', 'stage', 'start']
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage   = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe('tca_stage_seconds', time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+class Metrics():
+    """
+    Latency histograms, counters and gauges of a worker process, exposed in the Prometheus text format.
+    Every call is a no-op when metrics are disabled in the [metrics] section of common.ini.
+    """
+
+    def __init__(self):
+        """
+        Init method for Metrics Class
+        """
+        self.enabled = True
+        self.buckets = DEFAULT_BUCKETS
+        try:
+            self.enabled = config['metrics'].get('enabled', 'yes').lower() in ['yes', 'true']
+            if 'buckets' in config['metrics']:
+                self.buckets = tuple(sorted(float(bucket) for bucket in config['metrics']['buckets'].split(',')))
+        except KeyError as k:
+            logging.error(f'{k} is not a key in your common.ini file.')
+
+        self.__histograms = {}  # Maps (name, labels) to a Histogram
+        self.__values     = {}  # Maps (name, labels) to the value of a counter or gauge
+        self.__lock       = threading.Lock()
+
+    def timer(self, stage):
+        """
+        Returns a context manager recording the time spent in the stage
+        """
+        if not self.enabled:
+            return _null_timer
+        return StageTimer(self, stage)
+
+    def observe(self, name, value, **labels):
+        """
+        Adds a value to a histogram
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            histogram = self.__histograms.get(key, None)
+            if histogram is None:
+                histogram = Histogram(COUNT_BUCKETS if name == 'tca_request_mentions' else self.buckets)
+                self.__histograms[key] = histogram
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increments a counter
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """
+        Sets a gauge
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__values[key] = value
+
+    def clear(self):
+        """
+        Resets every metric
+        """
+        with self.__lock:
+            self.__histograms.clear()
+            self.__values.clear()
+
+    @staticmethod
+    def __format(name, labels, value):
+        if labels:
+            label_str = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in labels)
+            return f'{name}{{{label_str}}} {value}'
+        return f'{name} {value}'
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text exposition format, along with the mention and access token cache counters
+        """
+        from service.mention_cache import mention_cache
+        from service.token_cache import token_cache
+
+        lines = []
+        with self.__lock:
+            for name, (metric_type, description) in METRICS.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                if metric_type == 'histogram':
+                    for (metric, labels), histogram in sorted(self.__histograms.items()):
+                        if metric != name:
+                            continue
+                        cumulative = 0
+                        for bucket, count in zip(histogram.buckets, histogram.counts):
+                            cumulative += count
+                            lines.append(self.__format(f'{name}_bucket', labels + (('le', repr(float(bucket))),), cumulative))
+                        lines.append(self.__format(f'{name}_bucket', labels + (('le', '+Inf'),), histogram.count))
+                        lines.append(self.__format(f'{name}_sum', labels, histogram.sum))
+                        lines.append(self.__format(f'{name}_count', labels, histogram.count))
+                else:
+                    for (metric, labels), value in sorted(self.__values.items()):
+                        if metric == name:
+                            lines.append(self.__format(name, labels, value))
+
+        stats       = mention_cache.stats()
+        token_stats = token_cache.stats()
+        for name, metric_type, description, value in [
+                ('tca_mention_cache_hits_total', 'counter', 'Mention cache hits', stats['hits']),
+                ('tca_mention_cache_misses_total', 'counter', 'Mention cache misses', stats['misses']),
+                ('tca_mention_cache_size', 'gauge', 'Mentions in the mention cache', stats['size']),
+                ('tca_token_cache_hits_total', 'counter', 'Access token cache hits', token_stats['hits']),
+                ('tca_token_cache_misses_total', 'counter', 'Access token cache misses', token_stats['misses'])]:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
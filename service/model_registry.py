@@ -0,0 +1,143 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import time
+import logging
+import threading
+import configparser
+
+from entity_standardizer.tfidf import TFIDF
+from entity_standardizer.siamese import SIAMESE
+from service.metrics import metrics
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+
+class ModelRegistry():
+    """
+    Process wide registry of entity standardizer models. Each model is loaded once per
+    worker process and reused by every request until one of its files changes on disk.
+    Model files are checked for changes at most once per reload_interval seconds.
+    """
+
+    def __init__(self, reload_interval=None):
+        """
+        Init method for ModelRegistry Class
+        """
+        if reload_interval is None:
+            reload_interval = config.getfloat('model', 'reload_interval', fallback=60)
+        self.reload_interval = reload_interval
+        # Maps (model_type, task_name) to (loaded model, modification times of the model files, time of the next check)
+        self.__entries = {}
+        self.__lock    = threading.Lock()
+
+    @staticmethod
+    def __file_mtimes(model):
+        """
+        Returns the modification times of the files the model depends on
+        """
+        mtimes = []
+        for file_path in model.model_files():
+            mtimes.append(os.path.getmtime(file_path) if os.path.exists(file_path) else None)
+        return mtimes
+
+    def __load(self, model_type, task_name):
+        """
+        Creates and loads a model of the given type
+        """
+        if model_type == 'siamese':
+            model = SIAMESE(task_name)
+        elif model_type == 'tfidf':
+            model = TFIDF(task_name)
+        else:
+            raise ValueError(f'Unknown model type {model_type}')
+
+        start = time.time()
+        model.load()
+        load_time = time.time() - start
+        logging.info(f"Loaded {model_type} model for {task_name} in {load_time:.2f} seconds.")
+        metrics.set('tca_model_load_seconds', load_time, model=model_type, task=task_name)
+        metrics.inc('tca_model_loads_total', model=model_type, task=task_name)
+        return model
+
+    def __refresh(self, model_type, task_name, force=False):
+        """
+        Loads the model, or reloads it if its files changed, unless it was checked less than reload_interval
+        seconds ago and force is not set
+        """
+        key = (model_type, task_name)
+        with self.__lock:
+            entry = self.__entries.get(key, None)
+            if entry is not None and not force and time.monotonic() < entry[2]:
+                return entry[0]
+            model = None
+            if entry is not None:
+                model, mtimes, _ = entry
+                if mtimes != self.__file_mtimes(model):
+                    logging.info(f"{model_type} model files for {task_name} changed, reloading.")
+                    model = None
+            if model is None:
+                model  = self.__load(model_type, task_name)
+                mtimes = self.__file_mtimes(model)
+            self.__entries[key] = (model, mtimes, time.monotonic() + self.reload_interval)
+        return model
+
+    def get_model(self, model_type, task_name="deploy"):
+        """
+        Returns the loaded model of the given type, loading it on first use and reloading it if its files
+        changed when they are due for a check
+        """
+        entry = self.__entries.get((model_type, task_name), None)
+        if entry is not None and time.monotonic() < entry[2]:
+            return entry[0]
+        return self.__refresh(model_type, task_name)
+
+    def get_model_version(self, model_type, task_name="deploy"):
+        """
+        Returns the version of a loaded model as the modification times of its files
+        """
+        entry = self.__entries.get((model_type, task_name), None)
+        return tuple(entry[1]) if entry is not None else ()
+
+    def reload_if_changed(self):
+        """
+        Reloads every registered model whose files changed on disk
+        """
+        for model_type, task_name in list(self.__entries.keys()):
+            self.__refresh(model_type, task_name, force=True)
+
+    def is_ready(self, model_type=None, task_name="deploy"):
+        """
+        Returns True if the model (by default the configured one) is loaded
+        """
+        if not model_type:
+            model_type = config["model"]["model_type"]
+        entry = self.__entries.get((model_type, task_name), None)
+        return entry is not None and entry[0].is_loaded()
+
+    def warm(self, model_type=None, task_name="deploy"):
+        """
+        Loads the model (by default the configured one) ahead of the first request
+        """
+        if not model_type:
+            model_type = config["model"]["model_type"]
+        return self.get_model(model_type, task_name)
+
+
+model_registry = ModelRegistry()
@@ -19,10 +19,11 @@ from collections import OrderedDict
 import logging
 import codecs
 from service.utils import Utils
+from service.kg_context import get_kg_context
+from service.worker_pool import worker_pool
 import re
 import os
 import configparser
-import json
 
 config = configparser.ConfigParser()
 
@@ -34,7 +35,7 @@ config.read([common, kg])
 class Plan():
     def __init__(self, logger=False, catalog ="dockerhub"):
         '''
-        Loads catalog KG json file data
+        Borrows the catalog KG data from the shared KG context
         '''
         logging.basicConfig(level=logging.INFO)
 
@@ -42,51 +43,17 @@ class Plan():
             self.logfile = codecs.open('logfile.txt','w',encoding='utf-8')
         
         self.catalog = catalog
-        self.catalogKG = catalog + "_imageKG"
-        self.inverted_catalogKG = "inverted_" + catalog + "_imageKG"
-        self.__osBaseImages = {}
-        if "openshift" in [self.catalog]:
-            self.baseOS = catalog + "_baseOSKG"
-            self.baseOSKG_filepath = os.path.join(config['general']['kg_dir'], config['filenames'][self.baseOS])
-        else:
-            self.baseOS = "baseOSKG"
-            self.baseOSKG_filepath = os.path.join(config['general']['kg_dir'], config['filenames'][self.baseOS])
-
-        #Load imageKG
-        self.__imageKG_filepath = os.path.join(config['general']['kg_dir'], config['filenames'][self.catalogKG])
-        if os.path.exists(self.__imageKG_filepath):   
-            with open(self.__imageKG_filepath, 'r') as f:
-                self.__imageKG = json.load(f)           
-        else:
-            logging.error(f'imageKG[{self.__imageKG_filepath}] is empty or not exists')
-    
-        #load BaseOS
-        if os.path.exists(self.baseOSKG_filepath):
-            with open(self.baseOSKG_filepath, 'r') as f:
-                baseOSKG = json.load(f)
-            for image_name in baseOSKG['Container Images']:
-                self.__osBaseImages[baseOSKG['Container Images'][image_name]['OS'][0]['Class']] = image_name
-                self.__imageKG['Container Images'][image_name] = baseOSKG['Container Images'][image_name]
-        else:
-            logging.error(f'baseOSKG[{self.baseOSKG_filepath}] is empty or not exists') 
 
-        #Load inverted image kg
-        self.__inverted_imageKG_path = os.path.join(config['general']['kg_dir'], config['filenames'][self.inverted_catalogKG])
-        if os.path.exists(self.__inverted_imageKG_path):
-            with open(self.__inverted_imageKG_path, 'r') as f:
-                self.__inverted_imageKG = json.load(f)          
-        else:
-            logging.error(f'inverted_imageKG[{self.__inverted_imageKG_path}] is empty or not exists')
-       
-        #Load COTS
-        self.__COTSKG = {}
-        self.__COTSKG_filepath = os.path.join(config['general']['kg_dir'], config['filenames']['COTSKG'])
-        if os.path.exists(self.__COTSKG_filepath):
-            with open(self.__COTSKG_filepath, 'r') as f:
-                self.__COTSKG = json.load(f)
-        else:
-            logging.error(f'COTSKG[{self.__COTSKG_filepath}] is empty or not exists')
-        
+        # image, inverted image and base OS KGs of the catalog are shared through the KG context
+        kg_context = get_kg_context()
+        catalog_kg = kg_context.catalog(catalog)
+        self.__imageKG          = catalog_kg.imageKG
+        self.__osBaseImages     = catalog_kg.osBaseImages
+        self.__inverted_imageKG = catalog_kg.inverted_imageKG
+        self.__inverted_image_sets = catalog_kg.inverted_image_sets
+        self.__catalog_kg          = catalog_kg
+        self.__COTSKG           = kg_context.COTSKG
+
         self.MAJOR_VERSION_NUMBER_REGEX = re.compile('([0-9]+)')
 
 
@@ -108,7 +75,7 @@ class Plan():
         app['scope_images_confidence']['mapping'] = {}
         child_types = ["App Server", "App", "Runtime","Lang"]
 
-        inverted_containerimageKG = self.__inverted_imageKG
+        inverted_image_sets = self.__inverted_image_sets
         containerimageKG = self.__imageKG
         imageurl = 'image_url'
 
@@ -142,11 +109,9 @@ class Plan():
         for child_type in child_types:
             for child in app[child_type].split(', '):
                 if child:
-                    if child in inverted_containerimageKG:
-                        candidated_images = []
-                        for scope_image in scope_images:
-                            if scope_image in inverted_containerimageKG[child]:
-                                candidated_images.append(scope_image)
+                    if child in inverted_image_sets:
+                        child_images = inverted_image_sets[child]
+                        candidated_images = [scope_image for scope_image in scope_images if scope_image in child_images]
                         if len(candidated_images) > 0:
                             #select best images using image status
                             best_image = candidated_images[0]
@@ -185,9 +150,9 @@ class Plan():
             child_type = 'Runtime'
             if app[child_type]:
                 for child in app[child_type].split(', '):
-                    if child and child in inverted_containerimageKG:
+                    if child and child in inverted_image_sets:
                         for scope_image in app['scope_images']:
-                            if scope_image in inverted_containerimageKG[child]:
+                            if scope_image in inverted_image_sets[child]:
                                 # delete this scop_image
                                 del app['scope_images'][scope_image]
                                 for k,v in app['scope_images_confidence']['mapping'].items():
@@ -205,13 +170,12 @@ class Plan():
             if child:
                 if child in covered_lang:
                     continue
-                if child in inverted_containerimageKG:
+                if child in inverted_image_sets:
                     candidated_images = []
-                    for scope_image in scope_images:
-                        if scope_image in inverted_containerimageKG[child] and len(containerimageKG['Container Images'][scope_image]['App']) == 0 and len(containerimageKG['Container Images'][scope_image]['App Server']) == 0 and len(containerimageKG['Container Images'][scope_image]['Runtime']) == 0:
-                            # Pure lang docker
-                            if not has_images_for_app_appserver:
-                                candidated_images.append(scope_image)
+                    if not has_images_for_app_appserver:
+                        # Pure lang docker
+                        lang_images = inverted_image_sets[child] & self.__catalog_kg.pure_lang_images
+                        candidated_images = [scope_image for scope_image in scope_images if scope_image in lang_images]
                     if len(candidated_images) > 0:
                         #select best images using image status
                         best_image = candidated_images[0]
@@ -265,6 +229,7 @@ class Plan():
             return app
         osBaseImages = self.__osBaseImages
         inverted_containerimageKG = self.__inverted_imageKG
+        inverted_image_sets = self.__inverted_image_sets
        
 
         app['scope_images'] = []
@@ -277,22 +242,22 @@ class Plan():
                     backup_images.append(osBaseImages[os])
                     break
 
-        full_os_check_images = []
-        parent_os_check_images = []
-        if app['OS'] in inverted_containerimageKG:
-            full_os_check_images = inverted_containerimageKG[app['OS']]
-        if (app['OS'].split('|')[0] != app['OS']) and app['OS'].split('|')[0] in inverted_containerimageKG:
-            parent_os_check_images = inverted_containerimageKG[app['OS'].split('|')[0]]
+        # images of the OS or of its parent OS
+        os_check_images = inverted_image_sets.get(app['OS'], frozenset())
+        if app['OS'].split('|')[0] != app['OS']:
+            os_check_images = os_check_images | inverted_image_sets.get(app['OS'].split('|')[0], frozenset())
 
 
         # parent_os_scope_images = []
         child_types = ["App Server", "App", "Runtime","Lang"]
+        scope_images = set()
         for child_type in child_types:
             for child in app[child_type].split(', '):
                 # Use inverted index to find dockerimage and check its OS
                 if child and child in inverted_containerimageKG:
                     for image_name in inverted_containerimageKG[child]:
-                        if ((image_name in full_os_check_images) or (image_name in parent_os_check_images)) and (image_name not in app['scope_images']):
+                        if image_name in os_check_images and image_name not in scope_images:
+                            scope_images.add(image_name)
                             app['scope_images'].append(image_name)
 
         # add base image for the OS if no element in tech stack has a pre-existing image
@@ -434,10 +399,16 @@ class Plan():
         :returns: list of application details with updated valid_assessment values
 
         """
-        if len(self.__imageKG) == 0 or len(self.__osBaseImages) == 0 or len(self.__inverted_imageKG) == 0:
+        if not self.__imageKG or not self.__osBaseImages or not self.__inverted_imageKG:
             logging.error('service/planning.py init failed')
             return appL
-       
+
+        # large payloads are mapped in chunks across the worker pool
+        if worker_pool.is_enabled(len(appL)):
+            containerL = worker_pool.map_to_docker(appL, catalog)
+            if containerL is not None:
+                return containerL
+
         containerL = []
         for app in appL:
             if app['valid_assessment']:
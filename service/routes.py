@@ -14,15 +14,20 @@
 # limitations under the License.
 ################################################################################
 
+import time
 import logging
-from flask import Flask, jsonify, redirect, url_for, request
-from flask_restplus import Api, Resource, fields, reqparse, inputs
+import functools
+from flask import Flask, jsonify, redirect, url_for, request, Response, stream_with_context, g
+from flask_restplus import Api, Resource, fields, reqparse, inputs, marshal
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 
 import os
 from . import app
 import service.functions as functions
+from service.model_registry import model_registry
+from service.mention_cache import mention_cache
+from service.metrics import metrics
 
 import configparser
 import json
@@ -49,6 +54,8 @@ if 'RBAC_auth_url' in config['RBAC']:
     auth_url = '{}/api/v2/access?client=api&action_name=rpt%3Aview-analytics'.format(config['RBAC']['RBAC_auth_url'])
 app.logger.warn(f'auth_url: {auth_url}')
 
+stream_chunksize = max(1, int(config['Performance'].get('stream_chunksize', 100)))
+
 
 app.wsgi_app = ProxyFix(app.wsgi_app)
 
@@ -160,6 +167,18 @@ output_model_clustering = api.model('Clustering Output', {
     "clusters": fields.List(fields.Nested(clustering_model), required=True, description='An array of containerization clustering for application workload')
     })
 
+job_model = api.model('Job', {
+    "status": fields.Integer(required=True, description='Status of the call'),
+    "message": fields.String(required=True, description='Status message'),
+    "job_id": fields.String(required=True, description='Job identifier'),
+    "operation": fields.String(required=False, description='Operation of the job: standardize or containerize'),
+    "state": fields.String(required=False, description='State of the job: queued, running, completed or failed'),
+    "total": fields.Integer(required=False, description='Number of apps of the job'),
+    "completed": fields.Integer(required=False, description='Number of apps processed so far'),
+    "created": fields.Float(required=False, description='Submission time of the job'),
+    "updated": fields.Float(required=False, description='Time of the last progress of the job')
+    })
+
 # @api.route('/match', strict_slashes=False)
 # class Standardization(Resource):
 #     """
@@ -183,6 +202,81 @@ output_model_clustering = api.model('Clustering Output', {
 #         return functions.do_standardization(auth_url,dict(request.headers),auth_headers,api.payload)
 
 
+def get_catalog():
+    """
+    Returns the catalog given in the query string, dockerhub if missing or unknown
+    """
+    catalog = request.args.get('catalog')
+
+    if not catalog:
+        catalog = 'dockerhub'
+    catalog = catalog.lower()
+    if catalog not in catalog_names['names']:
+        catalog = 'dockerhub'
+    return catalog
+
+def ndjson_response(resp, code, output_model):
+    """
+    Streams the records of a generator as newline delimited json, each record marshalled with output_model.
+    Error records, which carry a status, are streamed as is.
+    """
+    if code != 200:
+        return resp, code
+
+    def generate():
+        for record in resp:
+            if 'status' not in record:
+                record = marshal(record, output_model)
+            yield json.dumps(record) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def marshal_with_timer(model):
+    """
+    Marshals the response of a handler with model like api.marshal_with, recording the time spent marshalling
+    """
+    def decorator(func):
+        if not metrics.enabled:
+            return api.marshal_with(model)(func)
+
+        @functools.wraps(func)
+        def handler(*args, **kwargs):
+            start = time.perf_counter()
+            resp  = func(*args, **kwargs)
+            g.handler_seconds = time.perf_counter() - start
+            return resp
+
+        marshalled = api.marshal_with(model)(handler)
+
+        @functools.wraps(marshalled)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            resp  = marshalled(*args, **kwargs)
+            metrics.observe('tca_stage_seconds', time.perf_counter() - start - g.pop('handler_seconds', 0.0), stage='marshalling')
+            return resp
+
+        return wrapper
+    return decorator
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Records the processing time and the status code of each request by endpoint. The time of streamed responses
+    only covers the request up to the first record.
+    """
+    if metrics.enabled and 'request_start' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('tca_request_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+        metrics.inc('tca_requests_total', endpoint=endpoint, status=str(response.status_code))
+    return response
+
+
 @api.route('/standardize', strict_slashes=False)
 class Assessment(Resource):
     """
@@ -195,7 +289,7 @@ class Assessment(Resource):
     @api.response(401, 'Unauthorized, missing or invalid access token')
     @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
     @api.expect([input_model])
-    @api.marshal_with(output_model_assessment)
+    @marshal_with_timer(output_model_assessment)
     @api.doc(security='apikey')
 
 
@@ -220,7 +314,7 @@ class Planning(Resource):
     @api.response(401, 'Unauthorized, missing or invalid access token')
     @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
     @api.expect([assessment_model])
-    @api.marshal_with(output_model_planning)
+    @marshal_with_timer(output_model_planning)
     @api.doc(security='apikey')
 
 
@@ -229,18 +323,149 @@ class Planning(Resource):
         Returns the container recommendations for the input app(s)
         """
         # Invoke do_plan method in planning class to initiate planning process
+        return functions.do_planning(auth_url,dict(request.headers),auth_headers,api.payload,get_catalog())
+
+@api.route('/standardize/stream', strict_slashes=False)
+class AssessmentStream(Resource):
+    """
+    AssessmentStream class streams the assessment in the form of assessment_model for the
+    newline delimited application/component details given in the input_model
+    """
+    @api.doc('create_entity_standardization_stream')
+    @api.response(200, 'Newline delimited json records of standardized apps')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
+    @api.doc(security='apikey')
+
+
+    def post(self):
+        """
+        Returns standard names and versions of all entities detected in newline delimited json apps, one json record per line
+        """
+        resp, code = functions.do_assessment_stream(auth_url,dict(request.headers),auth_headers,request.stream,stream_chunksize)
+        return ndjson_response(resp, code, assessment_model)
+
+
+@api.route('/containerize/stream', strict_slashes=False)
+@api.doc(params={'catalog': {'description': 'catalog of container images: dockerhub, openshift, operator or ibmcloud', 'in': 'query', 'type': 'string', 'default':'dockerhub', 'enum': catalog_names["names"]}})
+class PlanningStream(Resource):
+    """
+    PlanningStream class streams the containerization in the form of planning_model for the
+    newline delimited application/component details given in the assessment_model
+    """
+    @api.doc('create_containerization_stream')
+    @api.response(200, 'Newline delimited json records of container recommendations')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
+    @api.doc(security='apikey')
+
+
+    def post(self):
+        """
+        Returns the container recommendations for newline delimited json apps, one json record per line
+        """
+        resp, code = functions.do_planning_stream(auth_url,dict(request.headers),auth_headers,request.stream,stream_chunksize,get_catalog())
+        return ndjson_response(resp, code, planning_model)
+
+@api.route('/jobs/standardize', strict_slashes=False)
+class AssessmentJob(Resource):
+    """
+    AssessmentJob class queues an asynchronous standardization of the application/component details
+    given in the input_model
+    """
+    @api.doc('create_entity_standardization_job')
+    @api.response(202, 'Job submitted successfully!')
+    @api.response(400, 'Input data format doesn\'t match the format expected by TCA')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
+    @api.expect([input_model])
+    @api.marshal_with(job_model)
+    @api.doc(security='apikey')
+
 
-        catalog = request.args.get('catalog')
+    def post(self):
+        """
+        Queues the standardization of the input app(s) and returns the job id to poll
+        """
+        return functions.do_submit_job(auth_url,dict(request.headers),auth_headers,'standardize',api.payload)
+
+
+@api.route('/jobs/containerize', strict_slashes=False)
+@api.doc(params={'catalog': {'description': 'catalog of container images: dockerhub, openshift, operator or ibmcloud', 'in': 'query', 'type': 'string', 'default':'dockerhub', 'enum': catalog_names["names"]}})
+class PlanningJob(Resource):
+    """
+    PlanningJob class queues an asynchronous containerization of the application/component details
+    given in the assessment_model
+    """
+    @api.doc('create_containerization_job')
+    @api.response(202, 'Job submitted successfully!')
+    @api.response(400, 'Input data format doesn\'t match the format expected by TCA')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
+    @api.expect([assessment_model])
+    @api.marshal_with(job_model)
+    @api.doc(security='apikey')
+
+
+    def post(self):
+        """
+        Queues the container recommendations of the input app(s) and returns the job id to poll
+        """
+        return functions.do_submit_job(auth_url,dict(request.headers),auth_headers,'containerize',api.payload,get_catalog())
+
+
+@api.route('/jobs/<string:job_id>', strict_slashes=False)
+class JobStatus(Resource):
+    """
+    JobStatus class reports the state and progress of an asynchronous job
+    """
+    @api.doc('get_job_status')
+    @api.response(200, 'Job status')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(404, 'Job not found')
+    @api.marshal_with(job_model)
+    @api.doc(security='apikey')
+
+
+    def get(self, job_id):
+        """
+        Returns the state of the job and the number of apps processed so far
+        """
+        return functions.do_job_status(auth_url,dict(request.headers),auth_headers,job_id)
+
+
+@api.route('/jobs/<string:job_id>/results', strict_slashes=False)
+class JobResults(Resource):
+    """
+    JobResults class returns the results of an asynchronous job, in the form of output_model_assessment
+    for standardize jobs and output_model_planning for containerize jobs
+    """
+    @api.doc('get_job_results')
+    @api.response(200, 'Results of the processed apps of the job')
+    @api.response(401, 'Unauthorized, missing or invalid access token')
+    @api.response(404, 'Job not found')
+    @api.doc(security='apikey')
 
-        if not catalog:
-            catalog = 'dockerhub'
-        catalog = catalog.lower()
-        if catalog not in catalog_names['names']:
-            catalog = 'dockerhub'
 
-        return functions.do_planning(auth_url,dict(request.headers),auth_headers,api.payload,catalog)
+    def get(self, job_id):
+        """
+        Returns the state of the job and the results of the apps processed so far, in input order
+        """
+        resp, code = functions.do_job_status(auth_url,dict(request.headers),auth_headers,job_id,with_results=True)
+        if code != 200:
+            return resp, code
+
+        results = resp.pop('results')
+        resp = marshal(resp, job_model)
+        if resp['operation'] == 'containerize':
+            resp['containerization'] = marshal(results, planning_model)
+        else:
+            resp['standardized_apps'] = marshal(results, assessment_model)
+        return resp, code
 
 @api.route('/clustering', strict_slashes=False)
+@api.doc(params={'mode': {'description': 'clustering mode: unique groups apps with identical tech stacks, similar groups apps whose tech stacks have a jaccard similarity above threshold', 'in': 'query', 'type': 'string', 'default': 'unique', 'enum': ['unique', 'similar']},
+                 'threshold': {'description': 'jaccard similarity threshold of the similar mode, between 0 and 1', 'in': 'query', 'type': 'number', 'required': False}})
 class ContainerizationClustering(Resource):
     """
     ContainerizationClustering class creates the clustering in the form of clustering_model for the
@@ -252,7 +477,7 @@ class ContainerizationClustering(Resource):
     @api.response(401, 'Unauthorized, missing or invalid access token')
     @api.response(500, 'Internal Server Error, missing or wrong config of RBAC access token validation url')
     @api.expect([assessment_model])
-    @api.marshal_with(output_model_clustering)
+    @marshal_with_timer(output_model_clustering)
     @api.doc(security='apikey')
 
 
@@ -261,7 +486,17 @@ class ContainerizationClustering(Resource):
         Returns grouping of apps based on technology stack similarity
         """
         # Invoke do_clustering method in clustering class to initiate clustering process
-        return functions.do_clustering(auth_url,dict(request.headers),auth_headers,api.payload)
+
+        mode = request.args.get('mode')
+        if not mode or mode.lower() not in ['unique', 'similar']:
+            mode = 'unique'
+        mode = mode.lower()
+
+        threshold = request.args.get('threshold', None, type=float)
+        if threshold is not None and not 0 < threshold <= 1:
+            threshold = None
+
+        return functions.do_clustering(auth_url,dict(request.headers),auth_headers,api.payload,mode,threshold)
 
 @api.route('/health_check')
 @api.response(200, 'HTTP OK')
@@ -274,3 +509,38 @@ class HealthCheck(Resource):
         api request processing
         """
         return 'RUNNING'
+
+@api.route('/readiness_check')
+@api.response(200, 'HTTP OK')
+@api.response(503, 'HTTP Service Unavailable')
+class ReadinessCheck(Resource):
+    def get(self):
+        """
+        Readiness api reports whether the entity standardization model is loaded in this worker and ready to
+        serve requests
+        """
+        if model_registry.is_ready():
+            return 'READY'
+        return 'LOADING', 503
+
+@api.route('/cache_stats')
+@api.response(200, 'HTTP OK')
+class CacheStats(Resource):
+    def get(self):
+        """
+        Cache stats api reports the size and hit/miss counters of the mention cache of this worker
+        """
+        return mention_cache.stats()
+
+@api.route('/metrics')
+@api.response(200, 'HTTP OK')
+@api.response(404, 'Metrics are disabled')
+class Metrics(Resource):
+    def get(self):
+        """
+        Metrics api exposes the per stage latency histograms and the counters of this worker in the Prometheus
+        text format
+        """
+        if not metrics.enabled:
+            return dict(status = 404, message = 'Metrics are disabled'), 404
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -15,44 +15,114 @@
 ################################################################################
 
 import os
-import json
 import time
 import logging
 import configparser
 import re
+import functools
 import numpy as np
 
-from entity_standardizer.tfidf import TFIDF
-from entity_standardizer.siamese import SIAMESE
 from entity_standardizer.tfidf import utils
+from service.model_registry import model_registry
+from service.mention_cache import mention_cache
+from service.worker_pool import worker_pool
+from service.kg_context import get_kg_context
 from service.version_detector import version_detector
 from service.utils import Utils
-
-version_suffixes = ['4gl' 'ambrai' 'ansi' 'arc' 'bbn' 'beta' 'cal' 'chez' 'chicken' 'clojure'
- 'cloud' 'common' 'distributed' 'dolphin' 'domain' 'dylan' 'embedded'
- 'enterprise' 'erlang' 'es' 'euLisp' 'express' 'extended' 'flavored'
- 'franz' 'free' 'game' 'gnu' 'goal' 'hpe' 'hy' 'ikarus' 'in' 'iseries'
- 'jdk' 'le' 'lfe' 'little' 'lswsvision' 'machine' 'me' 'mq' 'mqseries'
- 'mt' 'nil' 'nonstop' 'nt' 'object' 'on' 'oriented' 'pdst' 'pocket'
- 'portable' 'preview' 'progress' 'public' 'quicknet' 'racket' 'resilient'
- 'scheme' 'sefun' 'server' 'siod' 'skill' 'slate' 'smalltalk' 'sp' 'sparc'
- 'squat' 'squeak' 'standard' 'strong' 'studio' 'suse' 'susie' 'talks'
- 'transfer' 'turbo' 'txr' 'vista' 'visualage' 'visualworks' 'vmx' 'x' 'xe'
- 'xoku' 'xp']
-
+from service.metrics import metrics
+
+version_suffixes = frozenset(['4gl', 'ambrai', 'ansi', 'arc', 'bbn', 'beta', 'cal', 'chez', 'chicken', 'clojure',
+ 'cloud', 'common', 'distributed', 'dolphin', 'domain', 'dylan', 'embedded',
+ 'enterprise', 'erlang', 'es', 'euLisp', 'express', 'extended', 'flavored',
+ 'franz', 'free', 'game', 'gnu', 'goal', 'hpe', 'hy', 'ikarus', 'in', 'iseries',
+ 'jdk', 'le', 'lfe', 'little', 'lswsvision', 'machine', 'me', 'mq', 'mqseries',
+ 'mt', 'nil', 'nonstop', 'nt', 'object', 'on', 'oriented', 'pdst', 'pocket',
+ 'portable', 'preview', 'progress', 'public', 'quicknet', 'racket', 'resilient',
+ 'scheme', 'sefun', 'server', 'siod', 'skill', 'slate', 'smalltalk', 'sp', 'sparc',
+ 'squat', 'squeak', 'standard', 'strong', 'studio', 'suse', 'susie', 'talks',
+ 'transfer', 'turbo', 'txr', 'vista', 'visualage', 'visualworks', 'vmx', 'x', 'xe',
+ 'xoku', 'xp'])
+
+# Removed from tech stacks one after the other, a single alternation would not remove overlapping stop words
+stop_word_patterns = [re.compile(w, flags=re.IGNORECASE) for w in [" of ", " for ", " on ", " in ", " no ", "unknown", "none", " as ", "string", " id ",
+                                                                   "version", "edition", " a ", " by ", " if ", "other"]]
+
+ordinal_pattern   = re.compile(r'\d+(st|nd|rd|th)')
+non_digit_pattern = re.compile('[^0-9]')
+
+@functools.lru_cache(maxsize=65536)
 def is_version(s):
+    """
+    Returns True if the token looks like a version: a number, an ordinal or a token made of digits for more than a third
+    """
+    return s.replace('.', '').isdigit() or \
+           ordinal_pattern.search(s.lower()) is not None or \
+           len(non_digit_pattern.sub("", s)) > len(s) / 3
+
+@functools.lru_cache(maxsize=65536)
+def combinations(tech_stack):
+    """
+    Returns the combinations of up to 6 consecutive words of a technology mention. Versions are appended to the
+    combination they follow rather than starting one, and end it unless followed by a version suffix.
+    """
+    if len(tech_stack) > 7 and tech_stack[:7] == 'NOCOMBO':
+        return (tech_stack[7:],)
+
+    limit = 6
+
+    tokens = tech_stack.split(" ")
+    if len(tokens) <= 1:
+        return tuple(tokens)
+
+    # classify each token once
+    versions = [is_version(token) for token in tokens]
+
+    tech_list = []
+    for i, each in enumerate(tokens):
+        if versions[i]:
+            continue
+
+        tech_list.append(each)
+        end = min(i + limit, len(tokens))
+        for j in range(i + 1, end):
+            if versions[j]:
+                tech_list[-1] = ' '.join(tokens[i:j + 1])
+                if j < end - 1 and tokens[j+1] not in version_suffixes:
+                    break
+            else:
+                tech_list.append(' '.join(tokens[i:j + 1]))
 
-    try:
-        w2n.word_to_num(s)
-        return True
-    except:
-        return s.replace('.', '').isdigit() or \
-               len(re.findall('(\d+(st|nd|rd|th))', s.lower())) > 0 or \
-               len(re.sub("[^0-9]", "", s)) > len(s) / 3
+    return tuple(tech_list)
 
 def intersection(lst1, lst2):
     return list(set(lst1) & set(lst2))
 
+class MentionMatch():
+    """
+    Entity matched to a mention of an app, with the matching score and mention id used while the app is standardized
+    """
+    __slots__ = ['entity', 'version', 'score', 'mention_id']
+
+    def __init__(self, entity, version, score, mention_id=None):
+        self.entity     = entity
+        self.version    = version
+        self.score      = score
+        self.mention_id = mention_id
+
+    def update(self, entity, version, score):
+        """
+        Updates the version of the entity if it is the matched one, and the score of the match
+        """
+        if entity == self.entity:
+            self.version = version
+        self.score = score
+
+    def to_dict(self):
+        """
+        Returns the standardized form of the match
+        """
+        return {'standard_name': self.entity, 'detected_version': self.version[0], 'latest_known_version': self.version[1]}
+
 class Standardization():
     """
     This class for entity, version, and app standardization
@@ -70,8 +140,6 @@ class Standardization():
         config.read([common, kg] + deploys)
 
         try:
-            kg_dir                = config["general"]["kg_dir"]
-            entities_json         = config["tca"]["entities"]
             self.model = config["model"]["model_type"]
 
             self.high_threshold   = float(config[f"infer_thresholds_{self.model}"]["HIGH_THRESHOLD"])
@@ -81,12 +149,9 @@ class Standardization():
 
             na_category           = config['NA_VALUES']['NA_CATEGORY']
             self.na_version       = config['NA_VALUES']['NA_VERSION']
-            class_type_mapper     = config['filenames']['class_type_mapper']
         except KeyError as k:
             logging.error(f'{k} is not a key in your common.ini or kg.ini file.')
 
-        self.__class_type_mapper = {}
-
         self.__tca_input_mapper = {
                                 "application_name": "application_name",
                                 "application_description": "application_description",
@@ -99,49 +164,24 @@ class Standardization():
                                 "technology_summary": "tech_stack"
                             }
 
-        class_type_mapper_filepath = os.path.join(kg_dir, class_type_mapper)
-        if os.path.exists(class_type_mapper_filepath):
-            with open(class_type_mapper_filepath, 'r') as f:
-                self.__class_type_mapper = json.load(f)
-        else:
-            self.__class_type_mapper = {}
-            logging.error(f'class_type_mapper[{class_type_mapper_filepath}] is empty or not exists')
+        # class type mapper and mapping of entity id to entity names are shared through the KG context
+        kg_context = get_kg_context()
+        self.__class_type_mapper = kg_context.class_type_mapper
+        self.__entity_data       = kg_context.entity_data
 
         if len(self.__tca_input_mapper) == 0 or len(self.__class_type_mapper) == 0:
             logging.error('ontologies init failed')
 
-        # Check that kg contains entities file
-        entity_file_name = os.path.join(kg_dir, entities_json)
-        if not os.path.isfile(entity_file_name):
-            logging.error(f"Entities json file {entity_file_name} does not exist. Run kg generator to create this file.")
-
-        # Get mapping of entity id to entity names
-        with open(entity_file_name, 'r', encoding='utf-8') as entity_file:
-            entities = json.load(entity_file)
-
-        self.__entity_data = {}
-        for idx, entity in entities["data"].items():
-            entity_name = entity["entity_name"]
-            tca_id      = entity["entity_id"]
-            entity_type_name = entity["entity_type_name"]
-            self.__entity_data[tca_id] = (entity_name, entity_type_name)
-
-    def remove_scores(self, apps):
-        for app in apps:
-            for k in app.keys():
-                if type(app[k]) is dict:
-                    for m in app[k].keys():
-                        app[k][m] = {key: val for key, val in app[k][m].items() if key != 'score'}
+        self.__version_detector = version_detector()
 
-        return apps
-
-    # format mentions metadata (standard entity name, detected version,
+    # format mentions metadata (standard entity name, detected version, latest known version)
     def format_mentions(self, apps):
         for app in apps:
-            for k in app.keys():
-                if type(app[k]) is dict:
-                    for m in app[k].keys():
-                        app[k][m] = { 'standard_name': list(app[k][m].keys())[0] , 'detected_version': list(app[k][m].values())[0][0], 'latest_known_version': list(app[k][m].values())[0][1] }
+            for mentions in app.values():
+                if type(mentions) is dict:
+                    for m, match in mentions.items():
+                        if isinstance(match, MentionMatch):
+                            mentions[m] = match.to_dict()
 
         return apps
 
@@ -180,43 +220,57 @@ class Standardization():
             dict(status=201, message="Entity standardization completed successfully!", result=list(mentions.values())), 201
 
 
-        infer_data = {"label_type": "int", "label": "entity_id", "data_type": "strings", "data": uniques}
         logging.info(f"{len(uniques)} unique mentions will be standardized.")
-
-        # load model and score it on the infer data
-        if self.model == 'siamese':
-            model = SIAMESE("deploy")
-
-        if self.model == 'tfidf':
-            model = TFIDF("deploy")
-
-        model_data = model.infer(infer_data)
-        mention_data = model_data.get("data", {})
-
-        for idx, mention in mention_data.items():
-            mention_name = mention.get("mention(s)", "")
-            predictions = mention.get("predictions", [])
-            if not predictions:
-                logging.info(f"No predictions for {mention}")
-                # continue
-            entity_names= [self.__entity_data[p[0]][0] for p in predictions if p[1] > self.medium_threshold]
-            entity_types= [self.__entity_data[p[0]][1] for p in predictions if p[1] > self.medium_threshold]
-            conf_scores = [round(p[1],2) for p in predictions if p[1] > self.medium_threshold]
-            mention["mention"]      = mention_name
-            mention["entity_names"] = entity_names
-            versions    = []
-            for entity, score in zip(entity_names, conf_scores):
-                version  = self.version_standardizer(mention_name, [entity, score])
-                versions.append(version)
-            mention["entity_types"] = entity_types
-            mention["confidence"]   = conf_scores
-            mention["versions"]     = versions
-            del mention["predictions"]
-            del mention["mention(s)"]
-            
-        import copy
+        metrics.observe('tca_request_mentions', len(mention_data))
+
+        # score the infer data on the model loaded once per process
+        model = model_registry.get_model(self.model)
+
+        # mentions standardized by earlier requests are taken from the cache, the rest are scored by the model
+        cache_version = (self.model, model_registry.get_model_version(self.model), self.__class_type_mapper.get('kg_version', None))
+        misses = {}
+        for idx, unique in uniques.items():
+            cached = mention_cache.get((cache_version, unique["mention(s)"]))
+            if cached is None:
+                misses[idx] = unique
+            else:
+                unique.clear()
+                unique.update(cached)
+        logging.info(f"{len(uniques)-len(misses)} unique mentions found in the mention cache.")
+
+        mention_data = {}
+        if misses:
+            infer_data = {"label_type": "int", "label": "entity_id", "data_type": "strings", "data": misses}
+            with metrics.timer('inference'):
+                model_data = model.infer(infer_data)
+            mention_data = model_data.get("data", {})
+
+        with metrics.timer('version_standardization'):
+            for idx, mention in mention_data.items():
+                mention_name = mention.get("mention(s)", "")
+                predictions = mention.get("predictions", [])
+                if not predictions:
+                    logging.info(f"No predictions for {mention}")
+                    # continue
+                entity_names= [self.__entity_data[p[0]][0] for p in predictions if p[1] > self.medium_threshold]
+                entity_types= [self.__entity_data[p[0]][1] for p in predictions if p[1] > self.medium_threshold]
+                conf_scores = [round(p[1],2) for p in predictions if p[1] > self.medium_threshold]
+                mention["mention"]      = mention_name
+                mention["entity_names"] = entity_names
+                versions    = []
+                for entity, score in zip(entity_names, conf_scores):
+                    version  = self.version_standardizer(mention_name, [entity, score])
+                    versions.append(version)
+                mention["entity_types"] = entity_types
+                mention["confidence"]   = conf_scores
+                mention["versions"]     = versions
+                del mention["predictions"]
+                del mention["mention(s)"]
+                mention_cache.put((cache_version, mention_name), mention)
+
+        # each mention gets its own record, the lists of predictions are shared and must not be modified
         for idx in mentions:
-            mentions[idx] = copy.deepcopy(mentions[idx])
+            mentions[idx] = dict(mentions[idx])
             mentions[idx]["mention_id"] = idx
             if appid[idx] is not None:
                 mentions[idx]["app_id"] = appid[idx]
@@ -224,7 +278,7 @@ class Standardization():
         return list(mentions.values())
 
     def version_standardizer(self, mention, entity):
-        vd = version_detector()
+        vd = self.__version_detector
         version = vd.get_version_strings(mention.lower())
         std_version = vd.get_standardized_version(vd, entity, version)
         final_version = (version,std_version)
@@ -234,138 +288,105 @@ class Standardization():
 
 
 
+    @staticmethod
+    def __contained_mentions(mentions, strict):
+        """
+        Returns the mentions sharing a word with another mention of at least as many words, or of more words
+        if strict is set
+        """
+        # Maps each word to the two mentions with the most words containing it
+        longest = {}
+        words   = []
+        for i, mention in enumerate(mentions):
+            mention_words = mention.split(' ')
+            words.append(mention_words)
+            for w in set(mention_words):
+                first, second = longest.get(w, ((-1, -1), (-1, -1)))
+                count = len(mention_words)
+                if count > first[0]:
+                    first, second = (count, i), first
+                elif count > second[0]:
+                    second = (count, i)
+                longest[w] = (first, second)
+
+        contained = set()
+        for i, mention_words in enumerate(words):
+            count = len(mention_words)
+            for w in mention_words:
+                first, second = longest[w]
+                other = second if first[1] == i else first
+                if other[0] > count or (not strict and other[0] == count):
+                    contained.add(i)
+                    break
+        return contained
+
     def remove_redundant_mentions(self, app_data):
 
         app_keys = ['Runlib', 'Runtime', 'OS', 'Lib', 'App Server', 'Lang', 'App', 'VM', 'Storage', 'Plugin', 'HW', 'Technology']
 
         for app in app_data:
 
-            #  remove mention_id
-            for k in app.keys():
-                if type(app[k]) is dict:
-                    for m in app[k].keys():
-                        app[k][m] = {key: val for key, val in app[k][m].items() if key != 'mention_id'}
-
-            used_mentions = ""
-            used_mentions_general = ""
             words_to_entities = {}
             for k in app_keys:
                 if k in app:
                     for m in app[k]:
-                        used_mentions = used_mentions + ' ' + str(m)
-                        used_mentions_general = used_mentions_general + ' ' + str(m)
-                        words = m.split(' ')
-                        for w in words:
+                        for w in str(m).split(' '):
                             if w in words_to_entities:
                                 words_to_entities[w]['entities'].append(m)
-                                words_to_entities[w]['scores'].append(app[k][m]['score'])
+                                words_to_entities[w]['scores'].append(app[k][m].score)
                             else:
-                                words_to_entities[w] = {'entities': [m], 'scores': [app[k][m]['score']]}
-
+                                words_to_entities[w] = {'entities': [m], 'scores': [app[k][m].score]}
 
-            used_mentions = np.unique(np.array(used_mentions.split(' '))).tolist()
-            if '' in used_mentions:
-                used_mentions.remove('')
+            used_mentions = sorted(w for w in words_to_entities if w != '')
+            used_words    = set(used_mentions)
 
             # low medium confidence
             if 'low_medium_confidence' in app:
 
-                low_mentions = []
-                low_mentions_count = []
-                for lmc in app['low_medium_confidence']:
-                    m = lmc.split(' ')
-                    low_mentions.append(m)
-                    low_mentions_count.append(len(m))
-
-                to_remove = []
-                for i, lmc in enumerate(app['low_medium_confidence']):
-                    for t in lmc.split(' '):
-                        if t in used_mentions:
-                            if lmc not in to_remove:
-                                to_remove.append(lmc)
-                                break
-
-                        for j, m in enumerate(low_mentions):
-                            if j != i:
-                                if t in m and low_mentions_count[i] <= low_mentions_count[j]:
-                                    if lmc not in to_remove:
-                                        to_remove.append(lmc)
-                                        break
-
-                if len(to_remove) > 0:
-                    for t in to_remove:
-                        app['low_medium_confidence'].pop(t)
+                low_mentions = list(app['low_medium_confidence'])
+                contained    = self.__contained_mentions(low_mentions, strict=False)
+                for i, lmc in enumerate(low_mentions):
+                    if i in contained or any(t in used_words for t in lmc.split(' ')):
+                        app['low_medium_confidence'].pop(lmc)
 
                 if bool(app['low_medium_confidence']) is False:
                     app.pop('low_medium_confidence')
 
             # unknown
             if 'unknown' in app:
-                app['unknown'] = np.unique(np.array(app['unknown'])).tolist()
-                unknown_mentions = []
-                unknown_mentions_count = []
-                for u in app['unknown']:
-                    m = u.split(' ')
-                    unknown_mentions.append(m)
-                    unknown_mentions_count.append(len(m))
-
-                to_remove = []
-                for i, u in enumerate(app['unknown']):
-                    for t in u.split(' '):
-                        if t in used_mentions:  # used_mentions_general
-                            if u not in to_remove:
-                                to_remove.append(u)
-                                break
-
-                        remove = False
-                        for j, m in enumerate(unknown_mentions):
-                            if j != i:
-                                if t in m and unknown_mentions_count[i] < unknown_mentions_count[j]:
-                                    remove = True
-                                    break
-
-                        if remove is True:
-                            if u not in to_remove:
-                                to_remove.append(u)
-                                break
-
-                if len(to_remove) > 0:
-                    for t in to_remove:
-                        app['unknown'].remove(t)
+                unknown_mentions = sorted(set(app['unknown']))
+                contained        = self.__contained_mentions(unknown_mentions, strict=True)
+                app['unknown']   = [u for i, u in enumerate(unknown_mentions)
+                                    if i not in contained and not any(t in used_words for t in u.split(' '))]
 
                 if app['unknown'] == []:
                     app.pop('unknown')
 
-            # regular keys
-            m_to_remove = []
-            m_to_keep = []
+            # regular keys, the highest scoring mention of each word is kept
+            m_to_remove = set()
+            m_to_keep   = set()
             for m in used_mentions:
-                if m in words_to_entities:
-                    if len(words_to_entities[m]['entities']) > 1:
-                        ind = np.argsort(np.array(words_to_entities[m]['scores']))[::-1]
-                        m_to_keep.append(words_to_entities[m]['entities'][ind[0]])
-                        for i in ind[1:]:
-                            m_to_remove.append(words_to_entities[m]['entities'][i])
-                    elif len(words_to_entities[m]['entities']) == 1:
-                        m_to_keep.append(words_to_entities[m]['entities'][0])
-
+                entities = words_to_entities[m]['entities']
+                if len(entities) > 1:
+                    ind = np.argsort(np.array(words_to_entities[m]['scores']))[::-1]
+                    m_to_keep.add(entities[ind[0]])
+                    for i in ind[1:]:
+                        m_to_remove.add(entities[i])
+                else:
+                    m_to_keep.add(entities[0])
 
-            if len(m_to_remove) > 0:
-                for m in m_to_remove:
-                    if m not in m_to_keep:
-                        for k in app_keys:
-                            if k in app:
-                                if m in app[k]:
-                                    app[k].pop(m)
+            for m in m_to_remove - m_to_keep:
+                for k in app_keys:
+                    if k in app:
+                        if m in app[k]:
+                            app[k].pop(m)
 
 
         return app_data
 
     def remove_stopwords(self, s):
-        stop_words = [" of ", " for ", " on ", " in ", " no ", "unknown", "none", " as ", "string", " id ", \
-                      "version", "edition", " a ", " by ", " if ", "other"]
-        for w in stop_words:
-            s = re.sub(w, ' ', s, flags=re.IGNORECASE)
+        for pattern in stop_word_patterns:
+            s = pattern.sub(' ', s)
 
         return s
 
@@ -374,102 +395,69 @@ class Standardization():
         # group mentions by app
         res = {}
         for v in mentions:
-            if v['app_id'] not in res.keys():
+            if v['app_id'] not in res:
                 res[v['app_id']] = []
 
             res[v['app_id']].append(v)
 
         # loop over apps
         m_to_keep = []
+        kept      = set()  # ids of the mentions in m_to_keep
         for app in res:
-            mentions = res[app]
-            used_mentions = ""
             words_to_entities = {}
 
             # build list of possible entities/mentions per mention word
-            for m in mentions:
-                if 'combo_id' not in m.keys():
+            for m in res[app]:
+                if 'combo_id' not in m:
                     m['combo_id'] = m['mention_id']
 
                 if len(m['entity_names']) > 0:
-                    words = str(m['mention']).split(' ')
-
-                    for w in words:
-                        used_mentions = used_mentions + ' ' + w + '_' + str(m['combo_id'])
+                    for w in str(m['mention']).split(' '):
                         w_id = w + '_' + str(m['combo_id'])
                         if w_id in words_to_entities:
-                            words_to_entities[w_id]['entities'].append(m)  # m['entity_names'][0]
+                            words_to_entities[w_id]['entities'].append(m)
                             words_to_entities[w_id]['scores'].append(m['confidence'][0])
                         else:
-                            words_to_entities[w_id] = {'entities': [m],
-                                                    'scores': [m['confidence'][0]]}  # m['entity_names'][0]
+                            words_to_entities[w_id] = {'entities': [m], 'scores': [m['confidence'][0]]}
 
-            used_mentions = np.unique(np.array(used_mentions.split(' '))).tolist()
-            if '' in used_mentions:
-                used_mentions.remove('')
+            max_scores = {w_id: max(candidates['scores']) for w_id, candidates in words_to_entities.items()}
 
-            for m in used_mentions:
-                ind = np.argsort(np.array(words_to_entities[m]['scores']))[::-1]
+            for m in sorted(words_to_entities):
+                entities = words_to_entities[m]['entities']
+                scores   = words_to_entities[m]['scores']
+                ind = np.argsort(np.array(scores))[::-1] if len(scores) > 1 else [0]
 
+                # candidates scoring within 0.03 of the best one are ties
                 lim_ind = 0
-                while lim_ind < len(words_to_entities[m]['scores'])-1 and np.abs(float(words_to_entities[m]['scores'][ind[lim_ind+1]]) - float(words_to_entities[m]['scores'][ind[0]])) < 0.03:
+                while lim_ind < len(scores)-1 and abs(float(scores[ind[lim_ind+1]]) - float(scores[ind[0]])) < 0.03:
                     lim_ind += 1
 
-                m_to_remove = []
-
+                # a tied candidate is dropped if another of its words is better matched
+                removed = set()
                 if lim_ind > 0:
 
                     for i in range(0, lim_ind + 1):
-                        m_temp = words_to_entities[m]['entities'][ind[i]]
+                        m_temp = entities[ind[i]]
                         temp_words = str(m_temp['mention']).split(' ')
                         if len(temp_words) > 1:
                             for w in temp_words:
-                                if w != m:
-                                    w_id = w + '_' + str(m_temp['combo_id'])
-                                    if float(words_to_entities[m]['scores'][ind[i]]) < np.max(np.array(words_to_entities[w_id]['scores'])): #   and words_to_entities[m]['combo_id'] != words_to_entities[w_id]['combo_id']:
-                                        m_to_remove.append(m_temp)
+                                if w != m and float(scores[ind[i]]) < max_scores[w + '_' + str(m_temp['combo_id'])]:
+                                    removed.add(id(m_temp))
+                                    break
 
                 for i in range(0,lim_ind+1):
-                    if words_to_entities[m]['entities'][ind[i]] not in m_to_keep and words_to_entities[m]['entities'][ind[i]] not in m_to_remove:
-                        m_to_keep.append(words_to_entities[m]['entities'][ind[i]])
+                    entity = entities[ind[i]]
+                    if id(entity) not in kept and id(entity) not in removed:
+                        kept.add(id(entity))
+                        m_to_keep.append(entity)
 
         return m_to_keep
 
 
-
     def compute_combinations(self, tech_stack):
         """Split the text with white space delimiter compute all combinations of words"""
         try:
-
-            if len(tech_stack) > 7 and tech_stack[:7] == 'NOCOMBO':
-                return [tech_stack[7:]]
-
-            limit = 6
-
-            text0 = tech_stack
-            tech_list0 = text0.split(" ")
-
-            if len(tech_list0) > 1:
-
-                tech_list = []
-                for i, each in enumerate(tech_list0):
-                    if is_version(tech_list0[i]):
-                        continue
-
-                    tech_list.append(each)
-                    if i < len(tech_list0) - 1:
-                        for j in range(i + 1, min(i + limit, len(tech_list0))):
-                            if is_version(tech_list0[j]):
-                                tech_list[-1] = ' '.join(tech_list0[i:j + 1])
-                            else:
-                                tech_list.append(' '.join(tech_list0[i:j + 1]))
-                            if is_version(tech_list0[j]) and j < min(i + limit, len(tech_list0))-1 and tech_list0[j+1] not in version_suffixes:
-                                break
-
-            else:
-                tech_list = tech_list0
-
-            return tech_list
+            return list(combinations(tech_stack))
 
         except Exception as e:
             logging.error(str(e))
@@ -484,6 +472,12 @@ class Standardization():
         if (not app_data)  or len(app_data) == 0:
             return app_data
 
+        # large payloads are standardized in chunks across the worker pool
+        if worker_pool.is_enabled(len(app_data)):
+            pool_data = worker_pool.standardize(app_data)
+            if pool_data is not None:
+                return pool_data
+
         general_term_key = 'Technology'
 
         mentions = []
@@ -491,46 +485,48 @@ class Standardization():
         mentions_to_combos = {}
         num_combo = 0
 
-        for idx, app in enumerate(app_data):
-            id_to_app[idx] = app
+        app_mentions = []  # (app index, mentions of the app)
+        with metrics.timer('preprocessing'):
+            for idx, app in enumerate(app_data):
+                id_to_app[idx] = app
 
-            tech_stack = ''
-            for header in app:
+                tech_stack = ''
+                for header in app:
 
-                if self.__tca_input_mapper.get(header, 'NA') == 'tech_stack' and app[header] and str(app[header]).lower() not in ['na', 'null', 'string', 'none']:
-                    component_string = str(app[header])
-                    component_string = self.remove_stopwords(component_string)
+                    if self.__tca_input_mapper.get(header, 'NA') == 'tech_stack' and app[header] and str(app[header]).lower() not in ['na', 'null', 'string', 'none']:
+                        component_string = str(app[header])
+                        component_string = self.remove_stopwords(component_string)
 
-                    if header != 'technology_summary':
-                        component_string = 'NOCOMBO' + component_string
+                        if header != 'technology_summary':
+                            component_string = 'NOCOMBO' + component_string
 
-                    if tech_stack:
-                        tech_stack = tech_stack + ', ' + component_string
-                    else:
-                        tech_stack = component_string
-
-            if not tech_stack:
-                continue
-
-            tech_stack = Utils.preprocess_tech_stack_for_sim(tech_stack)
-            app_mentions = utils.preprocess(tech_stack)
+                        if tech_stack:
+                            tech_stack = tech_stack + ', ' + component_string
+                        else:
+                            tech_stack = component_string
 
-            # split each mention into combination of words
-            for m in app_mentions:
-                combos = self.compute_combinations(m)
+                if not tech_stack:
+                    continue
 
-                for c in combos:
-                    num_mentions = len(mentions)
-                    mentions.append({"app_id": idx, "mention_id": num_mentions, "mention": c, "combo_id": num_combo})
-                    mentions_to_combos[num_mentions] = num_combo
+                tech_stack = Utils.preprocess_tech_stack_for_sim(tech_stack)
+                app_mentions.append((idx, utils.preprocess(tech_stack)))
 
-                num_combo += 1
+                app["KG Version"] = self.__class_type_mapper['kg_version']
+                for x in set(self.__class_type_mapper['mappings'].values()):
+                    app[x] = {}
 
+        # split each mention into combination of words
+        with metrics.timer('compute_combinations'):
+            for idx, app_mention_list in app_mentions:
+                for m in app_mention_list:
+                    combos = self.compute_combinations(m)
 
+                    for c in combos:
+                        num_mentions = len(mentions)
+                        mentions.append({"app_id": idx, "mention_id": num_mentions, "mention": c, "combo_id": num_combo})
+                        mentions_to_combos[num_mentions] = num_combo
 
-            app["KG Version"] = self.__class_type_mapper['kg_version']
-            for x in set(self.__class_type_mapper['mappings'].values()):
-                app[x] = {}
+                    num_combo += 1
 
 
         # standardize mentions
@@ -540,7 +536,8 @@ class Standardization():
         for m in std_mentions:
             m["combo_id"] = mentions_to_combos[m['mention_id']]
 
-        valid_mentions = self.select_mentions(std_mentions)
+        with metrics.timer('mention_selection'):
+            valid_mentions = self.select_mentions(std_mentions)
 
         for mention_data in valid_mentions:
 
@@ -572,13 +569,13 @@ class Standardization():
                     m_to_remove = []
                     for m in app[general_term_key]:
 
-                        if entity.split('|')[0] == list(app[general_term_key][m].keys())[0].split('|')[0] and\
+                        if entity.split('|')[0] == app[general_term_key][m].entity.split('|')[0] and\
                                 len(intersection(m.split(' '),mention_words)) > 0  and \
-                                mentions_to_combos[mention_id] == mentions_to_combos[app[general_term_key][m]['mention_id']]: # .split('|')[0] .split('|')[0]
+                                mentions_to_combos[mention_id] == mentions_to_combos[app[general_term_key][m].mention_id]: # .split('|')[0] .split('|')[0]
 
-                            if (app[general_term_key][m]['score'] < score and \
+                            if (app[general_term_key][m].score < score and \
                                 len(mention) > len(m)) or \
-                                    (abs(app[general_term_key][m]['score'] - score) < self.length_threshold and (
+                                    (abs(app[general_term_key][m].score - score) < self.length_threshold and (
                                              len(mention) > len(m)) or \
                                      (mention.split(' ')[-1].replace('.', '').isdigit() and not m.split(' ')[
                                          -1].replace('.', '').isdigit())):
@@ -595,10 +592,10 @@ class Standardization():
                     if found is False or insert is True:
 
                         if mention not in app[general_term_key]:
-                            app[general_term_key][mention] = {}
-                        app[general_term_key][mention][entity] = version
-                        app[general_term_key][mention]['score'] = score
-                        app[general_term_key][mention]['mention_id'] = mention_id
+                            app[general_term_key][mention] = MentionMatch(entity, version, score, mention_id)
+                        else:
+                            app[general_term_key][mention].update(entity, version, score)
+                            app[general_term_key][mention].mention_id = mention_id
                 else:
                     if score >= self.high_threshold:
                         if mention not in app[self.__class_type_mapper['mappings'][entity]]:
@@ -608,14 +605,14 @@ class Standardization():
 
                             for m in app[self.__class_type_mapper['mappings'][entity]]:
 
-                                if ((entity.split('|')[0] == list(app[self.__class_type_mapper['mappings'][entity]][m].keys())[0].split('|')[0] and \
+                                if ((entity.split('|')[0] == app[self.__class_type_mapper['mappings'][entity]][m].entity.split('|')[0] and \
                                         len(intersection(m.split(' '),mention_words)) > 0 ) or \
                                     (len(intersection(m.split(' '),mention_words)) > len(m.split(' '))*self.terms_threshold or len(intersection(m.split(' '),mention_words)) > len(mention_words)*self.terms_threshold)  ) and \
-                                        mentions_to_combos[mention_id] == mentions_to_combos[app[self.__class_type_mapper['mappings'][entity]][m]['mention_id']]:  # .split('|')[0]  .split('|')[0]
+                                        mentions_to_combos[mention_id] == mentions_to_combos[app[self.__class_type_mapper['mappings'][entity]][m].mention_id]:  # .split('|')[0]  .split('|')[0]
 
-                                    if (app[self.__class_type_mapper['mappings'][entity]][m]['score'] < score and \
+                                    if (app[self.__class_type_mapper['mappings'][entity]][m].score < score and \
                                         len(mention) > len(m) )  or \
-                                            (abs(app[self.__class_type_mapper['mappings'][entity]][m]['score'] - score) < self.length_threshold and (
+                                            (abs(app[self.__class_type_mapper['mappings'][entity]][m].score - score) < self.length_threshold and (
                                                     len(mention) > len(m)) or \
                                              (mention.split(' ')[-1].replace('.', '').isdigit() and not m.split(' ')[
                                                  -1].replace('.', '').isdigit())):
@@ -630,17 +627,14 @@ class Standardization():
                                     for m in m_to_remove:
                                         app[self.__class_type_mapper['mappings'][entity]].pop(m)
 
-                                app[self.__class_type_mapper['mappings'][entity]][mention] = {}
-                                app[self.__class_type_mapper['mappings'][entity]][mention][entity] = version
-                                app[self.__class_type_mapper['mappings'][entity]][mention]['score'] = score
-                                app[self.__class_type_mapper['mappings'][entity]][mention]['mention_id'] = mention_id
+                                app[self.__class_type_mapper['mappings'][entity]][mention] = MentionMatch(entity, version, score, mention_id)
                                 # break
                     else:
                         # low or medium confidence
                         if mention not in low_medium_confidence:
-                            low_medium_confidence[mention] = {}
-                        low_medium_confidence[mention][entity] = version
-                        low_medium_confidence[mention]['score'] = score
+                            low_medium_confidence[mention] = MentionMatch(entity, version, score)
+                        else:
+                            low_medium_confidence[mention].update(entity, version, score)
 
             elif len(entity_names) == 0:
                 unknown.append(mention)
@@ -650,9 +644,8 @@ class Standardization():
             if unknown:
                 app['unknown'] = unknown
 
-        # remove redundant mentions and entity matching scores
+        # remove redundant mentions and format the remaining matches
         app_data = self.remove_redundant_mentions(app_data)
-        app_data = self.remove_scores(app_data)
         app_data = self.format_mentions(app_data)
 
 
@@ -0,0 +1,176 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import configparser
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+
+class _Validation():
+    """
+    Validation of a token in progress, waited on by the concurrent requests with the same token
+    """
+    __slots__ = ['done', 'is_valid']
+
+    def __init__(self):
+        self.done     = threading.Event()
+        self.is_valid = False
+
+
+class TokenCache():
+    """
+    Cache of RBAC access token validations shared by every request of a worker process. Entries are keyed on a hash
+    of the validation url and the token, valid tokens are kept for ttl seconds and rejected ones for negative_ttl
+    seconds. Validations go through a pooled keep-alive session, and concurrent validations of the same token are
+    made once.
+    """
+
+    def __init__(self, ttl=None, negative_ttl=None, max_size=None, timeout=None, pool_size=None):
+        """
+        Init method for TokenCache Class
+        """
+        if ttl is None:
+            ttl = config.getfloat('RBAC', 'token_cache_ttl', fallback=300)
+        if negative_ttl is None:
+            negative_ttl = config.getfloat('RBAC', 'token_cache_negative_ttl', fallback=30)
+        if max_size is None:
+            max_size = config.getint('RBAC', 'token_cache_max_size', fallback=10000)
+        if timeout is None:
+            timeout = config.getfloat('RBAC', 'timeout', fallback=10)
+        if pool_size is None:
+            pool_size = config.getint('RBAC', 'pool_size', fallback=10)
+
+        self.ttl          = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size     = max_size
+        self.timeout      = timeout
+        self.pool_size    = pool_size
+        self.hits         = 0
+        self.misses       = 0
+        self.__entries = OrderedDict()  # Maps key to (expiry time, validity of the token)
+        self.__pending = {}             # Maps key to the _Validation in progress
+        self.__session = None
+        self.__lock    = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        Returns the keep-alive session to the RBAC service, creating it on first use
+        """
+        with self.__lock:
+            if self.__session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.__session = session
+            return self.__session
+
+    def __validate(self, auth_url, headers):
+        """
+        Asks the RBAC service whether the token in headers is authorized, returns its validity and how long the
+        answer can be cached. Errors of the service are not cached.
+        """
+        try:
+            auth_response = self.session.get(auth_url, headers = headers, verify=False, timeout=self.timeout)
+            if auth_response.status_code == requests.codes.ok: #pylint: disable=no-member
+                try:
+                    auth_response_json = auth_response.json()
+                    if auth_response_json and auth_response_json['isAuthorized'] == 'Y':
+                        return True, self.ttl
+                    logging.warning(f'access token response json: {json.dumps(auth_response_json)}')
+                    return False, self.negative_ttl
+                except (ValueError, KeyError, TypeError):
+                    logging.error(f'access token response error: {auth_response}')
+            elif auth_response.status_code in [401, 403]:
+                return False, self.negative_ttl
+            else:
+                logging.error(f'access token response error: {auth_response}')
+        except Exception as e:
+            logging.error(f'access token validation failed: {str(e)}')
+        return False, 0
+
+    def is_valid(self, auth_url, headers, accesstoken):
+        """
+        Returns whether accesstoken is authorized by the RBAC service at auth_url, validating it with the request
+        headers on a cache miss
+        """
+        key = hashlib.sha256(f'{auth_url}\n{accesstoken}'.encode('utf-8')).hexdigest()
+        with self.__lock:
+            entry = self.__entries.get(key, None)
+            if entry is not None and entry[0] < time.time():
+                del self.__entries[key]
+                entry = None
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            validation = self.__pending.get(key, None)
+            is_leader  = validation is None
+            if is_leader:
+                validation = _Validation()
+                self.__pending[key] = validation
+
+        if not is_leader:
+            validation.done.wait()
+            return validation.is_valid
+
+        try:
+            is_valid, ttl = self.__validate(auth_url, headers)
+            validation.is_valid = is_valid
+            with self.__lock:
+                if ttl > 0 and self.max_size > 0:
+                    self.__entries[key] = (time.time() + ttl, is_valid)
+                    self.__entries.move_to_end(key)
+                    while len(self.__entries) > self.max_size:
+                        self.__entries.popitem(last=False)
+        finally:
+            with self.__lock:
+                del self.__pending[key]
+            validation.done.set()
+        return validation.is_valid
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit and miss counters
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns the size and hit/miss counters of the cache
+        """
+        with self.__lock:
+            return {"size": len(self.__entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache()
@@ -25,6 +25,8 @@ common = os.path.join("config", "common.ini")
 kg     = os.path.join("config", "kg.ini")
 config.read([common, kg])
 
+non_ascii_pattern = re.compile(r'[^\x00-\x7F]+')
+
 
 class Utils:
 
@@ -36,7 +38,10 @@ class Utils:
         '''
 
         try:
-            tech_stack = re.sub(r'[^\x00-\x7F]+', " ", " " + str(tech_stack) + " ").strip()
+            tech_stack = str(tech_stack)
+            if tech_stack.isascii():
+                return tech_stack.strip()
+            tech_stack = non_ascii_pattern.sub(" ", " " + tech_stack + " ").strip()
             return tech_stack
 
         except Exception as e:
@@ -17,29 +17,138 @@
 import os
 import re
 import logging
-import json
 import configparser
 
+from service.kg_context import get_kg_context
+
 config = configparser.ConfigParser()
 common = os.path.join("config", "common.ini")
 kg = os.path.join("config", "kg.ini")
 config.read([common, kg])
 
 
-class version_detector:
+def split_version(version):
+    """
+    Splits a version string on '.' and converts its numeric parts to int, non-numeric parts to None
+    """
+    parts = version.split('.')
+    return parts, tuple(int(p) if p.isnumeric() else None for p in parts)
 
-    def __init__(self, logger=False):
-        self.__class_version = {}
 
-        class_version_filepath = os.path.join(config['general']['kg_dir'], config['filenames']['entity_versionsKG'])
-        if os.path.exists(class_version_filepath):
-            with open(class_version_filepath, 'r') as f:
-                self.__class_version = json.load(f)
+class VersionIndex:
+    """
+    Versions of the entity versions KG, pre-split into numeric tuples and grouped by entity and major version.
+    Entities are indexed on first lookup, so that KGs read from the SQLite backend are only queried for the
+    entities of the requests.
+    """
+
+    def __init__(self, class_version):
+        self.__entities = class_version.get("Entity", {})
+        self.__index    = {}  # Maps entity to (latest version, {major: [(version, parts, numbers)]}, {major: highest})
+
+    def __entity_index(self, entity):
+        """
+        Returns the latest version, the versions grouped by major version in KG order and the first highest version of
+        each major version of the entity, None if a version of the major version is not numeric
+        """
+        index = self.__index.get(entity, None)
+        if index is not None:
+            return index
+
+        db_entries = self.__entities.get(entity, None) or []
+        latest = db_entries[0][-1] if db_entries else "NA_VERSION"
+        majors = {}
+        for db_entry in db_entries:
+            parts, numbers = split_version(db_entry[0])
+            if parts[0].isnumeric():
+                majors.setdefault(parts[0], []).append((db_entry[0], parts, numbers))
+
+        highest_versions = {}
+        for major, versions in majors.items():
+            highest = None
+            for db_version in versions:
+                if None in db_version[2]:
+                    highest = None
+                    break
+                if highest is None or db_version[2] > highest[2]:
+                    highest = db_version
+            highest_versions[major] = highest
+
+        index = (latest, majors, highest_versions)
+        self.__index[entity] = index
+        return index
+
+    def has_entity(self, entity):
+        return entity in self.__entities
+
+    def get_latest_version(self, entity):
+        """
+        Returns the latest known version of the entity
+        """
+        return self.__entity_index(entity)[0]
+
+    def get_standardized_version(self, entity, version):
+        """
+        Returns the version of the entity with the same major version that is the highest known match of version.
+        When all versions are numeric this is a single lookup, otherwise versions are compared part by part in KG order.
+        """
+        my_std_version_sp, my_std_version_nums = split_version(version)
+        if not my_std_version_sp[0].isnumeric():
+            return version
+        _, majors, highest_versions = self.__entity_index(entity)
+        versions = majors.get(my_std_version_sp[0], [])
+        if not versions:
+            return version
+
+        highest = highest_versions[my_std_version_sp[0]]
+        if highest is not None and None not in my_std_version_nums:
+            return highest[0] if highest[2] > my_std_version_nums else version
+
+        my_std_version = version
+        for db_version, db_entry_version_sp, db_entry_version_nums in versions:
+            min_len = min(len(db_entry_version_sp), len(my_std_version_sp))
+            update_with_version = False
+            numMatches = 0
+            for i in range(1, min_len):
+                if db_entry_version_nums[i] is not None and my_std_version_nums[i] is not None:
+                    db_i = db_entry_version_nums[i]
+                    version_i = my_std_version_nums[i]
+                    if db_i > version_i:
+                        update_with_version = True
+                        break
+                    elif db_i < version_i:
+                        break
+                    elif db_i == version_i:
+                        numMatches = numMatches + 1
+                else:
+                    if db_entry_version_sp[i] != my_std_version_sp[i]:
+                        break
+            if len(db_entry_version_sp) > len(my_std_version_sp) and numMatches == len(
+                    my_std_version_sp) - 1:
+                update_with_version = True
+            if update_with_version:
+                my_std_version = db_version
+                my_std_version_sp = db_entry_version_sp
+                my_std_version_nums = db_entry_version_nums
+        return my_std_version
+
 
-        else:
-            self.__class_version = {}
+_version_index = None
 
-            logging.error(f'class_type_mapper[{class_version_filepath}] is empty or not exists')
+def get_version_index():
+    """
+    Returns the process wide VersionIndex built from the shared KG context
+    """
+    global _version_index
+    if _version_index is None:
+        _version_index = VersionIndex(get_kg_context().entity_versions)
+    return _version_index
+
+
+class version_detector:
+
+    def __init__(self, logger=False):
+        self.__version_index = get_version_index()
 
 
     @staticmethod
@@ -126,45 +235,10 @@ class version_detector:
 
     @staticmethod
     def get_latest_version(self, text):
-        my_latest_version = "NA_VERSION"
-        if text[0] in self.__class_version["Entity"].keys():
-            my_latest_version = self.__class_version["Entity"][text[0]][0][-1]
-        return my_latest_version
+        return self.__version_index.get_latest_version(text[0])
 
     @staticmethod
     def get_standardized_version(self, text, version):
-        my_std_version = "NA_VERSION"
         if version == "NA_VERSION":
-            my_std_version = self.get_latest_version(self, text)
-        else:
-            my_std_version = version
-            my_std_version_sp = re.split('[.]', my_std_version)
-            if my_std_version_sp[0].isnumeric():
-                if text[0] in self.__class_version["Entity"].keys():
-                    for db_entries in self.__class_version["Entity"][text[0]]:
-                        db_entry_version_sp = re.split('[.]', db_entries[0])
-                        if db_entry_version_sp[0].isnumeric() and db_entry_version_sp[0] == my_std_version_sp[0]:
-                            min_len = min(len(db_entry_version_sp), len(my_std_version_sp))
-                            update_with_version = False
-                            numMatches = 0
-                            for i in range(1, min_len):
-                                if db_entry_version_sp[i].isnumeric() and my_std_version_sp[i].isnumeric():
-                                    db_i = int(db_entry_version_sp[i])
-                                    version_i = int(my_std_version_sp[i])
-                                    if db_i > version_i:
-                                        update_with_version = True
-                                        break
-                                    elif db_i < version_i:
-                                        break
-                                    elif db_i == version_i:
-                                        numMatches = numMatches + 1
-                                else:
-                                    if db_entry_version_sp[i] != my_std_version_sp[i]:
-                                        break
-                            if len(db_entry_version_sp) > len(my_std_version_sp) and numMatches == len(
-                                    my_std_version_sp) - 1:
-                                update_with_version = True
-                            if update_with_version:
-                                my_std_version = db_entries[0]
-                                my_std_version_sp = db_entry_version_sp
-        return my_std_version
+            return self.get_latest_version(self, text)
+        return self.__version_index.get_standardized_version(text[0], version)
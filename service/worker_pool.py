@@ -0,0 +1,156 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import atexit
+import logging
+import threading
+import configparser
+import multiprocessing
+
+config = configparser.ConfigParser()
+common = os.path.join("config", "common.ini")
+config.read([common])
+
+_in_pool_worker = False
+_standardization = None
+_plans = {}  # Maps a catalog to the Plan of the pool worker
+
+
+def _init_pool_worker():
+    """
+    Warms a pool worker process with the KG, the entity standardization model and its Standardization
+    """
+    global _in_pool_worker, _standardization
+    _in_pool_worker = True
+
+    from service.kg_context import get_kg_context
+    from service.model_registry import model_registry
+    from service.standardization import Standardization
+    get_kg_context().load_all_catalogs()
+    model_registry.warm()
+    _standardization = Standardization()
+
+def _standardize_chunk(apps):
+    """
+    Runs app standardization on a chunk of apps in a pool worker
+    """
+    return _standardization.app_standardizer(apps)
+
+def _plan_chunk(args):
+    """
+    Runs container mapping on a chunk of apps in a pool worker
+    """
+    from service.planning import Plan
+    apps, catalog = args
+    if catalog not in _plans:
+        _plans[catalog] = Plan(catalog=catalog)
+    return _plans[catalog].map_to_docker(apps, catalog)
+
+
+class WorkerPool():
+    """
+    Process pool configured by the [Performance] section of common.ini. Large payloads are split into
+    chunks of apps that are processed by pre-warmed worker processes and merged back in input order.
+    Worker processes are started with start_method, spawn by default, as forking a gunicorn worker running
+    request threads can deadlock on locks held by the other threads.
+    """
+
+    def __init__(self):
+        """
+        Init method for WorkerPool Class
+        """
+        try:
+            self.enabled            = config['Performance'].get('multiprocessing_enabled', 'NO').lower() in ['yes', 'true']
+            self.processes          = int(config['Performance'].get('processes', os.cpu_count()))
+            self.maxtasksperchild   = int(config['Performance'].get('maxtasksperchild', 0)) or None
+            self.chunksize          = max(1, int(config['Performance'].get('chunksize', 32)))
+            self.start_method       = config['Performance'].get('start_method', 'spawn')
+        except KeyError as k:
+            logging.error(f'{k} is not a key in your common.ini file.')
+            self.enabled = False
+            self.start_method = 'spawn'
+
+        self.__pool = None
+        self.__lock = threading.Lock()
+
+    def is_enabled(self, num_apps):
+        """
+        Returns True if a payload of num_apps apps should be processed in the pool
+        """
+        return self.enabled and not _in_pool_worker and num_apps > self.chunksize
+
+    def __get_pool(self):
+        """
+        Returns the process pool, starting it on first use
+        """
+        with self.__lock:
+            if self.__pool is None:
+                logging.info(f"Starting pool of {self.processes} {self.start_method} processes.")
+                context = multiprocessing.get_context(self.start_method)
+                self.__pool = context.Pool(processes=self.processes,
+                                           initializer=_init_pool_worker,
+                                           maxtasksperchild=self.maxtasksperchild)
+                atexit.register(self.close)
+            return self.__pool
+
+    def start(self):
+        """
+        Starts the process pool if it is enabled, e.g. when a gunicorn worker boots
+        """
+        if self.enabled and not _in_pool_worker:
+            self.__get_pool()
+
+    def __map(self, func, chunks):
+        """
+        Maps func over the chunks in the pool and concatenates the results in order,
+        returns None if the pool fails so that the caller can process the payload itself
+        """
+        try:
+            results = []
+            for result in self.__get_pool().imap(func, chunks):
+                results.extend(result)
+            return results
+        except Exception as e:
+            logging.error(f'Worker pool failed: {str(e)}')
+            return None
+
+    def __chunks(self, apps):
+        return [apps[i:i+self.chunksize] for i in range(0, len(apps), self.chunksize)]
+
+    def standardize(self, app_data):
+        """
+        Standardizes the apps in chunks across the pool
+        """
+        return self.__map(_standardize_chunk, self.__chunks(app_data))
+
+    def map_to_docker(self, appL, catalog):
+        """
+        Maps the apps to container images in chunks across the pool
+        """
+        return self.__map(_plan_chunk, [(chunk, catalog) for chunk in self.__chunks(appL)])
+
+    def close(self):
+        """
+        Terminates the worker processes
+        """
+        with self.__lock:
+            if self.__pool is not None:
+                self.__pool.terminate()
+                self.__pool = None
+
+
+worker_pool = WorkerPool()
@@ -209,3 +209,36 @@ class TestClustering(unittest.TestCase):
         pAppL = cluster.output_to_ui_clustering(appL)
 
         assert Test_check.checkEqual(Test_check,expected,pAppL)
+
+    def test_similarity_clustering(self):
+        cluster = Clustering()
+        stacks  = [['Java|*', 'Apache Tomcat', 'MySQL', 'Linux|Red Hat Enterprise Linux', 'Redis', 'MongoDB'],
+                   ['Java|*', 'Apache Tomcat', 'MySQL', 'Linux|Red Hat Enterprise Linux', 'Redis', 'PostgreSQL'],
+                   ['Java|*', 'Apache Tomcat', 'MySQL', 'Linux|Red Hat Enterprise Linux', 'Redis', 'MongoDB'],
+                   ['C#', 'Windows|*', 'IIS|*'],
+                   []]
+        appL = [{"Name": f"App {i}", "Lang": {entity: {"standard_name": entity} for entity in stack}}
+                for i, stack in enumerate(stacks)]
+
+        clusters = cluster.output_to_ui_similarity_clustering(appL, 0.6)
+        self.assertEqual([cl["num_elements"] for cl in clusters], [3, 1, 1])
+        self.assertEqual([app["Name"] for app in clusters[0]["apps"]], ["App 0", "App 1", "App 2"])
+        self.assertEqual(clusters[0]["type"], "similar")
+        self.assertEqual(sum(cl["num_elements"] for cl in cluster.output_to_ui_similarity_clustering(appL, 1.0)), 5)
+        self.assertEqual(len(cluster.output_to_ui_similarity_clustering(appL, 1.0)), 4)
+
+    def test_similarity_clustering_does_not_chain(self):
+        cluster = Clustering()
+        # each tech stack has a similarity of 0.6 with the next one and of at most 0.33 with the others
+        entities = ['Java|*', 'Apache Tomcat', 'MySQL', 'Linux|Red Hat Enterprise Linux', 'Redis', 'MongoDB', 'PostgreSQL', 'Python']
+        stacks   = [entities[i:i+4] for i in range(5)]
+        appL = [{"Name": f"App {i}", "Lang": {entity: {"standard_name": entity} for entity in stack}}
+                for i, stack in enumerate(stacks)]
+
+        clusters = cluster.output_to_ui_similarity_clustering(appL, 0.5)
+        self.assertGreater(len(clusters), 1)
+        for cl in clusters:
+            names = [set(app["Lang"]) for app in cl["apps"]]
+            for i in range(len(names)):
+                for j in range(i + 1, len(names)):
+                    self.assertGreaterEqual(len(names[i] & names[j]) / len(names[i] | names[j]), 0.5)
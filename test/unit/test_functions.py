@@ -0,0 +1,45 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import json
+import unittest
+from service.functions import Functions, read_ndjson_chunks
+
+class TestFunctions(unittest.TestCase):
+
+    def test_read_ndjson_chunks(self):
+        lines  = [b'{"Name": "App 1"}\n', b'\n', b'not json\n', b'{"Name": "App 2"}\n', b'[1, 2]\n', b'{"Name": "App 3"}\n']
+        chunks = list(read_ndjson_chunks(lines, 2))
+        self.assertEqual([[app['Name'] for app in chunk] for chunk, _ in chunks], [['App 1', 'App 2'], ['App 3']])
+        self.assertEqual([[error['message'] for error in errors] for _, errors in chunks],
+                         [['Line 3 is not a json object'], ['Line 5 is not a json object']])
+
+    def test_planning_stream_matches_planning(self):
+        assessment_data = [{"Name": f"App {i}", "Desc": "", "Cmpt": "", "OS": os, "Lang": lang,
+                            "App Server": {}, "Dependent Apps": {}, "Runtime": {}, "Libs": {},
+                            "Reason": "", "KG Version": "1.0.5"} for i, (os, lang) in enumerate([
+                            ({"RHEL 7": {"standard_name": "Linux|Red Hat Enterprise Linux"}}, {"Java": {"standard_name": "Java|*"}}),
+                            ({}, {"Python": {"standard_name": "Python"}}),
+                            ({"Windows": {"standard_name": "Windows|*"}}, {"C#": {"standard_name": "C#"}})])]
+        controller = Functions()
+        expected, code = controller.planning(None, {}, {}, json.loads(json.dumps(assessment_data)), 'dockerhub')
+        self.assertEqual(code, 201)
+
+        lines  = [json.dumps(app).encode('utf-8') + b'\n' for app in assessment_data]
+        output, code = controller.planning_stream(None, {}, {}, lines, 2, 'dockerhub')
+        self.assertEqual(code, 200)
+        self.assertEqual(list(output), expected['containerization'])
@@ -0,0 +1,96 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import subprocess
+from service.jobs import JobStore, JobRunner, COMPLETED, FAILED, QUEUED, RUNNING, WORKER_STOPPED
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'jobs.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def wait(self, store, job_id):
+        for _ in range(100):
+            job = store.get(job_id)
+            if job['state'] in [COMPLETED, FAILED]:
+                return job
+            time.sleep(0.05)
+        self.fail(f'Job {job_id} did not finish')
+
+    def test_job_store(self):
+        store  = JobStore(self.db_file)
+        job_id = store.create('standardize', 3)
+        self.assertEqual(store.get(job_id)['state'], QUEUED)
+        store.add_chunk(job_id, 1, 1, [{'Name': 'App 3'}])
+        store.add_chunk(job_id, 0, 2, [{'Name': 'App 1'}, {'Name': 'App 2'}])
+        self.assertEqual(store.get(job_id)['completed'], 3)
+        self.assertEqual([app['Name'] for app in JobStore(self.db_file).results(job_id)], ['App 1', 'App 2', 'App 3'])
+        self.assertIsNone(store.get('unknown'))
+
+        store.ttl = -1
+        store.create('standardize', 0)
+        self.assertIsNone(store.get(job_id))
+        self.assertEqual(store.results(job_id), [])
+
+    def test_stopped_worker(self):
+        store  = JobStore(self.db_file, stale_timeout=60)
+        job_id = store.create('standardize', 3)
+        store.set_state(job_id, RUNNING)
+        self.assertEqual(store.get(job_id)['state'], RUNNING)
+
+        # Heartbeat older than stale_timeout
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute('UPDATE jobs SET updated = ? WHERE job_id = ?', (time.time() - 120, job_id))
+        job = store.get(job_id)
+        self.assertEqual((job['state'], job['message']), (FAILED, WORKER_STOPPED))
+        store.set_state(job_id, COMPLETED)
+        self.assertEqual(store.get(job_id)['state'], FAILED)
+
+        # Owner process exited
+        process = subprocess.Popen(['true'])
+        process.wait()
+        job_id = store.create('standardize', 3)
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute('UPDATE jobs SET pid = ? WHERE job_id = ?', (process.pid, job_id))
+        self.assertEqual(store.fail_stopped(), [job_id])
+        self.assertEqual(store.get(job_id)['message'], WORKER_STOPPED)
+
+    def test_job_runner(self):
+        runner = JobRunner()
+        runner.db_file   = self.db_file
+        runner.chunksize = 2
+        try:
+            job_id = runner.submit('standardize', list(range(5)), lambda chunk: [dict(value=i*i) for i in chunk])
+            job = self.wait(runner.store, job_id)
+            self.assertEqual((job['state'], job['total'], job['completed']), (COMPLETED, 5, 5))
+            self.assertEqual(runner.store.results(job_id), [dict(value=i*i) for i in range(5)])
+
+            job_id = runner.submit('standardize', list(range(5)), lambda chunk: [dict(value=1/(i-3)) for i in chunk])
+            job = self.wait(runner.store, job_id)
+            self.assertEqual((job['state'], job['completed']), (FAILED, 2))
+        finally:
+            runner.close()
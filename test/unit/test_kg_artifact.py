@@ -0,0 +1,98 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from kg_utils import kg_utils
+from kg_utils.kg_utils import write_kg_artifact, create_kg_artifact
+from service.kg_artifact import KGArtifact, InvertedIndex, Records
+from service.kg_context import KGContext, get_kg_context, config
+
+class TestKGArtifact(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path    = os.path.join(self.tmp_dir, 'kg.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        kgs = {'inverted_imageKG.json': {'Version': '1.0.5', 'Linux': ['nginx', 'tomcat'], 'Java': ['tomcat'], 'Zope': []},
+               'imageKG.json': {'KG Version': '1.0.5', 'Container Images': {'tomcat': {'OS': []}, 'nginx': {'OS': [{'Class': 'Linux'}]}}},
+               'entity_versionsKG.json': {'Version': '1.0.5', 'Entity': {'Java|*': [['8', '03/18/2014', ' ', '21'], ['21', '09/19/2023', ' ', '21']]}},
+               'COTSKG.json': {'Windows': {'IIS': ['10']}}}
+        write_kg_artifact(kgs, self.path)
+        artifact = KGArtifact(self.path)
+
+        inverted = artifact.load('inverted_imageKG.json')
+        self.assertIsInstance(inverted, InvertedIndex)
+        self.assertEqual(dict(inverted), {'Version': '1.0.5', 'Java': ('tomcat',), 'Linux': ('nginx', 'tomcat'), 'Zope': ()})
+        self.assertIn('Linux', inverted)
+        self.assertNotIn('Windows', inverted)
+        self.assertEqual(inverted.get('Windows', []), [])
+        imageKG = artifact.load('imageKG.json')
+        self.assertIsInstance(imageKG['Container Images'], Records)
+        self.assertEqual(imageKG, kgs['imageKG.json'])
+        imageKG['Container Images']['ubuntu'] = {'OS': [{'Class': 'Linux|Ubuntu'}]}
+        self.assertEqual(list(imageKG['Container Images']), ['tomcat', 'nginx', 'ubuntu'])
+        self.assertNotIn('httpd', imageKG['Container Images'])
+
+        entity_versions = artifact.load('entity_versionsKG.json')
+        self.assertIsInstance(entity_versions['Entity'], InvertedIndex)
+        self.assertEqual(entity_versions, kgs['entity_versionsKG.json'])
+        self.assertEqual(artifact.load('COTSKG.json'), kgs['COTSKG.json'])
+        self.assertNotIn('tca_entities.json', artifact)
+
+    def test_not_an_artifact(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{"Version": "1.0.5"}')
+        with self.assertRaises(ValueError):
+            KGArtifact(self.path)
+
+    def test_kg_context_from_artifact(self):
+        filenames = dict(config['filenames'])
+        try:
+            kg_utils.config['filenames']['kg_artifact'] = self.path
+            config['filenames']['kg_artifact'] = self.path
+            create_kg_artifact()
+            config['general']['kg_format'] = 'binary'
+            kg_context = KGContext()
+        finally:
+            config['general']['kg_format'] = 'json'
+            config['filenames']['kg_artifact'] = filenames['kg_artifact']
+            kg_utils.config['filenames']['kg_artifact'] = filenames['kg_artifact']
+
+        json_context = get_kg_context()
+        self.assertEqual(kg_context.class_type_mapper, json_context.class_type_mapper)
+        self.assertEqual(kg_context.entity_data, json_context.entity_data)
+        catalog_kg = kg_context.catalog('dockerhub')
+        self.assertIsInstance(catalog_kg.inverted_imageKG, InvertedIndex)
+        self.assertEqual(catalog_kg.inverted_image_sets, json_context.catalog('dockerhub').inverted_image_sets)
+        self.assertEqual(catalog_kg.osBaseImages, json_context.catalog('dockerhub').osBaseImages)
+        self.assertIsInstance(catalog_kg.imageKG['Container Images'], Records)
+        self.assertEqual(catalog_kg.imageKG, json_context.catalog('dockerhub').imageKG)
+        self.assertEqual(catalog_kg.pure_lang_images, json_context.catalog('dockerhub').pure_lang_images)
+        self.assertEqual(kg_context.entity_versions, json_context.entity_versions)
+        self.assertEqual(dict(kg_context.compatibilityOSKG), {entity: tuple(OS) if isinstance(OS, list) else OS
+                                                              for entity, OS in json_context.compatibilityOSKG.items()})
+        self.assertEqual(kg_context.os_compatibility.keys(), json_context.os_compatibility.keys())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from kg_utils import kg_utils
+
+class TestKGBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.kg_dir  = kg_utils.config['general']['kg_dir']
+        shutil.copy(kg_utils.config['database']['database_path'], os.path.join(self.tmp_dir, 'kg.db'))
+        self.connection = sqlite3.connect(os.path.join(self.tmp_dir, 'kg.db'))
+        kg_utils.config['general']['kg_dir'] = self.tmp_dir
+
+    def tearDown(self):
+        kg_utils.config['general']['kg_dir'] = self.kg_dir
+        self.connection.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def load(self, kg_name):
+        with open(os.path.join(self.tmp_dir, kg_utils.config['filenames'][kg_name])) as kg_file:
+            return json.load(kg_file)
+
+    def test_incremental_build(self):
+        built = kg_utils.build_kg(self.connection, incremental=True)
+        self.assertIn('ibmcloud_imageKG', built)
+        self.assertIn('class_type_mapper', built)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp_dir, kg_utils.config['filenames']['kg_artifact'])))
+        self.assertEqual(kg_utils.build_kg(self.connection, incremental=True), [])
+
+        # only the KGs of a changed catalog table are generated again
+        with self.connection:
+            self.connection.execute("INSERT INTO ibmcloud_images (container_name, OS, image_url) VALUES ('New Image', 576, 'url')")
+        self.assertEqual(kg_utils.build_kg(self.connection, incremental=True), ['ibmcloud_imageKG'])
+        self.assertIn('New Image', self.load('ibmcloud_imageKG')['Container Images'])
+        self.assertIn('New Image', self.load('inverted_ibmcloud_imageKG')['Linux'])
+
+        # missing KGs are generated again
+        os.remove(os.path.join(self.tmp_dir, kg_utils.config['filenames']['COTSKG']))
+        self.assertEqual(kg_utils.build_kg(self.connection, incremental=True), ['COTSKG'])
+
+        # full builds generate every KG
+        self.assertEqual(len(kg_utils.build_kg(self.connection)), len(kg_utils.kg_builders(self.connection)))
+
+if __name__ == '__main__':
+    unittest.main()
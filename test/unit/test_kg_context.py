@@ -0,0 +1,50 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import unittest
+from service.kg_context import get_kg_context
+
+class TestKGContext(unittest.TestCase):
+
+    def test_kg_context_is_shared(self):
+        kg_context = get_kg_context()
+        self.assertIs(kg_context, get_kg_context())
+        self.assertIs(kg_context.catalog("dockerhub"), kg_context.catalog("dockerhub"))
+        self.assertTrue(len(kg_context.class_type_mapper) > 0)
+        self.assertEqual(len(kg_context.entity_names), len(kg_context.entity_data))
+
+    def test_catalog_includes_base_os_images(self):
+        for catalog in ["dockerhub", "openshift", "operators", "ibmcloud"]:
+            catalog_kg = get_kg_context().catalog(catalog)
+            self.assertTrue(len(catalog_kg.osBaseImages) > 0)
+            for image_name in catalog_kg.osBaseImages.values():
+                self.assertIn(image_name, catalog_kg.imageKG['Container Images'])
+
+    def test_catalog_image_sets(self):
+        catalog_kg = get_kg_context().catalog("openshift")
+        for entity, images in catalog_kg.inverted_imageKG.items():
+            self.assertEqual(catalog_kg.inverted_image_sets[entity], frozenset(images))
+        for image_name in catalog_kg.pure_lang_images:
+            image = catalog_kg.imageKG['Container Images'][image_name]
+            self.assertFalse(image.get('App') or image.get('App Server') or image.get('Runtime'))
+
+    def test_os_compatibility(self):
+        kg_context = get_kg_context()
+        compatibility = kg_context.os_compatibility['.NET Framework']
+        self.assertIs(compatibility, kg_context.os_compatibility['.NET Framework'])
+        self.assertEqual(compatibility.candidate_OS, frozenset(kg_context.compatibilityOSKG['.NET Framework|*']))
+        self.assertTrue(compatibility.is_windows)
+        self.assertNotIn('Unknown entity', kg_context.os_compatibility)
@@ -0,0 +1,99 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import os
+import threading
+import unittest
+from service.kg_sqlite import SQLiteKG
+from service.kg_context import KGContext, get_kg_context, config
+from service.version_detector import VersionIndex
+
+class TestSQLiteKG(unittest.TestCase):
+
+    def setUp(self):
+        self.kg = SQLiteKG(config['database']['database_path'], config['general']['version'])
+
+    def test_catalog_kgs_match_json(self):
+        json_kg = get_kg_context().catalog('openshift')
+        images  = self.kg.image_kg('openshift')['Container Images']
+        for image_name in list(json_kg.imageKG['Container Images'])[:50]:
+            if image_name not in json_kg.osBaseImages.values():
+                self.assertEqual(images[image_name], json_kg.imageKG['Container Images'][image_name])
+        self.assertNotIn('Unknown image', images)
+
+        inverted = self.kg.inverted_image_kg('openshift')
+        for entity in ['Linux|Red Hat Enterprise Linux', 'Linux', 'Java|*', 'Version']:
+            self.assertEqual(inverted[entity], json_kg.inverted_imageKG[entity])
+        self.assertNotIn('Unknown entity', inverted)
+        self.assertEqual(set(inverted), set(json_kg.inverted_imageKG))
+        self.assertEqual(len(inverted), len(set(inverted)))
+        self.assertEqual(len(images), sum(1 for _ in images))
+        self.assertTrue(inverted and images)
+
+        with self.assertRaises(KeyError):
+            self.kg.image_kg('unknown')
+
+    def test_entity_versions_match_json(self):
+        json_index   = VersionIndex(get_kg_context().entity_versions)
+        sqlite_index = VersionIndex(self.kg.entity_versions())
+        for entity, version in [('.NET Framework|*', '4.5'), ('CICS', '5'), ('Unknown entity', '1.0')]:
+            self.assertEqual(sqlite_index.has_entity(entity), json_index.has_entity(entity))
+            self.assertEqual(sqlite_index.get_latest_version(entity), json_index.get_latest_version(entity))
+            self.assertEqual(sqlite_index.get_standardized_version(entity, version), json_index.get_standardized_version(entity, version))
+
+        entity_versions = self.kg.entity_versions()['Entity']
+        self.assertTrue(entity_versions)
+        self.assertEqual(len(entity_versions), len(get_kg_context().entity_versions['Entity']))
+
+    def test_row_cache(self):
+        self.kg.clear()
+        inverted = self.kg.inverted_image_kg('dockerhub')
+        inverted['Linux']
+        misses = self.kg.misses
+        inverted['Linux']
+        self.assertEqual(self.kg.misses, misses)
+        self.assertGreater(self.kg.hits, 0)
+
+        # each thread reads through its own connection
+        self.kg.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(inverted['Linux'])) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result == get_kg_context().catalog('dockerhub').inverted_imageKG['Linux'] for result in results))
+
+    def test_kg_context_from_sqlite(self):
+        try:
+            config['general']['kg_format'] = 'sqlite'
+            kg_context = KGContext()
+        finally:
+            config['general']['kg_format'] = 'json'
+
+        self.assertIsNotNone(kg_context.sqlite)
+        catalog_kg = kg_context.catalog('dockerhub')
+        json_kg    = get_kg_context().catalog('dockerhub')
+        self.assertEqual(catalog_kg.osBaseImages, json_kg.osBaseImages)
+        self.assertEqual(catalog_kg.pure_lang_images, json_kg.pure_lang_images)
+        self.assertEqual(catalog_kg.inverted_image_sets['Linux'], json_kg.inverted_image_sets['Linux'])
+        for image_name in json_kg.osBaseImages.values():
+            self.assertEqual(catalog_kg.imageKG['Container Images'][image_name], json_kg.imageKG['Container Images'][image_name])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import time
+import unittest
+from service.mention_cache import MentionCache
+
+class TestMentionCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = MentionCache(max_size=10, ttl=60)
+        self.assertIsNone(cache.get("java"))
+        cache.put("java", {"entity_names": ["Java|*"]})
+        self.assertEqual(cache.get("java"), {"entity_names": ("Java|*",)})
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_cached_values_are_read_only(self):
+        cache = MentionCache(max_size=10, ttl=60)
+        value = {"entity_names": ["Java|*"], "versions": [("8", "8")]}
+        cache.put("java", value)
+        value["entity_names"].append("JavaScript|*")
+        cached = cache.get("java")
+        self.assertIs(cache.get("java"), cached)
+        with self.assertRaises(TypeError):
+            cached["entity_names"] = ["JavaScript|*"]
+        self.assertEqual(cached, {"entity_names": ("Java|*",), "versions": (("8", "8"),)})
+
+    def test_least_recently_used_is_evicted(self):
+        cache = MentionCache(max_size=2, ttl=60)
+        cache.put("java", 1)
+        cache.put("rhel 7", 2)
+        cache.get("java")
+        cache.put("websphere", 3)
+        self.assertIsNone(cache.get("rhel 7"))
+        self.assertEqual(cache.get("java"), 1)
+        self.assertEqual(cache.get("websphere"), 3)
+
+    def test_expired_entries_are_misses(self):
+        cache = MentionCache(max_size=10, ttl=0.01)
+        cache.put("java", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("java"))
+        self.assertEqual(cache.stats()["size"], 0)
@@ -0,0 +1,68 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import unittest
+from service.metrics import Metrics, Histogram
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.metrics.enabled = True
+
+    def test_histogram(self):
+        histogram = Histogram((0.1, 1, 10))
+        for value in [0.05, 0.1, 0.5, 20]:
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 0])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 20.65)
+
+    def test_render(self):
+        with self.metrics.timer('inference'):
+            pass
+        self.metrics.observe('tca_request_mentions', 42)
+        self.metrics.inc('tca_requests_total', endpoint='/standardize', status='200')
+        self.metrics.inc('tca_requests_total', endpoint='/standardize', status='200')
+        self.metrics.set('tca_model_load_seconds', 1.5, model='tfidf', task='deploy')
+
+        text  = self.metrics.render()
+        lines = text.splitlines()
+        self.assertIn('# TYPE tca_stage_seconds histogram', lines)
+        self.assertIn('tca_stage_seconds_count{stage="inference"} 1', lines)
+        self.assertIn('tca_stage_seconds_bucket{stage="inference",le="+Inf"} 1', lines)
+        self.assertIn('tca_request_mentions_bucket{le="100.0"} 1', lines)
+        self.assertIn('tca_request_mentions_bucket{le="10.0"} 0', lines)
+        self.assertIn('tca_requests_total{endpoint="/standardize",status="200"} 2', lines)
+        self.assertIn('tca_model_load_seconds{model="tfidf",task="deploy"} 1.5', lines)
+        self.assertIn('# TYPE tca_mention_cache_hits_total counter', lines)
+        self.assertTrue(text.endswith('\n'))
+
+        self.metrics.clear()
+        self.assertNotIn('tca_requests_total{endpoint="/standardize",status="200"} 2', self.metrics.render().splitlines())
+
+    def test_disabled(self):
+        self.metrics.enabled = False
+        with self.metrics.timer('inference'):
+            pass
+        self.metrics.observe('tca_request_mentions', 42)
+        self.metrics.inc('tca_requests_total', endpoint='/standardize', status='200')
+        self.assertNotIn('tca_stage_seconds_count{stage="inference"} 1', self.metrics.render().splitlines())
+        self.assertNotIn('tca_request_mentions_count 1', self.metrics.render().splitlines())
+
+if __name__ == '__main__':
+    unittest.main()
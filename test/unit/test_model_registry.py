@@ -0,0 +1,74 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import time
+import unittest
+from service.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+
+    def test_get_model_reuses_loaded_model(self):
+        registry = ModelRegistry()
+        self.assertFalse(registry.is_ready('tfidf'))
+        model = registry.get_model('tfidf')
+        self.assertTrue(registry.is_ready('tfidf'))
+        self.assertIs(model, registry.get_model('tfidf'))
+
+    def test_reload_on_file_change(self):
+        registry = ModelRegistry()
+        model = registry.get_model('tfidf')
+        model_file = model.model_files()[0]
+        stat = os.stat(model_file)
+        try:
+            os.utime(model_file, (stat.st_atime, stat.st_mtime + 10))
+            # files are only checked once per reload interval, or by reload_if_changed
+            self.assertIs(model, registry.get_model('tfidf'))
+            registry.reload_if_changed()
+            self.assertIsNot(model, registry.get_model('tfidf'))
+        finally:
+            os.utime(model_file, (stat.st_atime, stat.st_mtime))
+
+    def test_reload_interval(self):
+        registry = ModelRegistry(reload_interval=0)
+        model = registry.get_model('tfidf')
+        model_file = model.model_files()[0]
+        stat = os.stat(model_file)
+        try:
+            os.utime(model_file, (stat.st_atime, stat.st_mtime + 10))
+            self.assertIsNot(model, registry.get_model('tfidf'))
+        finally:
+            os.utime(model_file, (stat.st_atime, stat.st_mtime))
+
+    def test_reload_on_entities_change(self):
+        registry = ModelRegistry()
+        model = registry.get_model('tfidf')
+        entities_file = model.model_files()[0]
+        self.assertTrue(entities_file.endswith('tca_entities.json'))
+        stat = os.stat(entities_file)
+        try:
+            os.utime(entities_file, (stat.st_atime, stat.st_mtime + 10))
+            registry.reload_if_changed()
+            reloaded = registry.get_model('tfidf')
+            self.assertIsNot(model, reloaded)
+            self.assertIsNot(model.predictor, reloaded.predictor)
+        finally:
+            os.utime(entities_file, (stat.st_atime, stat.st_mtime))
+
+    def test_unknown_model_type(self):
+        registry = ModelRegistry()
+        with self.assertRaises(ValueError):
+            registry.get_model('unknown')
@@ -0,0 +1,41 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import unittest
+import numpy as np
+import torch
+from entity_standardizer.siamese import SIAMESE
+
+class TestSiamese(unittest.TestCase):
+
+    def test_embed_matches_forward(self):
+        siamese  = SIAMESE("deploy").load()
+        mentions = ["java 8", "red hat enterprise linux 7", "websphere application server 8.5.5 fix pack", "db2", "rhel"]
+        with torch.no_grad():
+            expected = siamese.model(mentions, siamese.device).cpu().numpy()
+        for mem_gb_lim, batch_size in [(0, 0), (siamese.mem_gb_lim, 0), (1e-6, 0), (0, 2)]:
+            embeddings = siamese.model.embed(mentions, siamese.device, mem_gb_lim, batch_size)
+            self.assertEqual(embeddings.shape, expected.shape)
+            self.assertTrue(np.allclose(embeddings, expected, atol=1e-5))
+
+    def test_index_matches_cosine_knn(self):
+        from sklearn.neighbors import KNeighborsClassifier
+        siamese  = SIAMESE("deploy").load()
+        queries  = siamese.model.embed(["java 8", "rhel 7", "websphere", "db2 11.5", "tomcat"], siamese.device)
+        knn      = KNeighborsClassifier(n_neighbors=1, metric='cosine').fit(siamese.embeddings, siamese.labels)
+        distances, indices = knn.kneighbors(queries, n_neighbors=10)
+        expected = [[(siamese.labels[i], 1-d) for i, d in zip(idxs, dists)] for dists, idxs in zip(distances.tolist(), indices.tolist())]
+        self.assertEqual(siamese.index.predict(queries, 10), expected)
@@ -39,3 +39,11 @@ class TestApplySIM(unittest.TestCase):
         # print("Expected",expected)
         # print("extracted", extracted)
         self.assertTrue(Test_check.checkEqual(Test_check,expected,extracted))
+
+    def test_sim_tech_stack_standardization_batch(self):
+        from entity_standardizer.tfidf import TFIDF
+        from entity_standardizer.tfidf.sim_applier import sim_applier
+        sim_app = sim_applier(TFIDF("deploy").load().config)
+        tech_stacks = ["cobol", "java 8", "unix/mainframe", "db2, websphere application server 8.5", "rhel 7", "zzzqqq"]
+        expected = [list(sim_app.tech_stack_standardization(tech_stack)) for tech_stack in tech_stacks]
+        self.assertEqual(sim_app.tech_stack_standardization_batch(tech_stacks), expected)
@@ -15,7 +15,7 @@
 ################################################################################
 
 import unittest
-from service.standardization import Standardization, is_version
+from service.standardization import Standardization, MentionMatch, is_version
 from deepdiff import DeepDiff
 from kg_utils.test_check import Test_check
 
@@ -386,6 +386,49 @@ class TestEntityDetection(unittest.TestCase):
         app_data = standardizer.app_standardizer(app_data)
         self.assertTrue(is_version('10.0'))
 
+    def test_compute_combinations(self):
+        """Test combinations of mention words"""
+
+        standardizer = Standardization()
+        self.assertEqual(standardizer.compute_combinations('Oracle 11g enterprise'), ['Oracle 11g', 'Oracle 11g enterprise', 'enterprise'])
+        self.assertEqual(standardizer.compute_combinations('Java 8 Tomcat 9'), ['Java 8', 'Tomcat 9'])
+        self.assertEqual(standardizer.compute_combinations('Apache Tomcat'), ['Apache', 'Apache Tomcat', 'Tomcat'])
+        self.assertEqual(standardizer.compute_combinations('NOCOMBOApache Tomcat'), ['Apache Tomcat'])
+        self.assertFalse(is_version('Tomcat'))
+        self.assertTrue(is_version('2nd'))
+
+    def test_format_mentions(self):
+        """Test formatting of mention matches"""
+
+        match = MentionMatch('DB2', ('10.0', '10.0'), 0.9, 3)
+        match.update('MySQL', ('8', '8'), 0.95)
+        app_data = [{'application_name': 'App 1', 'App': {'db2 10.0': match}, 'unknown': ['foo'],
+                     'low_medium_confidence': {'redis': MentionMatch('Redis', ('NA_VERSION', 'NA_VERSION'), 0.5)}}]
+
+        app_data = Standardization().format_mentions(app_data)
+        self.assertEqual(app_data, [{'application_name': 'App 1',
+                                     'App': {'db2 10.0': {'standard_name': 'DB2', 'detected_version': '10.0', 'latest_known_version': '10.0'}},
+                                     'unknown': ['foo'],
+                                     'low_medium_confidence': {'redis': {'standard_name': 'Redis', 'detected_version': 'NA_VERSION', 'latest_known_version': 'NA_VERSION'}}}])
+        self.assertEqual(match.score, 0.95)
+
+    def test_remove_redundant_mentions(self):
+        """Test removal of mentions overlapping better matched mentions"""
+
+        na = ('NA_VERSION', 'NA_VERSION')
+        app_data = [{'application_name': 'App 1',
+                     'OS': {'red hat linux': MentionMatch('Linux|Red Hat Enterprise Linux', na, 0.9, 0)},
+                     'App': {'hat db': MentionMatch('DB2', na, 0.7, 1), 'redis': MentionMatch('Redis', na, 0.95, 2)},
+                     'low_medium_confidence': {'linux kernel': MentionMatch('Linux|*', na, 0.5), 'foo bar': MentionMatch('Foo', na, 0.5),
+                                               'bar': MentionMatch('Bar', na, 0.5), 'baz qux': MentionMatch('Baz', na, 0.5)},
+                     'unknown': ['zzz', 'qux quux', 'quux', 'zzz', 'redis cache']}]
+
+        app_data = Standardization().remove_redundant_mentions(app_data)
+        self.assertEqual(list(app_data[0]['OS']), ['red hat linux'])
+        self.assertEqual(list(app_data[0]['App']), ['hat db', 'redis'])
+        self.assertEqual(list(app_data[0]['low_medium_confidence']), ['foo bar', 'baz qux'])
+        self.assertEqual(app_data[0]['unknown'], ['qux quux', 'zzz'])
+
 
     def test_loggings(self):
         """Test Loggings"""
@@ -0,0 +1,43 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import os
+import unittest
+from entity_standardizer.tfidf import TFIDF
+from entity_standardizer.tfidf.infer import get_predictor, predictor_files
+
+class TestTFIDF(unittest.TestCase):
+
+    def test_predictor_is_cached(self):
+        config = TFIDF("deploy").config
+        predictor = get_predictor(config)
+        self.assertIs(predictor, get_predictor(config))
+        self.assertIs(predictor, TFIDF("deploy").load().predictor)
+
+    def test_predictor_reloads_on_file_change(self):
+        config = TFIDF("deploy").config
+        predictor = get_predictor(config)
+        model_file = predictor_files(config)[1]
+        mtime = os.path.getmtime(model_file) + 10
+        os.utime(model_file, (mtime, mtime))
+        self.assertIsNot(predictor, get_predictor(config))
+
+    def test_predict_batch(self):
+        predictor = get_predictor(TFIDF("deploy").config)
+        predictions = predictor.predict_batch(["Java", "DB2", "zzzqqq"])
+        self.assertEqual(len(predictions), 3)
+        self.assertEqual(predictions[0][0], (predictor.entity_to_eid["Java|*"], predictions[0][0][1]))
+        self.assertEqual(predictions[2], [(0, predictor.sim_app.sim_threshold)])
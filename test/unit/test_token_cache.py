@@ -0,0 +1,104 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+
+import json
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from service.token_cache import TokenCache
+
+class StubRBACHandler(BaseHTTPRequestHandler):
+    """
+    Authorizes the token 'good', rejects the token 'bad' and fails on any other token
+    """
+    def do_GET(self):
+        self.server.calls += 1
+        time.sleep(self.server.delay)
+        token = self.headers.get('accesstoken')
+        if token in ['good', 'bad']:
+            body = json.dumps({'isAuthorized': 'Y' if token == 'good' else 'N'}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubRBACHandler)
+        self.server.calls = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.auth_url = f'http://127.0.0.1:{self.server.server_port}/api/v2/access'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def is_valid(self, cache, token):
+        return cache.is_valid(self.auth_url, {'accesstoken': token}, token)
+
+    def test_cached_validations(self):
+        cache = TokenCache(ttl=60, negative_ttl=60)
+        self.assertTrue(self.is_valid(cache, 'good'))
+        self.assertTrue(self.is_valid(cache, 'good'))
+        self.assertFalse(self.is_valid(cache, 'bad'))
+        self.assertFalse(self.is_valid(cache, 'bad'))
+        self.assertEqual(self.server.calls, 2)
+        self.assertEqual(cache.stats(), {'size': 2, 'hits': 2, 'misses': 2})
+
+        # errors of the RBAC service are not cached
+        self.assertFalse(self.is_valid(cache, 'other'))
+        self.assertFalse(self.is_valid(cache, 'other'))
+        self.assertEqual(self.server.calls, 4)
+
+    def test_expiry(self):
+        cache = TokenCache(ttl=60, negative_ttl=0.05)
+        self.assertFalse(self.is_valid(cache, 'bad'))
+        self.assertFalse(self.is_valid(cache, 'bad'))
+        self.assertEqual(self.server.calls, 1)
+        time.sleep(0.1)
+        self.assertFalse(self.is_valid(cache, 'bad'))
+        self.assertEqual(self.server.calls, 2)
+
+    def test_single_flight(self):
+        self.server.delay = 0.2
+        cache   = TokenCache(ttl=60, negative_ttl=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.is_valid(cache, 'good'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(self.server.calls, 1)
+
+    def test_unreachable(self):
+        cache = TokenCache(timeout=1)
+        self.assertFalse(cache.is_valid('http://127.0.0.1:1/api/v2/access', {'accesstoken': 'good'}, 'good'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,3 +32,11 @@ class TestUtils(unittest.TestCase):
         expectedList.sort()
         expected = ' '.join(expectedList)
         self.assertEqual(tech_stack, expected)
+
+    def test_normalize_tech_stack(self):
+        from entity_standardizer.tfidf import utils
+        tech_stack = 'Java 8 and c#, Tomcat 3/4/5; os/2 ,unknown, n/a,  JBoss_EAP / WebSphere, Java 8'
+        self.assertEqual(utils.preprocess(tech_stack), ['Java 8', 'c#', 'Tomcat 3/4/5', 'os/2', 'JBoss EAP', 'WebSphere'])
+        self.assertEqual(utils.normalize_tech_stack(tech_stack, dedupe_snippets=True), utils.preprocess(tech_stack))
+        self.assertEqual(utils.my_tokenization0('Oracle Version 11g for Linux'), ['Oracle', '11g', 'Linux'])
+        self.assertEqual(utils.input_preprocess('C# 4.0 .NET'), ' c-sharp . .net')
@@ -0,0 +1,36 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import unittest
+from service.version_detector import version_detector, get_version_index
+
+class TestVersionDetector(unittest.TestCase):
+
+    def test_version_index_is_shared(self):
+        self.assertIs(get_version_index(), get_version_index())
+
+    def test_get_standardized_version(self):
+        vd = version_detector()
+        self.assertEqual(vd.get_standardized_version(vd, ['.NET Framework|*', 1.0], '4'), '4.8')
+        self.assertEqual(vd.get_standardized_version(vd, ['.NET Framework|*', 1.0], '3'), '3.5')
+        self.assertEqual(vd.get_standardized_version(vd, ['Linux|Red Hat Enterprise Linux', 1.0], '7'), '7.9')
+        self.assertEqual(vd.get_standardized_version(vd, ['Linux|Red Hat Enterprise Linux', 1.0], '7.x'), '7.x')
+        self.assertEqual(vd.get_standardized_version(vd, ['Unknown entity', 1.0], '1.2'), '1.2')
+
+    def test_get_latest_version(self):
+        vd = version_detector()
+        self.assertEqual(vd.get_standardized_version(vd, ['.NET Framework|*', 1.0], 'NA_VERSION'), '4.8')
+        self.assertEqual(vd.get_latest_version(vd, ['.NET Framework|*', 1.0]), '4.8')
@@ -0,0 +1,60 @@
+################################################################################
+# Copyright IBM Corporation 2021, 2022
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+import copy
+import unittest
+from service.worker_pool import WorkerPool
+from service.standardization import Standardization
+
+class TestWorkerPool(unittest.TestCase):
+
+    def test_small_payloads_are_not_pooled(self):
+        pool = WorkerPool()
+        pool.enabled   = True
+        pool.chunksize = 4
+        self.assertFalse(pool.is_enabled(4))
+        self.assertTrue(pool.is_enabled(5))
+        pool.enabled   = False
+        self.assertFalse(pool.is_enabled(5))
+
+    def test_start(self):
+        pool = WorkerPool()
+        pool.enabled = False
+        pool.start()
+        self.assertIsNone(pool._WorkerPool__pool)
+
+        pool.enabled   = True
+        pool.processes = 1
+        try:
+            pool.start()
+            self.assertEqual(pool._WorkerPool__pool._ctx.get_start_method(), pool.start_method)
+        finally:
+            pool.close()
+
+    def test_pooled_standardization_keeps_order(self):
+        app_data = [{'application_name': f'App {i}', 'application_description': 'desc',
+                     'technology_summary': summary} for i, summary in
+                    enumerate(['ZOS, JavaScript\nPL1, Private Cloud', 'Linux Red Hat 7, Java 8, Tomcat',
+                               'Windows 2016, .NET Framework 4, IIS', 'AIX, WebSphere 8.5, DB2', 'Python, Django'])]
+        expected = Standardization().app_standardizer(copy.deepcopy(app_data))
+
+        pool = WorkerPool()
+        pool.processes = 2
+        pool.chunksize = 2
+        try:
+            self.assertEqual(pool.standardize(copy.deepcopy(app_data)), expected)
+        finally:
+            pool.close()